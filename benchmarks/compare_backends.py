@@ -0,0 +1,165 @@
+"""
+パーサーのバックエンドの抽出結果が同一かを確認するスクリプト
+
+指定したHTMLレポート（ファイルまたはディレクトリ内の*.html）と、合成レポートのコーパス
+（パターンの組み合わせ・提案なし・空のファイル・コメントや空白を混ぜたものなど）を各バックエンドで解析し、
+全パターン・全H1候補・全提案（ParsedReport.to_dict()）を基準のバックエンドと比較する。
+1件でも異なれば終了コード1。
+
+    python benchmarks/compare_backends.py
+    python benchmarks/compare_backends.py input/ --backends soup,lxml
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic_report import generate_report  # noqa: E402
+from src.parser_backends import PARSER_BACKENDS, create_parser  # noqa: E402
+
+
+# 合成レポートのコーパス（名前とgenerate_reportの引数、文字列の場合はそのままのHTML）
+SYNTHETIC_CORPUS = {
+    'empty': '',
+    'whitespace_only': ' \n\t\n',
+    'default': {},
+    'pattern_a_only': {'patterns': 'A'},
+    'pattern_b_only': {'patterns': 'B', 'h2_count': 3},
+    'no_proposals': {'proposal_count': 0, 'h1_candidate_count': 0},
+    'quirks': {'quirks': True, 'seed': 2},
+    'quirks_large': {'quirks': True, 'h2_count': 24, 'h3_per_h2': 8, 'keyword_count': 12, 'seed': 7},
+    'noise': {'noise_kb': 1024, 'seed': 3},
+}
+
+
+def synthetic_html(name: str) -> str:
+    """コーパスの合成レポートのHTML"""
+    params = SYNTHETIC_CORPUS[name]
+    if isinstance(params, str):
+        return params
+    return generate_report(**params)
+
+
+def collect_html_files(paths: List[str]) -> List[Path]:
+    """ファイルとディレクトリ（直下の*.html）からHTMLファイルを集める"""
+    html_files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            html_files.extend(sorted(path.glob('*.html')))
+        else:
+            html_files.append(path)
+    return html_files
+
+
+def first_difference(expected: Any, actual: Any, path: str = '') -> Optional[str]:
+    """2つの抽出結果で最初に異なる箇所を「パス: 基準 != 比較対象」の形式で返す（同じならNone）"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in list(expected) + [key for key in actual if key not in expected]:
+            if key not in expected or key not in actual:
+                return f"{path}/{key}: キーが片方にしかありません"
+            difference = first_difference(expected[key], actual[key], f"{path}/{key}")
+            if difference:
+                return difference
+        return None
+    if isinstance(expected, list) and isinstance(actual, list):
+        for i, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            difference = first_difference(expected_item, actual_item, f"{path}[{i}]")
+            if difference:
+                return difference
+        if len(expected) != len(actual):
+            return f"{path}: 要素数が異なります（{len(expected)} != {len(actual)}）"
+        return None
+    if expected != actual:
+        return f"{path}: {expected!r} != {actual!r}"
+    return None
+
+
+def compare_file(html_file: Path, backends: List[str]) -> Dict[str, Any]:
+    """1つのレポートを各バックエンドで解析し、最初のバックエンドの結果と比較"""
+    results = {}
+    seconds = {}
+    for backend in backends:
+        started = time.perf_counter()
+        results[backend] = create_parser(str(html_file), backend).extract_report().to_dict()
+        seconds[backend] = time.perf_counter() - started
+    
+    reference = backends[0]
+    differences = {}
+    for backend in backends[1:]:
+        difference = first_difference(results[reference], results[backend])
+        if difference:
+            differences[backend] = difference
+    return {'seconds': seconds, 'differences': differences}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='パーサーのバックエンドごとの抽出結果が同一かを確認します'
+    )
+    parser.add_argument(
+        'paths',
+        nargs='*',
+        help='比較するHTMLファイル、またはHTMLファイルを含むディレクトリ'
+    )
+    parser.add_argument(
+        '--backends',
+        type=str,
+        default=','.join(PARSER_BACKENDS),
+        help=f"比較するバックエンド（カンマ区切り、最初のものを基準にする、デフォルト: {','.join(PARSER_BACKENDS)}）"
+    )
+    parser.add_argument(
+        '--no-synthetic',
+        action='store_true',
+        help='合成レポートのコーパスを使わない'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    backends = [backend.strip() for backend in args.backends.split(',')]
+    for backend in backends:
+        if backend not in PARSER_BACKENDS:
+            print(f"エラー: 不明なバックエンドです: {backend}（利用可能: {', '.join(PARSER_BACKENDS)}）")
+            sys.exit(1)
+    if len(backends) < 2:
+        print("エラー: 比較するバックエンドを2つ以上指定してください。")
+        sys.exit(1)
+    
+    html_files = collect_html_files(args.paths)
+    missing = [str(html_file) for html_file in html_files if not html_file.exists()]
+    if missing:
+        print(f"エラー: ファイルが見つかりません: {', '.join(missing)}")
+        sys.exit(1)
+    
+    print(f"{'レポート':<40}" + ''.join(f"{backend + '(秒)':>12}" for backend in backends) + "  結果")
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if not args.no_synthetic:
+            for name in SYNTHETIC_CORPUS:
+                html_file = Path(temp_dir) / f"{name}.html"
+                html_file.write_text(synthetic_html(name), encoding='utf-8')
+                html_files.append(html_file)
+        
+        for html_file in html_files:
+            comparison = compare_file(html_file, backends)
+            label = html_file.name if html_file.parent == Path(temp_dir) else str(html_file)
+            status = 'OK' if not comparison['differences'] else 'NG'
+            print(f"{label[-40:]:<40}"
+                  + ''.join(f"{comparison['seconds'][backend]:>12.3f}" for backend in backends)
+                  + f"  {status}")
+            for backend, difference in comparison['differences'].items():
+                mismatches += 1
+                print(f"    {backend} と {backends[0]} が異なります: {difference}")
+    
+    if mismatches:
+        print(f"\n{mismatches}件の不一致があります。")
+        sys.exit(1)
+    print(f"\nすべてのレポート（{len(html_files)}件）で抽出結果が一致しました。")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+合成Pascalレポートによる処理速度のベンチマーク
+
+レポートの大きさごとに、次の4段階の所要時間とスループットを計測する。
+
+    parse    HTMLの読み込みと解析（パーサーの生成）          MB/秒
+    extract  パターン・H1候補・提案の抽出（extract_all）       H3/秒
+    render   全フェーズのプロンプト生成（generate_all）        プロンプト/秒
+    emit     プロンプトと記事ディレクトリの書き出し             ファイル/秒
+
+結果はコミットごとにJSONの履歴（デフォルト: benchmarks/results/history.json）に追記し、
+--compareで直前の別コミットの結果と比較できる。
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes small,large --backend soup,stream --compare
+    python benchmarks/run_benchmarks.py --h2 64 --h3 10 --keywords 20 --noise-kb 8192
+"""
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic_report import generate_report  # noqa: E402
+from src.article_structure_generator import ArticleStructureGenerator  # noqa: E402
+from src.parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND, create_parser  # noqa: E402
+from src.prompt_generator import PromptGenerator  # noqa: E402
+
+
+DEFAULT_HISTORY_FILE = REPO_ROOT / 'benchmarks' / 'results' / 'history.json'
+DEFAULT_TEMPLATE_FILE = REPO_ROOT / 'templates' / 'prompts.md'
+
+# レポートの大きさのプリセット（H2数、H2あたりのH3数、H3あたりのキーワード数、ノイズKB）
+SIZE_PRESETS = {
+    'small': {'h2_count': 8, 'h3_per_h2': 4, 'keyword_count': 6, 'noise_kb': 0},
+    'medium': {'h2_count': 16, 'h3_per_h2': 6, 'keyword_count': 10, 'noise_kb': 512},
+    'large': {'h2_count': 32, 'h3_per_h2': 8, 'keyword_count': 15, 'noise_kb': 4096},
+}
+
+STAGES = ['parse', 'extract', 'render', 'emit']
+
+
+def current_commit() -> Dict[str, any]:
+    """現在のコミットと、未コミットの変更があるか"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': 'unknown', 'dirty': False}
+    return {'commit': commit, 'dirty': bool(status)}
+
+
+def run_case(case: str, params: Dict[str, int], backend: str, repeat: int,
+             generator: PromptGenerator, work_dir: Path) -> Dict[str, any]:
+    """1つの大きさ・バックエンドについて各段階をrepeat回計測し、中央値を返す"""
+    html_file = work_dir / f"{case}.html"
+    if not html_file.exists():
+        html_file.write_text(generate_report(**params), encoding='utf-8')
+    html_bytes = html_file.stat().st_size
+    
+    samples = {stage: [] for stage in STAGES}
+    counts = {}
+    for run in range(repeat):
+        started = time.perf_counter()
+        parser = create_parser(str(html_file), backend)
+        samples['parse'].append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        json_data = parser.extract_all('A', [0])
+        samples['extract'].append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        prompts = generator.generate_all(json_data)
+        samples['render'].append(time.perf_counter() - started)
+        
+        output_dir = work_dir / f"out_{case}_{backend}_{run}"
+        started = time.perf_counter()
+        write_stats = generator.save_prompts(prompts, str(output_dir / 'prompts'), json_data)
+        article_generator = ArticleStructureGenerator.from_data(json_data)
+        article_generator.generate_structure(str(output_dir / 'article'), None, str(html_file))
+        samples['emit'].append(time.perf_counter() - started)
+        
+        counts = {
+            'h3': sum(len(h2.get('h3_sections', [])) for h2 in json_data['article_structure']),
+            'prompts': sum(len(p) if isinstance(p, list) else 1 for p in prompts.values() if p),
+            'files': sum(stats['files'] for stats in write_stats.values())
+                     + sum(1 for path in (output_dir / 'article').rglob('*') if path.is_file()),
+        }
+        shutil.rmtree(output_dir, ignore_errors=True)
+    
+    units = {
+        'parse': ('MB/s', html_bytes / (1024 * 1024)),
+        'extract': ('H3/s', counts['h3']),
+        'render': ('prompts/s', counts['prompts']),
+        'emit': ('files/s', counts['files']),
+    }
+    stages = {}
+    for stage in STAGES:
+        seconds = statistics.median(samples[stage])
+        unit, amount = units[stage]
+        stages[stage] = {
+            'seconds': round(seconds, 5),
+            'throughput': round(amount / seconds, 2) if seconds > 0 else None,
+            'unit': unit,
+        }
+    
+    return {
+        'case': case,
+        'backend': backend,
+        'params': params,
+        'html_bytes': html_bytes,
+        'counts': counts,
+        'stages': stages,
+    }
+
+
+def load_history(history_file: Path) -> List[Dict]:
+    if not history_file.exists():
+        return []
+    with open(history_file, 'r', encoding='utf-8') as f:
+        return json.load(f).get('runs', [])
+
+
+def save_history(history_file: Path, runs: List[Dict]):
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_file, 'w', encoding='utf-8') as f:
+        json.dump({'runs': runs}, f, ensure_ascii=False, indent=2)
+
+
+def find_previous_run(runs: List[Dict], commit: str) -> Optional[Dict]:
+    """履歴から、別のコミットで計測した直近の結果を探す"""
+    for run in reversed(runs):
+        if run['commit'] != commit:
+            return run
+    return None
+
+
+def print_results(record: Dict, previous: Optional[Dict]):
+    """結果の表を表示（previousがあれば変化率も表示）"""
+    previous_results = {}
+    if previous:
+        for result in previous['results']:
+            previous_results[(result['case'], result['backend'])] = result
+    
+    print(f"{'ケース':<10}{'バックエンド':<10}{'段階':<9}{'秒':>10}{'スループット':>22}{'前回比':>10}")
+    for result in record['results']:
+        before = previous_results.get((result['case'], result['backend']))
+        for stage in STAGES:
+            current = result['stages'][stage]
+            change = ''
+            if before and before['stages'][stage]['seconds']:
+                ratio = current['seconds'] / before['stages'][stage]['seconds'] - 1
+                change = f"{ratio * 100:+.1f}%"
+            throughput = f"{current['throughput']} {current['unit']}"
+            print(f"{result['case']:<10}{result['backend']:<10}{stage:<9}"
+                  f"{current['seconds']:>10.4f}{throughput:>22}{change:>10}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='合成Pascalレポートで、解析・抽出・プロンプト生成・書き出しの速度を計測します'
+    )
+    parser.add_argument(
+        '--sizes',
+        type=str,
+        default='small,medium',
+        help=f"計測するレポートの大きさ（カンマ区切り、{', '.join(SIZE_PRESETS)}、デフォルト: small,medium）"
+    )
+    parser.add_argument('--h2', type=int, default=None, help='独自の大きさ（custom）のH2数。指定すると--sizesの代わりに使用')
+    parser.add_argument('--h3', type=int, default=4, help='customのH2あたりのH3数（デフォルト: 4）')
+    parser.add_argument('--keywords', type=int, default=6, help='customのH3あたりのキーワード数（デフォルト: 6）')
+    parser.add_argument('--noise-kb', type=int, default=0, help='customのノイズの大きさ（KB、デフォルト: 0）')
+    parser.add_argument(
+        '--backend',
+        type=str,
+        default=DEFAULT_PARSER_BACKEND,
+        help=f"計測するパーサーのバックエンド（カンマ区切り、{', '.join(PARSER_BACKENDS)}、デフォルト: {DEFAULT_PARSER_BACKEND}）"
+    )
+    parser.add_argument('--repeat', type=int, default=3, help='各段階の計測回数（中央値を採用、デフォルト: 3）')
+    parser.add_argument(
+        '--history',
+        type=str,
+        default=str(DEFAULT_HISTORY_FILE),
+        help='結果を追記する履歴ファイル（デフォルト: benchmarks/results/history.json）'
+    )
+    parser.add_argument('--no-record', action='store_true', help='履歴に追記しない')
+    parser.add_argument('--compare', action='store_true', help='直前の別コミットの結果と比較して表示する')
+    
+    args = parser.parse_args(argv)
+    
+    if args.h2 is not None:
+        cases = {'custom': {'h2_count': args.h2, 'h3_per_h2': args.h3,
+                            'keyword_count': args.keywords, 'noise_kb': args.noise_kb}}
+    else:
+        cases = {}
+        for name in args.sizes.split(','):
+            name = name.strip()
+            if name not in SIZE_PRESETS:
+                print(f"エラー: 不明な大きさです: {name}（利用可能: {', '.join(SIZE_PRESETS)}）")
+                sys.exit(1)
+            cases[name] = SIZE_PRESETS[name]
+    
+    backends = [backend.strip() for backend in args.backend.split(',')]
+    for backend in backends:
+        if backend not in PARSER_BACKENDS:
+            print(f"エラー: 不明なバックエンドです: {backend}（利用可能: {', '.join(PARSER_BACKENDS)}）")
+            sys.exit(1)
+    
+    if args.repeat < 1:
+        print("エラー: 計測回数は1以上を指定してください。")
+        sys.exit(1)
+    
+    generator = PromptGenerator(str(DEFAULT_TEMPLATE_FILE))
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for case, params in cases.items():
+            for backend in backends:
+                print(f"計測中: {case} ({backend})...", file=sys.stderr)
+                results.append(run_case(case, params, backend, args.repeat, generator, Path(temp_dir)))
+    
+    record = dict(current_commit())
+    record.update({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    })
+    
+    history_file = Path(args.history)
+    runs = load_history(history_file)
+    previous = find_previous_run(runs, record['commit']) if args.compare else None
+    
+    print(f"\nコミット: {record['commit']}{'（未コミットの変更あり）' if record['dirty'] else ''}")
+    if args.compare:
+        print(f"比較対象: {previous['commit']}（{previous['timestamp']}）" if previous else "比較対象の結果がありません。")
+    print()
+    print_results(record, previous)
+    
+    if not args.no_record:
+        runs.append(record)
+        save_history(history_file, runs)
+        print(f"\n結果を保存しました: {history_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+CLIの起動時間（インタープリタ起動＋import）のベンチマーク
+
+各サブコマンドを `python -X importtime -m src ...` で複数回起動し、
+最速の実行時間と、srcのimportにかかった時間を計測する。
+予算（ミリ秒）を超えた場合、または読み込んではいけない重いモジュール
+（bs4、lxmlなど）を読み込んだ場合は終了コード1で終了する。
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --budget-scale 1.5
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# 計測するケース: (名前, 引数, import時間の予算[ms], 読み込んではいけないモジュール)
+# {json}は計測用に作成する小さな抽出済みJSONファイルに置き換える
+LIGHT_FORBIDDEN = ['bs4', 'lxml', 'sqlite3', 'asyncio', 'concurrent.futures']
+CASES = [
+    ('help', [], 15, LIGHT_FORBIDDEN),
+    ('extract --help', ['extract', '--help'], 40, LIGHT_FORBIDDEN),
+    ('prompts --help', ['prompts', '--help'], 50, LIGHT_FORBIDDEN),
+    ('article --help', ['article', '--help'], 50, LIGHT_FORBIDDEN),
+    ('article --list-h1', ['article', '{json}', '--list-h1'], 50, LIGHT_FORBIDDEN),
+    ('batch --help', ['batch', '--help'], 40, LIGHT_FORBIDDEN),
+    ('pipeline --help', ['pipeline', '--help'], 80, LIGHT_FORBIDDEN),
+    ('bundle --help', ['bundle', '--help'], 50, ['bs4', 'lxml', 'asyncio', 'concurrent.futures']),
+    ('catalog --help', ['catalog', '--help'], 50, LIGHT_FORBIDDEN),
+    ('keywords --help', ['keywords', '--help'], 50, LIGHT_FORBIDDEN),
+    ('similar --help', ['similar', '--help'], 50, LIGHT_FORBIDDEN),
+    ('convert --help', ['convert', '--help'], 50, LIGHT_FORBIDDEN),
+    ('worker --help', ['worker', '--help'], 120, ['bs4', 'lxml', 'sqlite3']),
+    ('api --help', ['api', '--help'], 90, ['bs4', 'lxml', 'sqlite3']),
+]
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+# 計測用の抽出済みJSON
+SAMPLE_JSON = {
+    'pattern': 'A',
+    'article_structure': [
+        {'h2': '見出し', 'h3_sections': [{'h3': '小見出し', 'advice': '', 'keywords': []}]}
+    ],
+    'h1_title_candidates': ['タイトル候補'],
+    'originality_proposals': [],
+}
+
+
+def parse_import_times(stderr: str) -> Dict[str, Dict[str, int]]:
+    """-X importtimeの出力から、モジュールごとの累積import時間（マイクロ秒）と入れ子の深さを取得"""
+    times = {}
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            times[match.group(4)] = {
+                'cumulative': int(match.group(2)),
+                'depth': len(match.group(3)) // 2,
+            }
+    return times
+
+
+def measure(args: List[str], runs: int) -> Dict[str, any]:
+    """サブコマンドを複数回起動し、最速の実行時間とsrcのimport時間を返す"""
+    best_wall = None
+    best_import = None
+    modules = set()
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-m', 'src', *args],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True
+        )
+        wall = time.perf_counter() - started
+        if completed.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} が失敗しました: {completed.stdout}{completed.stderr[-500:]}")
+        
+        times = parse_import_times(completed.stderr)
+        modules.update(times)
+        # srcパッケージとそのモジュールのうち、最上位で読み込まれたもののimport時間の合計
+        # （入れ子で読み込まれたモジュールは親の累積時間に含まれる）
+        src_import = sum(
+            entry['cumulative'] for name, entry in times.items()
+            if entry['depth'] == 0 and (name == 'src' or name.startswith('src.'))
+        )
+        best_wall = wall if best_wall is None else min(best_wall, wall)
+        best_import = src_import if best_import is None else min(best_import, src_import)
+    
+    return {
+        'wall_ms': round(best_wall * 1000, 1),
+        'import_ms': round(best_import / 1000, 1),
+        'modules': modules,
+    }
+
+
+def measure_interpreter(runs: int) -> float:
+    """インタープリタだけの起動時間（ミリ秒、参考値）"""
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 1)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='CLIの起動時間を計測し、予算を超えた場合は失敗します'
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=5,
+        help='ケースごとの起動回数（最速の値を採用、デフォルト: 5）'
+    )
+    parser.add_argument(
+        '--budget-scale',
+        type=float,
+        default=1.0,
+        help='予算に掛ける倍率（遅いマシンやCIで使用、デフォルト: 1.0）'
+    )
+    parser.add_argument(
+        '--json',
+        type=str,
+        default=None,
+        help='結果をJSONファイルに保存する場合、そのパス'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_file = Path(temp_dir) / 'data.json'
+        json_file.write_text(json.dumps(SAMPLE_JSON, ensure_ascii=False), encoding='utf-8')
+        
+        interpreter_ms = measure_interpreter(args.runs)
+        print(f"インタープリタの起動: {interpreter_ms}ms\n")
+        print(f"{'ケース':<22}{'実行時間':>10}{'import':>10}{'予算':>10}  結果")
+        
+        results = []
+        failed = False
+        for name, case_args, budget_ms, forbidden in CASES:
+            case_args = [str(json_file) if arg == '{json}' else arg for arg in case_args]
+            measured = measure(case_args, args.runs)
+            budget = round(budget_ms * args.budget_scale, 1)
+            loaded = [module for module in forbidden if module in measured['modules']]
+            
+            problems = []
+            if measured['import_ms'] > budget:
+                problems.append('予算超過')
+            if loaded:
+                problems.append(f"読み込み禁止: {', '.join(loaded)}")
+            failed = failed or bool(problems)
+            
+            print(f"{name:<22}{measured['wall_ms']:>8}ms{measured['import_ms']:>8}ms{budget:>8}ms  "
+                  f"{'NG（' + '、'.join(problems) + '）' if problems else 'OK'}")
+            results.append({
+                'case': name,
+                'wall_ms': measured['wall_ms'],
+                'import_ms': measured['import_ms'],
+                'budget_ms': budget,
+                'forbidden_loaded': loaded,
+                'ok': not problems,
+            })
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'interpreter_ms': interpreter_ms, 'results': results}, f, ensure_ascii=False, indent=2)
+    
+    if failed:
+        print("\n起動時間の予算を超えたケースがあります。")
+        sys.exit(1)
+    print("\nすべてのケースが予算内です。")
+
+
+if __name__ == '__main__':
+    main()
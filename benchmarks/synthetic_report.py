@@ -0,0 +1,159 @@
+"""
+ベンチマーク用の合成Pascal HTMLレポートを生成するモジュール
+
+実際のレポートと同じマークアップ（sectionContents、section-draft-inn、
+block h2 / block h3、block-keyword-textのspan、block-originalなど）を再現し、
+H2数・H2あたりのH3数・キーワード数・ノイズ量で大きさを変えられる。
+    
+    python benchmarks/synthetic_report.py -o /tmp/report.html --h2 16 --h3 6 --keywords 10 --noise-kb 2048
+"""
+import argparse
+import random
+from html import escape
+from pathlib import Path
+from typing import List, Optional
+
+
+def _noise_section(title: str, size_bytes: int, rng: random.Random) -> List[str]:
+    """抽出対象外のsectionContents（競合サイトのSERPデータなどを模した表）"""
+    lines = [f'<div class="sectionContents"><h2 class="title">{escape(title)}</h2>',
+             '<div class="sectionBlock"><table class="serp">']
+    written = 0
+    row = 0
+    while written < size_bytes:
+        cells = ''.join(
+            f'<td class="cell">競合ページ{row}の見出し{col} 文字数{rng.randint(100, 9999)}</td>'
+            for col in range(6)
+        )
+        line = f'<tr class="row">{cells}</tr>'
+        lines.append(line)
+        written += len(line.encode('utf-8'))
+        row += 1
+    lines.append('</table></div></div>')
+    return lines
+
+
+# quirks=Trueのときに混ぜる、テキストの取得結果が変わりやすいマークアップ
+# （コメント、改行や全角スペース、入れ子のタグ、script、実体参照など）
+_QUIRK_H3_TITLES = [
+    '\n  見出し{h2}-{h3}の<!-- 注記 -->小見出し\n',
+    '<b>見出し{h2}-{h3}</b>の<span class="em">小見出し</span>',
+    '\u3000見出し{h2}-{h3}の小見出し<br>（補足）',
+]
+_QUIRK_ADVICE = [
+    '見出し{h2}-{h3}では<script>var x = "除外";</script>具体例を交えて答えます。',
+    '<p>見出し{h2}-{h3}の段落1</p>\n<p>段落2 &lt;比較&gt; &quot;引用&quot;</p>',
+    '   <!-- 空のアドバイス -->   ',
+]
+
+
+def generate_report(h2_count: int = 8, h3_per_h2: int = 4, keyword_count: int = 6,
+                    noise_kb: int = 0, patterns: str = 'AB', proposal_count: int = 3,
+                    h1_candidate_count: int = 5, seed: int = 1, quirks: bool = False) -> str:
+    """
+    合成Pascal HTMLレポートを生成
+    
+    Args:
+        h2_count: パターンごとのH2の数
+        h3_per_h2: H2あたりのH3の数
+        keyword_count: H3あたりのキーワードの数
+        noise_kb: 抽出対象外のセクションの大きさ（KB、前後に半分ずつ配置）
+        patterns: 生成するパターン（例: 'AB'）
+        proposal_count: 独自性の提案の数
+        h1_candidate_count: H1タイトル候補の数
+        seed: 乱数のシード（同じ引数なら同じHTMLを生成する）
+        quirks: コメント・空白・入れ子のタグなどを混ぜる（パーサーのバックエンドの等価性の確認用）
+    """
+    rng = random.Random(seed)
+    noise_bytes = noise_kb * 1024 // 2
+    
+    lines = ['<!DOCTYPE html>', '<html lang="ja"><head><meta charset="utf-8"><title>Pascal レポート</title></head>',
+             '<body><div class="container">']
+    lines.extend(_noise_section('競合サイトの分析', noise_bytes, rng))
+    
+    lines.append('<div class="sectionContents"><h2 class="title">AIによる記事構成案</h2>')
+    
+    # H1タイトル候補
+    lines.append('<div class="sectionBlock"><h4 class="title">記事タイトルの候補</h4><div class="section-title">')
+    for i in range(h1_candidate_count):
+        if quirks and i % 2:
+            lines.append(f'<div class="title"> <span class="check-icon">✓<i>!</i></span>\n 合成レポートの'
+                         f'<em>タイトル候補{i}</em>  徹底解説 </div>')
+        else:
+            lines.append(f'<div class="title"><span class="check-icon">✓</span>合成レポートのタイトル候補{i} 徹底解説</div>')
+    lines.append('</div></div>')
+    
+    # 記事構成案（パターンごと）
+    for pattern in patterns:
+        lines.append('<div class="sectionBlock"><div class="section-draft"><div class="section-draft-inn">')
+        if quirks:
+            lines.append(f'<div class="section-draft-title"><span>記事構成案 パターン{pattern}</span></div>')
+        else:
+            lines.append(f'<div class="section-draft-title">記事構成案 パターン{pattern}</div>')
+        for h2 in range(h2_count):
+            lines.append(
+                '<div class="block h2"><div class="block-tag">H2</div>'
+                f'<div class="block-tag-text">パターン{pattern}の見出し{h2 + 1} テーマ</div></div>'
+            )
+            for h3 in range(h3_per_h2):
+                keywords = ''.join(
+                    f'<span>キーワード{rng.randint(1, keyword_count * 10)}</span>'
+                    for _ in range(keyword_count)
+                )
+                h3_title = f'見出し{h2 + 1}-{h3 + 1}の小見出し'
+                advice = (f'見出し{h2 + 1}-{h3 + 1}では、読者の疑問に具体例を交えて答えます。'
+                          '&amp; 数字や比較表を使うと効果的です。')
+                if quirks:
+                    variant = rng.randrange(len(_QUIRK_H3_TITLES))
+                    h3_title = _QUIRK_H3_TITLES[variant].format(h2=h2 + 1, h3=h3 + 1)
+                    advice = _QUIRK_ADVICE[variant].format(h2=h2 + 1, h3=h3 + 1)
+                    keywords += '<span> </span><span><b>入れ子</b> キーワード</span><span><!-- 空 --></span>'
+                lines.append(
+                    '<div class="block h3"><div class="block-tag">H3</div>'
+                    f'<div class="h3-left">{h3_title}</div>'
+                    '<div class="block-advice"><div class="block-advice-title">執筆のアドバイス</div>'
+                    f'<div class="block-advice-text">{advice}</div></div>'
+                    '<div class="block-keyword"><div class="block-keyword-title">記事内で使用したいキーワード</div>'
+                    f'<div class="block-keyword-text">{keywords}</div></div></div>'
+                )
+        lines.append('</div></div></div>')
+    
+    # 独自性の提案
+    lines.append('<div class="sectionBlock"><h4 class="title">独自性の提案</h4>')
+    for i in range(proposal_count):
+        lines.append(
+            '<div class="block-original">'
+            f'<div class="block-title"><span class="check-icon">✓</span>独自性の提案{i + 1}</div>'
+            f'<div class="block-text">提案{i + 1}の内容です。実体験や独自の調査結果を加えます。</div></div>'
+        )
+    lines.append('</div>')
+    
+    lines.append('</div>')
+    lines.extend(_noise_section('関連キーワード', noise_bytes, rng))
+    lines.append('</div></body></html>')
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='ベンチマーク用の合成Pascal HTMLレポートを生成します'
+    )
+    parser.add_argument('-o', '--output', type=str, required=True, help='出力するHTMLファイルのパス')
+    parser.add_argument('--h2', type=int, default=8, help='パターンごとのH2の数（デフォルト: 8）')
+    parser.add_argument('--h3', type=int, default=4, help='H2あたりのH3の数（デフォルト: 4）')
+    parser.add_argument('--keywords', type=int, default=6, help='H3あたりのキーワードの数（デフォルト: 6）')
+    parser.add_argument('--noise-kb', type=int, default=0, help='抽出対象外のセクションの大きさ（KB、デフォルト: 0）')
+    parser.add_argument('--seed', type=int, default=1, help='乱数のシード（デフォルト: 1）')
+    parser.add_argument('--quirks', action='store_true', help='コメント・空白・入れ子のタグなどを混ぜる')
+    
+    args = parser.parse_args(argv)
+    
+    html = generate_report(args.h2, args.h3, args.keywords, args.noise_kb, seed=args.seed, quirks=args.quirks)
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(html, encoding='utf-8')
+    print(f"{output_path}（{len(html.encode('utf-8')) / 1024:.1f}KB）を生成しました。")
+
+
+if __name__ == '__main__':
+    main()
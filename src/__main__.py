@@ -0,0 +1,61 @@
+"""
+サブコマンドで各CLIを呼び出すエントリーポイント
+
+    python -m src extract input/report.html --pattern A
+    python -m src prompts output/data.json --phases 1,2
+
+サブコマンドのモジュールは選ばれたものだけを読み込むため、
+--helpや軽いサブコマンドでbs4・lxmlなどの重いモジュールを読み込まない。
+"""
+import importlib
+import sys
+from typing import List, Optional
+
+
+# サブコマンド名 → (モジュール名, 説明)
+SUBCOMMANDS = {
+    'extract': ('cli', 'Pascal HTMLからデータを抽出'),
+    'prompts': ('prompt_cli', 'JSONデータからプロンプトを生成'),
+    'article': ('article_cli', '記事ディレクトリ構造を生成'),
+    'batch': ('batch_cli', '複数のHTMLを一括解析'),
+    'pipeline': ('pipeline_cli', '抽出〜記事ディレクトリ生成を一括実行'),
+    'bundle': ('bundle_cli', 'バンドルファイルの一覧・表示・書き出し'),
+    'catalog': ('catalog_cli', '生成した記事のカタログを一覧・検索'),
+    'keywords': ('keyword_cli', 'キーワードの転置索引を更新・検索'),
+    'similar': ('similarity_cli', '記事構成が似ている記事を検索'),
+    'convert': ('convert_cli', '抽出データをJSON・バイナリ形式に変換'),
+    'worker': ('worker_cli', '常駐ワーカーでジョブを処理'),
+    'api': ('api_cli', 'ローカルHTTP APIサーバーを起動'),
+}
+
+
+def print_usage():
+    """サブコマンドの一覧を表示"""
+    print("使い方: python -m src <サブコマンド> [オプション]\n")
+    print("サブコマンド:")
+    for name, (_, description) in SUBCOMMANDS.items():
+        print(f"  {name:<10} {description}")
+    print("\n各サブコマンドのオプションは python -m src <サブコマンド> --help で表示します。")
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print_usage()
+        return
+    
+    name = argv[0]
+    if name not in SUBCOMMANDS:
+        print(f"エラー: 不明なサブコマンドです: {name}")
+        print_usage()
+        sys.exit(1)
+    
+    module_name, _ = SUBCOMMANDS[name]
+    module = importlib.import_module(f"{__package__ or 'src'}.{module_name}")
+    # argparseの使い方の表示（prog）をサブコマンド名に合わせる
+    sys.argv[0] = f"python -m src {name}"
+    module.main(argv[1:])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+ローカルHTTP APIサーバーのコマンドラインインターフェース
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .api_server import ApiServer, DEFAULT_MAX_BODY_MB, DEFAULT_REPORT_CACHE_SIZE
+    from .parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND
+except ImportError:
+    from api_server import ApiServer, DEFAULT_MAX_BODY_MB, DEFAULT_REPORT_CACHE_SIZE
+    from parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='抽出とプロンプト生成を提供するローカルHTTP APIサーバーを起動します'
+    )
+    parser.add_argument(
+        '--host',
+        type=str,
+        default='127.0.0.1',
+        help='待ち受けるアドレス（デフォルト: 127.0.0.1）'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8765,
+        help='待ち受けるポート（デフォルト: 8765）'
+    )
+    parser.add_argument(
+        '-t', '--template',
+        type=str,
+        default='templates/prompts.md',
+        help='プロンプトテンプレートファイルのパス（デフォルト: templates/prompts.md）'
+    )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER_BACKEND,
+        help=f'HTMLパーサーのバックエンド（デフォルト: {DEFAULT_PARSER_BACKEND}）'
+    )
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=None,
+        help='HTMLを解析するプロセス数（デフォルト: CPUコア数）'
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=DEFAULT_REPORT_CACHE_SIZE,
+        help=f'メモリ上に保持する解析結果の件数（デフォルト: {DEFAULT_REPORT_CACHE_SIZE}）'
+    )
+    parser.add_argument(
+        '--max-body-mb',
+        type=float,
+        default=DEFAULT_MAX_BODY_MB,
+        help=f'リクエストボディの上限（MB、デフォルト: {DEFAULT_MAX_BODY_MB}）'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    if args.workers is not None and args.workers < 1:
+        print("エラー: プロセス数は1以上を指定してください。")
+        sys.exit(1)
+    
+    template_path = Path(args.template)
+    if not template_path.exists():
+        print(f"エラー: テンプレートファイルが見つかりません: {template_path}")
+        sys.exit(1)
+    
+    server = ApiServer(
+        str(template_path),
+        backend=args.backend,
+        max_workers=args.workers,
+        cache_size=args.cache_size,
+        max_body_mb=args.max_body_mb
+    )
+    print(f"http://{args.host}:{args.port}/ で待ち受けています（Ctrl+Cで終了）")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n終了しました。")
+    except OSError as e:
+        print(f"エラー: サーバーを起動できませんでした: {e}")
+        sys.exit(1)
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
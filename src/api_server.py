@@ -0,0 +1,346 @@
+"""
+抽出とプロンプト生成を提供するローカルHTTP API（asyncio）
+
+CMSなどからHTML（またはcli.pyで抽出したJSON）をPOSTすると、抽出結果や
+プロンプトをJSONで返す。HTMLの解析はプロセスプールで行うためイベントループは
+ブロックされない。解析結果はHTMLのハッシュをキーにメモリ上にキャッシュするため、
+同じレポートに対する別フェーズのリクエストは再解析なしで応答できる。
+
+エンドポイント:
+    GET  /health    稼働確認
+    POST /extract   HTMLから抽出（?pattern=A&proposals=0,2、patternを省略すると全パターンの解析結果）
+    POST /prompts   HTMLまたはJSONからプロンプトを生成
+                    （?pattern=A&proposals=0,2&phase=2&h2=1&h3=3 でプロンプト1件のみ）
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .parser_backends import DEFAULT_PARSER_BACKEND, create_parser_from_html, load_parser_class
+    from .pascal_parser import ParsedReport
+    from .prompt_generator import PromptGenerator
+except ImportError:
+    from parser_backends import DEFAULT_PARSER_BACKEND, create_parser_from_html, load_parser_class
+    from pascal_parser import ParsedReport
+    from prompt_generator import PromptGenerator
+
+
+# リクエストボディの上限（バイト）
+DEFAULT_MAX_BODY_MB = 64
+# メモリ上に保持する解析結果の件数
+DEFAULT_REPORT_CACHE_SIZE = 128
+
+
+class ApiError(Exception):
+    """HTTPのエラー応答として返す例外"""
+    
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def parse_html_report(html: bytes, backend: str) -> Dict:
+    """HTMLを解析して全パターンの抽出結果を返す（プロセスプールで実行）"""
+    parser = create_parser_from_html(html.decode('utf-8'), backend)
+    return parser.extract_report().to_dict()
+
+
+def _preload_parser(backend: str):
+    """プロセスプールの初期化（パーサーのモジュールを事前に読み込む）"""
+    load_parser_class(backend)
+
+
+class ReportCache:
+    """解析結果のLRUキャッシュ（HTMLのハッシュ → ParsedReport）"""
+    
+    def __init__(self, max_entries: int = DEFAULT_REPORT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, ParsedReport]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, content_hash: str) -> Optional[ParsedReport]:
+        report = self.entries.get(content_hash)
+        if report is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(content_hash)
+        self.hits += 1
+        return report
+    
+    def put(self, content_hash: str, report: ParsedReport):
+        self.entries[content_hash] = report
+        self.entries.move_to_end(content_hash)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class ApiServer:
+    """抽出とプロンプト生成のHTTPサーバー"""
+    
+    def __init__(self, template_file: str = 'templates/prompts.md',
+                 backend: str = DEFAULT_PARSER_BACKEND, max_workers: Optional[int] = None,
+                 cache_size: int = DEFAULT_REPORT_CACHE_SIZE, max_body_mb: float = DEFAULT_MAX_BODY_MB):
+        """
+        Args:
+            template_file: プロンプトテンプレートファイルのパス
+            backend: HTMLパーサーのバックエンド
+            max_workers: 解析用のプロセス数（Noneの場合はCPUコア数）
+            cache_size: メモリ上に保持する解析結果の件数
+            max_body_mb: リクエストボディの上限（MB）
+        """
+        self.prompt_generator = PromptGenerator(template_file)
+        self.backend = backend
+        self.report_cache = ReportCache(cache_size)
+        self.max_body_bytes = int(max_body_mb * 1024 * 1024)
+        self.max_workers = max_workers
+        self.executor = self._create_executor()
+        # 解析中のHTML（同じHTMLへの同時リクエストは1回の解析を共有する）
+        self._parsing: Dict[str, asyncio.Future] = {}
+    
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """
+        解析用のプロセスプールを作成
+        
+        プロセスは最初の解析のとき（接続の処理中）に起動されるため、forkすると待ち受けソケットや
+        クライアントとの接続を引き継いでしまい、Connection: closeでも接続が閉じなくなる。
+        そのためspawnで起動する。
+        """
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_preload_parser,
+            initargs=(self.backend,)
+        )
+    
+    def close(self):
+        """解析用のプロセスを終了"""
+        self.executor.shutdown(wait=True)
+    
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765):
+        """サーバーを起動して停止されるまで待つ"""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+    
+    async def load_report(self, html: bytes) -> ParsedReport:
+        """HTMLの解析結果を取得（キャッシュになければプロセスプールで解析）"""
+        content_hash = hashlib.sha256(html).hexdigest()
+        report = self.report_cache.get(content_hash)
+        if report is not None:
+            return report
+        
+        # 解析はタスクとして共有し、各リクエストはshieldして待つ
+        # （最初のリクエストの接続が切れても、同じHTMLを待つ他のリクエストは取り消されない）
+        future = self._parsing.get(content_hash)
+        if future is None:
+            future = asyncio.ensure_future(self._parse_report(html, content_hash))
+            self._parsing[content_hash] = future
+            future.add_done_callback(lambda _: self._parsing.pop(content_hash, None))
+        return await asyncio.shield(future)
+    
+    async def _parse_report(self, html: bytes, content_hash: str) -> ParsedReport:
+        """
+        プロセスプールでHTMLを解析してキャッシュに保存
+        
+        解析中にプロセスが異常終了した（プールが壊れた）場合は、プールを作り直して1回だけ再試行する。
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self.executor
+            try:
+                result = await loop.run_in_executor(executor, parse_html_report, html, self.backend)
+                break
+            except BrokenProcessPool:
+                # 壊れたプールは以降のリクエストもすべて失敗するため作り直す（他のリクエストが作り直していない場合のみ）
+                if self.executor is executor:
+                    self.executor = self._create_executor()
+                    executor.shutdown(wait=False)
+                if attempt == 1:
+                    raise ApiError(HTTPStatus.INTERNAL_SERVER_ERROR, "HTMLの解析中に解析プロセスが異常終了しました。")
+        
+        report = ParsedReport.from_dict(result)
+        self.report_cache.put(content_hash, report)
+        return report
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """1つの接続のリクエストを処理（Keep-Aliveに対応）"""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ApiError as e:
+                    await self._send(writer, e.status, {'error': e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                
+                method, target, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    status, payload = await self.dispatch(method, target, headers, body)
+                except ApiError as e:
+                    status, payload = e.status, {'error': e.message}
+                except ValueError as e:
+                    # 存在しないパターン、UTF-8でないHTMLなど
+                    status, payload = HTTPStatus.BAD_REQUEST, {'error': str(e)}
+                except Exception as e:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(e).__name__}: {e}"}
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """HTTPリクエストを読み込む（接続が閉じられた場合はNone）"""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "不正なリクエストです。")
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        try:
+            content_length = int(headers.get('content-length', '0'))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Lengthが不正です。")
+        if content_length < 0:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Lengthが不正です。")
+        if content_length > self.max_body_bytes:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "リクエストボディが大きすぎます。")
+        body = await reader.readexactly(content_length) if content_length else b''
+        return method.upper(), target, headers, body
+    
+    async def _send(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload: any, keep_alive: bool):
+        """JSONの応答を送信"""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+    
+    async def dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Tuple[HTTPStatus, any]:
+        """パスに応じてリクエストを処理"""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        
+        if url.path == '/health':
+            return HTTPStatus.OK, {
+                'status': 'ok',
+                'cached_reports': len(self.report_cache.entries),
+                'cache_hits': self.report_cache.hits,
+                'cache_misses': self.report_cache.misses,
+            }
+        if url.path not in ('/extract', '/prompts'):
+            raise ApiError(HTTPStatus.NOT_FOUND, f"不明なパスです: {url.path}")
+        if method != 'POST':
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "POSTで送信してください。")
+        if not body:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "リクエストボディ（HTMLまたはJSON）が空です。")
+        
+        if url.path == '/extract':
+            return HTTPStatus.OK, await self.extract(body, query)
+        return HTTPStatus.OK, await self.prompts(body, headers, query)
+    
+    async def extract(self, html: bytes, query: Dict[str, str]) -> Dict:
+        """HTMLから抽出（patternを省略した場合は全パターンの解析結果）"""
+        report = await self.load_report(html)
+        if 'pattern' not in query:
+            return report.to_dict()
+        return report.extract_all(query['pattern'], _parse_int_list(query.get('proposals')))
+    
+    async def prompts(self, body: bytes, headers: Dict[str, str], query: Dict[str, str]) -> any:
+        """HTMLまたはJSONからプロンプトを生成（phaseを指定した場合はプロンプト1件）"""
+        if _is_json_body(body, headers):
+            try:
+                json_data = json.loads(body.decode('utf-8'))
+            except ValueError as e:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"JSONの読み込みに失敗しました: {e}")
+            if not isinstance(json_data, dict):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "JSONはオブジェクト（cli.pyで抽出したJSON）で送信してください。")
+        else:
+            if 'pattern' not in query:
+                raise ApiError(HTTPStatus.BAD_REQUEST, "HTMLを送信する場合はpatternを指定してください。")
+            report = await self.load_report(body)
+            json_data = report.extract_all(query['pattern'], _parse_int_list(query.get('proposals')))
+        
+        if 'phase' not in query:
+            return self.prompt_generator.generate_all(json_data)
+        
+        # 指定したプロンプトだけを生成する
+        phase = _phase_name(query['phase'])
+        h2_index = _parse_int(query.get('h2'), 'h2')
+        h3_index = _parse_int(query.get('h3'), 'h3')
+        if phase in ('phase1', 'phase2', 'phase3') and h2_index is None:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{phase}はh2を指定してください。")
+        if phase == 'phase2' and h3_index is None:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "phase2はh3も指定してください。")
+        
+        prompt_data = self.prompt_generator.render_prompt(json_data, phase, h2_index, h3_index)
+        if prompt_data is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"指定したプロンプトが見つかりません: {phase} h2={h2_index} h3={h3_index}")
+        return prompt_data
+
+
+def _is_json_body(body: bytes, headers: Dict[str, str]) -> bool:
+    """リクエストボディがJSONか判定（Content-Typeがなければ先頭の文字で判定）"""
+    content_type = headers.get('content-type', '').lower()
+    if 'json' in content_type:
+        return True
+    if 'html' in content_type:
+        return False
+    return body.lstrip()[:1] in (b'{', b'[')
+
+
+def _phase_name(phase: str) -> str:
+    """'2'などのフェーズ番号を'phase2'に変換"""
+    return phase if phase.startswith('phase') else f"phase{phase}"
+
+
+def _parse_int(value: Optional[str], name: str) -> Optional[int]:
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name}は数値で指定してください。")
+
+
+def _parse_int_list(value: Optional[str]) -> List[int]:
+    if not value:
+        return []
+    try:
+        return [int(x.strip()) for x in value.split(',')]
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "proposalsは数値でカンマ区切りで指定してください。")
@@ -0,0 +1,218 @@
+"""
+記事の雛形とプロンプトを1つのファイル（SQLite）にまとめて保存するモジュール
+
+記事ごとに数十個の小さなMarkdownファイルを作る代わりに、すべてのファイルを
+1つのバンドルファイルに格納する。フェーズ・H2番号・H3番号で索引を作るため、
+任意のメンバーを展開せずに直接取り出せる。従来のディレクトリ構成への書き出しも可能。
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .file_writer import WritePlan, content_hash
+except ImportError:
+    from file_writer import WritePlan, content_hash
+
+
+# バンドルファイルの形式のバージョン
+BUNDLE_FORMAT_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    name TEXT PRIMARY KEY,
+    kind TEXT,
+    pattern TEXT,
+    phase TEXT,
+    h2_index INTEGER,
+    h3_index INTEGER,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS members_lookup ON members (kind, phase, h2_index, h3_index);
+CREATE TABLE IF NOT EXISTS bundle_info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# membersテーブルの索引用の列（contentを除く）
+_MEMBER_COLUMNS = ['name', 'kind', 'pattern', 'phase', 'h2_index', 'h3_index', 'size', 'sha256']
+
+
+class ArticleBundle:
+    """記事の雛形とプロンプトを格納するバンドルファイル（SQLite）"""
+    
+    def __init__(self, bundle_file: str):
+        """
+        Args:
+            bundle_file: バンドルファイルのパス（存在しない場合は作成）
+        """
+        # sqlite3はバンドルを使うときに初めて読み込む（通常のCLIの起動時間を増やさないため）
+        import sqlite3
+        
+        self.bundle_file = Path(bundle_file)
+        self.bundle_file.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.bundle_file))
+        self.connection.executescript(_SCHEMA)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO bundle_info (key, value) VALUES ('format_version', ?)",
+                (str(BUNDLE_FORMAT_VERSION),)
+            )
+    
+    def __enter__(self) -> 'ArticleBundle':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """バンドルファイルを閉じる"""
+        self.connection.close()
+    
+    def write_plan(self, plan: WritePlan, prefix: str = '', replace_prefix: bool = False,
+                   **attributes) -> Dict[str, any]:
+        """
+        WritePlanのファイルをメンバーとして保存（1トランザクションで書き込む）
+        
+        Args:
+            plan: 保存するファイル
+            prefix: メンバー名の前に付けるパス（例: content/、prompts/pattern_A/phase1/）
+            replace_prefix: 保存前にprefix以下の既存メンバーを削除するか
+            attributes: すべてのメンバーに共通の付加情報（patternなど）
+        
+        Returns:
+            書き込み結果（files: メンバー数, bytes: バイト数）
+        """
+        return self.write_plans([{
+            'plan': plan,
+            'prefix': prefix,
+            'replace_prefix': replace_prefix,
+            'attributes': attributes,
+        }])
+    
+    def write_plans(self, plans: List[Dict], info: Optional[Dict[str, any]] = None) -> Dict[str, any]:
+        """
+        複数のWritePlanとバンドル全体の情報を1トランザクションで保存
+        
+        途中で失敗した場合はどれも保存されないため、contentとメタデータが食い違ったバンドルを残さない。
+        
+        Args:
+            plans: write_planの引数のdict（plan, prefix, replace_prefix, attributes）のリスト
+            info: set_infoで保存する情報（キー → 値）
+        
+        Returns:
+            書き込み結果（files: メンバー数, bytes: バイト数）
+        """
+        total_files = 0
+        total_bytes = 0
+        with self.connection:
+            for entry in plans:
+                prefix = entry.get('prefix', '')
+                rows, size = self._member_rows(entry['plan'], prefix, entry.get('attributes') or {})
+                if entry.get('replace_prefix') and prefix:
+                    self.connection.execute(
+                        "DELETE FROM members WHERE substr(name, 1, ?) = ?",
+                        (len(prefix), prefix)
+                    )
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO members "
+                    "(name, kind, pattern, phase, h2_index, h3_index, size, sha256, content) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                total_files += len(rows)
+                total_bytes += size
+            for key, value in (info or {}).items():
+                self._set_info(key, value)
+        return {'files': total_files, 'bytes': total_bytes}
+    
+    def _member_rows(self, plan: WritePlan, prefix: str, attributes: Dict) -> Tuple[List[tuple], int]:
+        """WritePlanのファイルをmembersテーブルの行にする（行のリストと合計バイト数）"""
+        rows = []
+        total_bytes = 0
+        for relative_path, content in plan:
+            member = dict(attributes)
+            member.update(plan.attributes.get(relative_path, {}))
+            size = len(content.encode('utf-8'))
+            total_bytes += size
+            rows.append((
+                f"{prefix}{relative_path}",
+                member.get('kind'),
+                member.get('pattern'),
+                member.get('phase'),
+                member.get('h2_index'),
+                member.get('h3_index'),
+                size,
+                content_hash(content),
+                content
+            ))
+        return rows, total_bytes
+    
+    def set_info(self, key: str, value: any):
+        """バンドル全体の情報（記事のメタデータなど）をJSONで保存"""
+        with self.connection:
+            self._set_info(key, value)
+    
+    def _set_info(self, key: str, value: any):
+        """bundle_infoを1件保存（トランザクションは呼び出し側で管理）"""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO bundle_info (key, value) VALUES (?, ?)",
+            (key, json.dumps(value, ensure_ascii=False))
+        )
+    
+    def get_info(self, key: str) -> Optional[any]:
+        """set_infoで保存した情報を取得"""
+        row = self.connection.execute(
+            "SELECT value FROM bundle_info WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def read(self, name: str) -> Optional[str]:
+        """メンバーの内容を取得（存在しない場合はNone）"""
+        row = self.connection.execute(
+            "SELECT content FROM members WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def find(self, kind: Optional[str] = None, phase: Optional[str] = None,
+             h2_index: Optional[int] = None, h3_index: Optional[int] = None,
+             pattern: Optional[str] = None) -> List[Dict]:
+        """
+        条件に合うメンバーの一覧を取得（内容は含めない）
+        
+        例: find(phase='phase2', h2_index=3, h3_index=1)
+        """
+        conditions = []
+        values = []
+        for column, value in [('kind', kind), ('phase', phase), ('h2_index', h2_index),
+                              ('h3_index', h3_index), ('pattern', pattern)]:
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                values.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self.connection.execute(
+            f"SELECT {', '.join(_MEMBER_COLUMNS)} FROM members{where} ORDER BY name",
+            values
+        ).fetchall()
+        return [dict(zip(_MEMBER_COLUMNS, row)) for row in rows]
+    
+    def export(self, output_dir: str, prefix: str = '') -> Dict[str, any]:
+        """
+        メンバーを従来のディレクトリ構成に書き出す
+        
+        Args:
+            output_dir: 書き出し先のディレクトリ
+            prefix: 指定した場合はこのパス以下のメンバーだけを書き出す（例: content/）
+        """
+        plan = WritePlan()
+        rows = self.connection.execute(
+            "SELECT name, content FROM members WHERE substr(name, 1, ?) = ? ORDER BY name",
+            (len(prefix), prefix)
+        )
+        for name, content in rows:
+            plan.add(name, content)
+        return plan.commit(output_dir)
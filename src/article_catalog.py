@@ -0,0 +1,316 @@
+"""
+生成した記事の目録（カタログ）をSQLiteで管理するモジュール
+
+記事IDのルートディレクトリ（ArticleIdAllocatorと同じ）の「.article_catalog.sqlite」に、
+記事ごとの記事ID・H1タイトル・パターン・元のHTML・抽出データのハッシュ・作成日時・H2の数を保存する。
+ArticleStructureGeneratorが記事を生成するたびに登録・更新するため、記事を探すときに
+出力先のディレクトリをすべてたどって.article.jsonを開く必要がない。
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .file_writer import content_hash
+except ImportError:
+    from file_writer import content_hash
+
+
+# カタログファイルの形式のバージョン
+CATALOG_FORMAT_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    article_id TEXT PRIMARY KEY,
+    location TEXT NOT NULL,
+    storage TEXT NOT NULL,
+    h1_title TEXT NOT NULL,
+    pattern TEXT,
+    source_html TEXT,
+    source_hash TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    h2_count INTEGER,
+    h2_count_from_pattern INTEGER,
+    h2_count_from_proposals INTEGER
+);
+CREATE INDEX IF NOT EXISTS articles_location ON articles (location);
+CREATE INDEX IF NOT EXISTS articles_source_html ON articles (source_html);
+CREATE INDEX IF NOT EXISTS articles_pattern ON articles (pattern, created_at);
+CREATE TABLE IF NOT EXISTS catalog_info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# articlesテーブルの列（登録・取得の順序）
+_ARTICLE_COLUMNS = [
+    'article_id', 'location', 'storage', 'h1_title', 'pattern', 'source_html', 'source_hash',
+    'created_at', 'updated_at', 'h2_count', 'h2_count_from_pattern', 'h2_count_from_proposals'
+]
+
+# 記事の保存形式
+STORAGE_DIRECTORY = 'directory'
+STORAGE_BUNDLE = 'bundle'
+
+# 記事の出力ルートのデフォルト（article/pipelineの-o、ジョブのoutput、catalogの--root）
+DEFAULT_OUTPUT_ROOT = 'output'
+
+
+def default_id_root(output_root: Optional[str] = None) -> str:
+    """
+    --id-rootを指定しない場合の記事IDのルートディレクトリ（連番とカタログの場所）
+    
+    出力ルート（-o、ジョブのoutput）そのものを使う。各CLIはこの関数で既定値を決めるため、
+    デフォルトのまま生成した記事は catalog_cli のデフォルトの --root で見つかる。
+    """
+    return str(output_root or DEFAULT_OUTPUT_ROOT)
+
+
+def source_data_hash(json_data: Dict) -> str:
+    """抽出データのハッシュ（キーの順序に依存しないようにJSONを正規化してSHA-256）"""
+    return content_hash(json.dumps(json_data, ensure_ascii=False, sort_keys=True))
+
+
+def normalize_path(path: Optional[str]) -> Optional[str]:
+    """カタログに保存・検索するパス（絶対パスに正規化）"""
+    return str(Path(path).resolve()) if path else None
+
+
+class ArticleCatalog:
+    """記事IDのルートディレクトリごとの記事の目録（SQLite）"""
+    
+    CATALOG_FILE = '.article_catalog.sqlite'
+    
+    def __init__(self, catalog_root: str):
+        """
+        Args:
+            catalog_root: 記事IDのルートディレクトリ（カタログファイルはこの直下に作成）
+        """
+        # sqlite3はカタログを使うときに初めて読み込む（通常のCLIの起動時間を増やさないため）
+        import sqlite3
+        
+        self.catalog_root = Path(catalog_root)
+        self.catalog_root.mkdir(parents=True, exist_ok=True)
+        self.catalog_file = self.catalog_root / self.CATALOG_FILE
+        # 複数のプロセスが同じルートに並行して記事を生成しても書き込みを待てるようにする
+        self.connection = sqlite3.connect(str(self.catalog_file), timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO catalog_info (key, value) VALUES ('format_version', ?)",
+                (str(CATALOG_FORMAT_VERSION),)
+            )
+    
+    @classmethod
+    def exists(cls, catalog_root: str) -> bool:
+        """ルートディレクトリにカタログファイルがあるか判定"""
+        return (Path(catalog_root) / cls.CATALOG_FILE).exists()
+    
+    def __enter__(self) -> 'ArticleCatalog':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """カタログファイルを閉じる"""
+        self.connection.close()
+    
+    def register(self, metadata: Dict, location: str, storage: str = STORAGE_DIRECTORY,
+                 source_hash: Optional[str] = None):
+        """
+        記事を登録（同じ記事IDが登録済みの場合は更新）
+        
+        Args:
+            metadata: .article.jsonのメタデータ
+            location: 記事のディレクトリ、またはバンドルファイルのパス
+            storage: 保存形式（directory / bundle）
+            source_hash: 抽出データのハッシュ（source_data_hash）
+        """
+        with self.connection:
+            self._register(metadata, location, storage, source_hash)
+    
+    def register_many(self, entries: List[Dict]) -> int:
+        """
+        複数の記事を1トランザクションで登録
+        
+        Args:
+            entries: registerの引数のdict（metadata, location, storage, source_hash）のリスト
+        
+        Returns:
+            登録した記事の数
+        """
+        with self.connection:
+            for entry in entries:
+                self._register(entry['metadata'], entry['location'],
+                               entry.get('storage', STORAGE_DIRECTORY), entry.get('source_hash'))
+        return len(entries)
+    
+    def _register(self, metadata: Dict, location: str, storage: str, source_hash: Optional[str]):
+        """1件をINSERT OR REPLACE（トランザクションは呼び出し側で管理）"""
+        location = normalize_path(location)
+        # 同じ場所に別の記事IDで生成し直した場合は、古い記事の登録を消す
+        self.connection.execute(
+            "DELETE FROM articles WHERE location = ? AND article_id != ?",
+            (location, metadata['article_id'])
+        )
+        self.connection.execute(
+            f"INSERT OR REPLACE INTO articles ({', '.join(_ARTICLE_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(_ARTICLE_COLUMNS))})",
+            (
+                metadata['article_id'],
+                location,
+                storage,
+                metadata.get('h1_title', ''),
+                metadata.get('pattern'),
+                normalize_path(metadata.get('source_html')),
+                source_hash,
+                metadata.get('created_at'),
+                metadata.get('updated_at') or metadata.get('created_at'),
+                metadata.get('h2_count'),
+                metadata.get('h2_count_from_pattern'),
+                metadata.get('h2_count_from_proposals'),
+            )
+        )
+    
+    def remove(self, article_id: str) -> bool:
+        """記事の登録を削除（登録されていなかった場合はFalse）"""
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM articles WHERE article_id = ?", (article_id,))
+        return cursor.rowcount > 0
+    
+    def get(self, article_id: str) -> Optional[Dict]:
+        """記事IDで記事を取得（登録されていない場合はNone）"""
+        row = self.connection.execute(
+            f"SELECT {', '.join(_ARTICLE_COLUMNS)} FROM articles WHERE article_id = ?", (article_id,)
+        ).fetchone()
+        return dict(row) if row else None
+    
+    def get_by_location(self, location: str) -> Optional[Dict]:
+        """記事のディレクトリ（またはバンドルファイル）で記事を取得"""
+        row = self.connection.execute(
+            f"SELECT {', '.join(_ARTICLE_COLUMNS)} FROM articles WHERE location = ?",
+            (normalize_path(location),)
+        ).fetchone()
+        return dict(row) if row else None
+    
+    def find(self, article_id_prefix: Optional[str] = None, title: Optional[str] = None,
+             pattern: Optional[str] = None, source_html: Optional[str] = None,
+             source_hash: Optional[str] = None, since: Optional[str] = None,
+             limit: Optional[int] = None) -> List[Dict]:
+        """
+        条件に合う記事の一覧を取得（作成日時の新しい順）
+        
+        Args:
+            article_id_prefix: 記事IDの先頭（例: 20240101 で、その日の記事）
+            title: H1タイトルに含まれる文字列
+            pattern: パターン（A、Bなど）
+            source_html: 元のHTMLファイルのパス
+            source_hash: 抽出データのハッシュ
+            since: この日時（ISO形式の文字列）以降に作成された記事
+            limit: 最大件数
+        """
+        conditions = []
+        params = []
+        if article_id_prefix:
+            # 主キーの索引を使えるように、前方一致を範囲で指定する
+            conditions.append("article_id >= ? AND article_id < ?")
+            params.extend([article_id_prefix, article_id_prefix + '\U0010ffff'])
+        if title:
+            conditions.append("instr(h1_title, ?) > 0")
+            params.append(title)
+        if pattern:
+            conditions.append("pattern = ?")
+            params.append(pattern)
+        if source_html:
+            conditions.append("source_html = ?")
+            params.append(normalize_path(source_html))
+        if source_hash:
+            conditions.append("source_hash = ?")
+            params.append(source_hash)
+        if since:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        
+        query = f"SELECT {', '.join(_ARTICLE_COLUMNS)} FROM articles"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC, article_id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.connection.execute(query, params)]
+    
+    def count(self) -> int:
+        """登録されている記事の数"""
+        return self.connection.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    
+    def rebuild(self, article_root: Optional[str] = None) -> int:
+        """
+        既存の記事ディレクトリを走査してカタログを作り直す（カタログ導入前の記事の登録用）
+        
+        ルート以下の.article.jsonを持つディレクトリと、*.bundleのバンドルファイルを登録する。
+        
+        Args:
+            article_root: 走査するディレクトリ（Noneの場合はカタログのルート）
+        
+        Returns:
+            登録した記事の数
+        """
+        # ArticleBundleはsqlite3を使うため、走査するときに初めて読み込む
+        try:
+            from .article_bundle import ArticleBundle
+        except ImportError:
+            from article_bundle import ArticleBundle
+        
+        entries = []
+        for directory, dir_names, file_names in os.walk(article_root or self.catalog_root):
+            directory_path = Path(directory)
+            if '.article.json' in file_names:
+                metadata = self._load_json(directory_path / '.article.json')
+                if metadata.get('article_id'):
+                    source_json = self._load_json(directory_path / 'source.json')
+                    entries.append({
+                        'metadata': metadata,
+                        'location': str(directory_path),
+                        'storage': STORAGE_DIRECTORY,
+                        'source_hash': source_data_hash(source_json) if source_json else None,
+                    })
+                # 記事の中（content）はたどらない
+                dir_names[:] = [name for name in dir_names if name != 'content']
+            # 隠しディレクトリ（.git、解析結果のキャッシュなど）はたどらない
+            dir_names[:] = [name for name in dir_names if not name.startswith('.')]
+            for file_name in file_names:
+                if not file_name.endswith('.bundle'):
+                    continue
+                with ArticleBundle(str(directory_path / file_name)) as bundle:
+                    metadata = bundle.get_info('article') or {}
+                    source_json = bundle.read('source.json')
+                if metadata.get('article_id'):
+                    entries.append({
+                        'metadata': metadata,
+                        'location': str(directory_path / file_name),
+                        'storage': STORAGE_BUNDLE,
+                        'source_hash': source_data_hash(json.loads(source_json)) if source_json else None,
+                    })
+        
+        # 削除と登録を1つのトランザクションで行う（途中で失敗・中断しても空のカタログを残さない）
+        with self.connection:
+            self.connection.execute("DELETE FROM articles")
+            for entry in entries:
+                self._register(entry['metadata'], entry['location'],
+                               entry.get('storage', STORAGE_DIRECTORY), entry.get('source_hash'))
+        return len(entries)
+    
+    def _load_json(self, json_file: Path) -> Dict:
+        """JSONファイルを読み込む（存在しない・壊れている場合は空のdict）"""
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return data if isinstance(data, dict) else {}
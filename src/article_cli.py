@@ -4,28 +4,85 @@
 import argparse
 import sys
 from pathlib import Path
+from typing import List, Optional, Tuple
 
 # 相対インポートと絶対インポートの両方に対応
 try:
-    from .article_structure_generator import ArticleStructureGenerator
+    from .article_catalog import DEFAULT_OUTPUT_ROOT, default_id_root
+    from .article_structure_generator import ArticleStructureGenerator, is_same_source
+    from .profiling import stage, add_profile_arguments, start_profile, finish_profile
+    from .report_data import is_multi_pattern, split_patterns
 except ImportError:
-    from article_structure_generator import ArticleStructureGenerator
+    from article_catalog import DEFAULT_OUTPUT_ROOT, default_id_root
+    from article_structure_generator import ArticleStructureGenerator, is_same_source
+    from profiling import stage, add_profile_arguments, start_profile, finish_profile
+    from report_data import is_multi_pattern, split_patterns
 
 
-def main():
+def build_targets(generator: ArticleStructureGenerator, json_path: Path, output_dir: str,
+                  bundle_file: Optional[str]) -> List[Tuple[ArticleStructureGenerator, str, Optional[str]]]:
+    """
+    生成する記事ごとのジェネレーター・出力先ディレクトリ・バンドルファイルを決定
+    
+    複数パターンのデータ（--pattern all）はパターンごとに分け、
+    出力先の下のpattern_X（バンドルファイルは<名前>_pattern_X<拡張子>）に生成する。
+    """
+    if not is_multi_pattern(generator.json_data):
+        return [(generator, output_dir, bundle_file)]
+    
+    targets = []
+    for pattern_data in split_patterns(generator.json_data):
+        pattern = pattern_data['pattern']
+        pattern_generator = ArticleStructureGenerator.from_data(pattern_data, json_path.name)
+        pattern_bundle = None
+        if bundle_file:
+            bundle_path = Path(bundle_file)
+            pattern_bundle = str(bundle_path.with_name(f"{bundle_path.stem}_pattern_{pattern}{bundle_path.suffix}"))
+        targets.append((pattern_generator, str(Path(output_dir) / f"pattern_{pattern}"), pattern_bundle))
+    return targets
+
+
+def print_article_summary(generator: ArticleStructureGenerator, h1_title: Optional[str],
+                          generated_output_path: str):
+    """記事ごとの生成結果を表示"""
+    json_data = generator.json_data
+    pattern = json_data.get('pattern', 'Unknown')
+    h1_title = h1_title or json_data.get('h1_title_candidates', [None])[0]
+    h2_count_from_pattern = len(json_data.get('article_structure', []))
+    h2_count_from_proposals = len(json_data.get('originality_proposals', []))
+    total_h2_count = h2_count_from_pattern + h2_count_from_proposals
+    
+    print(f"\n**パターン:** {pattern}")
+    print(f"**H1タイトル:** {h1_title}")
+    print(f"**H2の数:** {total_h2_count} (パターン: {h2_count_from_pattern}, 独自性の提案: {h2_count_from_proposals})")
+    if generator.sync_result is not None:
+        sync_result = generator.sync_result
+        print(f"\n**差分更新:** 作成 {len(sync_result['created'])}件, "
+              f"更新 {len(sync_result['updated'])}件, "
+              f"削除 {len(sync_result['retired'])}件, "
+              f"変更なし {len(sync_result['unchanged'])}件")
+        if sync_result['kept']:
+            print(f"編集済みのため上書き・削除しなかったファイル ({len(sync_result['kept'])}件):")
+            for relative_path in sync_result['kept']:
+                print(f"  content/{relative_path}")
+    
+    print(f"\n出力先: {generated_output_path}")
+
+
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(
         description='JSONデータから記事ディレクトリ構造を生成します'
     )
     parser.add_argument(
         'json_file',
         type=str,
-        help='抽出されたJSONデータファイルのパス'
+        help='抽出されたJSONデータファイルのパス（バイナリ形式の .prd も可）'
     )
     parser.add_argument(
         '-o', '--output',
         type=str,
-        default='output',
-        help='出力ディレクトリのパス（デフォルト: output）'
+        default=DEFAULT_OUTPUT_ROOT,
+        help=f'出力ディレクトリのパス（デフォルト: {DEFAULT_OUTPUT_ROOT}）'
     )
     parser.add_argument(
         '--h1-title',
@@ -50,13 +107,35 @@ def main():
         default='output/prompts',
         help='プロンプトのディレクトリ（デフォルト: output/prompts）'
     )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='既存のcontentを置き換えず、前回の生成結果（.article.jsonのハッシュ）と比較して変わったファイルだけを更新する'
+    )
+    parser.add_argument(
+        '--bundle',
+        type=str,
+        default=None,
+        help='ディレクトリ構造の代わりに、指定したバンドルファイル（1つのSQLiteファイル）に記事の雛形を保存する'
+    )
     parser.add_argument(
         '--cleanup',
         action='store_true',
         help='記事生成後、使用したJSONファイルを削除する'
     )
+    parser.add_argument(
+        '--id-root',
+        type=str,
+        default=None,
+        help='記事IDの連番とカタログのルートディレクトリ（デフォルト: -o の出力ディレクトリ）。同じルートを使う記事同士で連番が重複しない'
+    )
+    add_profile_arguments(parser)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    
+    if args.bundle and args.incremental:
+        print("エラー: --bundle と --incremental は同時に指定できません。")
+        sys.exit(1)
     
     # JSONファイルの存在確認
     json_path = Path(args.json_file)
@@ -64,9 +143,12 @@ def main():
         print(f"エラー: JSONファイルが見つかりません: {json_path}")
         sys.exit(1)
     
+    profiler = start_profile(args)
+    
     # ジェネレーターを初期化
     try:
-        generator = ArticleStructureGenerator(str(json_path))
+        with stage('json_load', bytes=json_path.stat().st_size):
+            generator = ArticleStructureGenerator(str(json_path))
     except Exception as e:
         print(f"エラー: 初期化に失敗しました: {e}")
         sys.exit(1)
@@ -87,47 +169,46 @@ def main():
         print(f"例: --h1-title \"{h1_candidates[0]}\"")
         sys.exit(0)
     
-    # 同じHTMLファイルから生成された既存のcontentとpromptsを削除
-    if args.source_html:
-        import json
-        import shutil
-        output_path = Path(args.output)
-        source_html_path = Path(args.source_html).resolve()
-        
-        if output_path.exists():
-            metadata_file = output_path / '.article.json'
-            if metadata_file.exists():
-                try:
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                    
-                    existing_source_html = metadata.get('source_html')
-                    if existing_source_html:
-                        existing_path = Path(existing_source_html).resolve()
-                        if existing_path == source_html_path:
-                            # 既存のcontentのみ削除
-                            # 一時的なプロンプト（output/prompts/pattern_*）は削除しない
-                            content_path = output_path / 'content'
-                            if content_path.exists():
-                                shutil.rmtree(content_path)
-                                print(f"既存のcontentディレクトリを削除しました")
-                            # 記事用のpromptsディレクトリ（output/prompts）は削除しない
-                            # 一時的なプロンプト（output/prompts/pattern_*）と同じ場所にあるため
-                except (json.JSONDecodeError, Exception) as e:
-                    # メタデータファイルの読み込みに失敗した場合はスキップ
-                    pass
+    targets = build_targets(generator, json_path, args.output, args.bundle)
+    # 記事IDの連番とカタログは出力ルートにまとめる（パターンごとの記事・バンドルも同じルート）
+    id_root = args.id_root or default_id_root(args.output)
+    
+    # 同じHTMLファイルから生成された既存のcontentは、引き継がずに置き換える
+    # （書き込みが終わってから入れ替えるため、途中で失敗しても既存のcontentは残る。
+    #  差分更新の場合は置き換えず、変わったファイルだけを更新する）
+    replace_outputs = set()
+    if args.source_html and not args.incremental and not args.bundle:
+        for _, output_dir, _ in targets:
+            with stage('content_cleanup'):
+                if is_same_source(output_dir, args.source_html, id_root):
+                    replace_outputs.add(output_dir)
+                    print(f"既存のcontentディレクトリを置き換えます: {output_dir}")
     
     # ディレクトリ構造を生成
     print("\n" + "="*60)
     print("記事ディレクトリ構造を生成中...")
     print("="*60)
     
+    generated_output_paths = []
     try:
-        generated_output_path = generator.generate_structure(
-            args.output,
-            args.h1_title,
-            args.source_html
-        )
+        for target_generator, output_dir, bundle_file in targets:
+            if bundle_file:
+                generated_output_path = target_generator.generate_bundle(
+                    bundle_file,
+                    args.h1_title,
+                    args.source_html,
+                    id_root=id_root
+                )
+            else:
+                generated_output_path = target_generator.generate_structure(
+                    output_dir,
+                    args.h1_title,
+                    args.source_html,
+                    incremental=args.incremental,
+                    id_root=id_root,
+                    replace_content=output_dir in replace_outputs
+                )
+            generated_output_paths.append(generated_output_path)
         
         # プロンプトは既に output/prompts/pattern_A に生成されているので、コピー不要
         # 記事ディレクトリ内のpromptsディレクトリは作成しない（output/prompts/pattern_Aを直接使用）
@@ -138,26 +219,18 @@ def main():
             if json_path.exists() and json_path.parent.name == 'output':
                 json_path.unlink()
                 print(f"JSONファイルを削除しました: {json_path}")
-        
+    
     except Exception as e:
         print(f"エラー: ディレクトリ構造の生成に失敗しました: {e}")
         sys.exit(1)
     
     # 結果を表示
-    json_data = generator.json_data
-    pattern = json_data.get('pattern', 'Unknown')
-    h1_title = args.h1_title or json_data.get('h1_title_candidates', [None])[0]
-    h2_count_from_pattern = len(json_data.get('article_structure', []))
-    h2_count_from_proposals = len(json_data.get('originality_proposals', []))
-    total_h2_count = h2_count_from_pattern + h2_count_from_proposals
+    for (target_generator, _, _), generated_output_path in zip(targets, generated_output_paths):
+        print_article_summary(target_generator, args.h1_title, generated_output_path)
     
-    print(f"\n**パターン:** {pattern}")
-    print(f"**H1タイトル:** {h1_title}")
-    print(f"**H2の数:** {total_h2_count} (パターン: {h2_count_from_pattern}, 独自性の提案: {h2_count_from_proposals})")
-    print(f"\n出力先: {generated_output_path}")
+    finish_profile(profiler, args)
     print("\n完了しました！")
 
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,143 @@
+"""
+記事ID（日付+連番）の連番を割り当てるモジュール
+
+連番は記事IDのルートディレクトリの「.article_id_counter.json」に日付ごとの最後の番号として保存し、
+「.article_id_counter.lock」のファイルロック（POSIXはfcntl、Windowsはmsvcrt）で排他する。
+そのため、複数のプロセスが同じルートに並行して記事を生成しても同じ連番にはならず、
+1回の割り当てはディレクトリの大きさに関係なく一定の時間で終わる。
+ディレクトリの走査は、日付が変わって最初の割り当て（カウンターの初期値の決定）でだけ行う。
+"""
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .file_writer import write_file_atomic
+except ImportError:
+    from file_writer import write_file_atomic
+
+
+# ロックを待つ最大時間（秒）と、取得できなかったときに再試行するまでの間隔（秒、最大値）
+LOCK_TIMEOUT = 60.0
+_LOCK_RETRY_INTERVAL = 0.05
+_LOCK_RETRY_INTERVAL_MAX = 1.0
+
+
+class _FileLock:
+    """プロセス間で排他するファイルロック（withで使用）"""
+    
+    def __init__(self, lock_file: Path):
+        self.lock_file = lock_file
+        self._file = None
+    
+    def __enter__(self) -> '_FileLock':
+        self._file = open(self.lock_file, 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._lock_windows()
+        except BaseException:
+            self._file.close()
+            raise
+        return self
+    
+    def _lock_windows(self):
+        """
+        先頭1バイトをロック（LK_LOCKは約10秒で諦めるため、間隔を空けながら繰り返す）
+        
+        LOCK_TIMEOUT秒を超えても取得できない場合はTimeoutError。
+        """
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        interval = _LOCK_RETRY_INTERVAL
+        while True:
+            self._file.seek(0)
+            try:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError as e:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"記事IDのロックを取得できませんでした: {self.lock_file}") from e
+                time.sleep(interval)
+                interval = min(interval * 2, _LOCK_RETRY_INTERVAL_MAX)
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class ArticleIdAllocator:
+    """記事IDのルートディレクトリごとに、日付ごとの連番を割り当てるクラス"""
+    
+    COUNTER_FILE = '.article_id_counter.json'
+    LOCK_FILE = '.article_id_counter.lock'
+    
+    def __init__(self, id_root: str):
+        """
+        Args:
+            id_root: 記事IDのルートディレクトリ（同じルートを使う記事同士で連番が重複しない）
+        """
+        self.id_root = Path(id_root)
+        self.counter_file = self.id_root / self.COUNTER_FILE
+        self.lock_file = self.id_root / self.LOCK_FILE
+    
+    def allocate(self, date_str: Optional[str] = None) -> int:
+        """
+        連番を1つ割り当てる
+        
+        Args:
+            date_str: 日付（YYYYMMDD、Noneの場合は今日）
+        
+        Returns:
+            割り当てた連番（1始まり）
+        """
+        date_str = date_str or datetime.now().strftime('%Y%m%d')
+        self.id_root.mkdir(parents=True, exist_ok=True)
+        
+        with _FileLock(self.lock_file):
+            counter = self._load_counter()
+            if counter.get('date') == date_str:
+                last = counter.get('last', 0)
+            else:
+                last = self._count_existing(date_str)
+            
+            sequence = last + 1
+            write_file_atomic(self.counter_file, json.dumps({'date': date_str, 'last': sequence}))
+        
+        return sequence
+    
+    def _load_counter(self) -> dict:
+        """カウンターファイルを読み込む（存在しない・壊れている場合は空のdict）"""
+        try:
+            with open(self.counter_file, 'r', encoding='utf-8') as f:
+                counter = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return counter if isinstance(counter, dict) else {}
+    
+    def _count_existing(self, date_str: str) -> int:
+        """カウンターの初期値: ルート直下の、その日付で始まるディレクトリの数"""
+        count = 0
+        with os.scandir(self.id_root) as entries:
+            for entry in entries:
+                if entry.name.startswith(date_str) and entry.is_dir():
+                    count += 1
+        return count
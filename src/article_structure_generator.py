@@ -7,6 +7,22 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .article_bundle import ArticleBundle
+    from .article_catalog import ArticleCatalog, STORAGE_DIRECTORY, STORAGE_BUNDLE, source_data_hash
+    from .article_id_allocator import ArticleIdAllocator
+    from .file_writer import WritePlan, write_file_atomic
+    from .profiling import stage
+    from .report_data import FORMAT_JSON, detect_report_format, loads_report_data
+except ImportError:
+    from article_bundle import ArticleBundle
+    from article_catalog import ArticleCatalog, STORAGE_DIRECTORY, STORAGE_BUNDLE, source_data_hash
+    from article_id_allocator import ArticleIdAllocator
+    from file_writer import WritePlan, write_file_atomic
+    from profiling import stage
+    from report_data import FORMAT_JSON, detect_report_format, loads_report_data
+
 
 class ArticleStructureGenerator:
     """記事ディレクトリ構造を生成するクラス"""
@@ -14,14 +30,38 @@ class ArticleStructureGenerator:
     def __init__(self, json_file: str):
         """
         Args:
-            json_file: 抽出されたJSONデータファイルのパス
+            json_file: 抽出されたデータファイルのパス（JSON・バイナリ形式のどちらでもよい）
         """
         self.json_file = Path(json_file)
         if not self.json_file.exists():
             raise FileNotFoundError(f"JSONファイルが見つかりません: {json_file}")
         
-        with open(self.json_file, 'r', encoding='utf-8') as f:
-            self.json_data = json.load(f)
+        with open(self.json_file, 'rb') as f:
+            payload = f.read()
+        self.json_data = loads_report_data(payload)
+        # バイナリ形式から読み込んだ場合、source.jsonにはJSONに変換して保存する
+        self.source_format = detect_report_format(payload)
+        self.source_name = self.json_file.name
+        
+        # 差分更新（generate_structureのincremental=True）の結果
+        self.sync_result = None
+    
+    @classmethod
+    def from_data(cls, json_data: Dict, source_name: str = 'extracted_data.json') -> 'ArticleStructureGenerator':
+        """
+        JSONファイルを経由せず、抽出済みのデータから直接ジェネレーターを作成
+        
+        Args:
+            json_data: PascalParser.extract_allの戻り値
+            source_name: メタデータのsource_jsonに記録する名前
+        """
+        generator = cls.__new__(cls)
+        generator.json_file = None
+        generator.json_data = json_data
+        generator.source_format = FORMAT_JSON
+        generator.source_name = source_name
+        generator.sync_result = None
+        return generator
     
     def _sanitize_filename(self, filename: str) -> str:
         """ファイル名に使えない文字を置換"""
@@ -33,22 +73,19 @@ class ArticleStructureGenerator:
             filename = filename[:100]
         return filename
     
-    def _generate_article_id(self, output_dir: str, h1_title: str) -> str:
-        """記事IDを生成（日付+連番形式）"""
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
+    def _generate_article_id(self, id_root: str, h1_title: str) -> str:
+        """
+        記事IDを生成（日付+連番形式）
         
+        Args:
+            id_root: 記事IDのルートディレクトリ（同じルートを使う記事同士で連番が重複しない）
+            h1_title: 記事のH1タイトル
+        """
         # 現在の日付を取得
         date_str = datetime.now().strftime('%Y%m%d')
         
-        # 同じ日付の記事を検索して連番を決定
-        existing_articles = [
-            d for d in output_path.iterdir()
-            if d.is_dir() and d.name.startswith(date_str)
-        ]
-        
-        # 連番を決定（001, 002, ...）
-        sequence = len(existing_articles) + 1
+        # 連番を決定（001, 002, ...）。カウンターファイルをロックして割り当てるため、並行して生成しても重複しない
+        sequence = ArticleIdAllocator(id_root).allocate(date_str)
         sequence_str = f"{sequence:03d}"
         
         # タイトルから短い識別子を生成
@@ -61,7 +98,8 @@ class ArticleStructureGenerator:
         return article_id
     
     def generate_structure(self, output_dir: str, selected_h1_title: Optional[str] = None, 
-                          source_html_file: Optional[str] = None):
+                          source_html_file: Optional[str] = None, incremental: bool = False,
+                          id_root: Optional[str] = None, replace_content: bool = False):
         """
         記事ディレクトリ構造を生成
         
@@ -69,11 +107,162 @@ class ArticleStructureGenerator:
             output_dir: 出力先ディレクトリ
             selected_h1_title: 選択されたH1タイトル（Noneの場合は最初の候補を使用）
             source_html_file: 元のHTMLファイルのパス（メタデータ用）
+            incremental: Trueの場合、既存の.article.jsonのファイル一覧（ハッシュ）と比較して
+                         変わったファイルだけを作成・更新・削除する（結果はself.sync_resultに保存）
+            id_root: 記事IDの連番を割り当てるルートディレクトリ（Noneの場合は出力先ディレクトリ。
+                     CLIはdefault_id_rootで出力ルートを指定する）。同じルートを使う記事同士で連番が重複しない。
+                     生成した記事は、このディレクトリのカタログ（ArticleCatalog）にも登録する
+            replace_content: Trueの場合、既存のcontentにある今回生成しないファイルを引き継がずに置き換える
+                             （同じHTMLから生成し直す場合。is_same_sourceを参照）。差分更新では無視する
         """
         output_path = Path(output_dir)
+        id_root = id_root or str(output_path)
         output_path.mkdir(parents=True, exist_ok=True)
         
         # H1タイトルを決定
+        h1_title = self._select_h1_title(selected_h1_title)
+        
+        previous_metadata = self._load_metadata(output_path)
+        
+        # 記事IDを生成（メタデータ用）。同じ記事を生成し直す場合は既存の記事ID・作成日時を引き継ぐ
+        # （連番を新しく割り当てない）
+        if previous_metadata.get('article_id'):
+            article_id = previous_metadata['article_id']
+        else:
+            article_id = self._generate_article_id(id_root, h1_title)
+        
+        # サブディレクトリ（output直下）のcontentに書き込むファイルを先に組み立てる
+        # promptsディレクトリは作成しない（output/prompts/pattern_Aを直接使用）
+        content_path = output_path / 'content'
+        with stage('content_plan') as record:
+            content_plan = self.build_content_plan(h1_title)
+            record.add(files=len(content_plan))
+        
+        # メタデータファイルを作成
+        metadata = self._build_metadata(
+            article_id,
+            h1_title,
+            source_html_file,
+            content_plan,
+            previous_metadata.get('created_at')
+        )
+        
+        metadata_changed = True
+        if incremental:
+            if (previous_metadata.get('files') == metadata['files']
+                    and self._load_source_json(output_path) == self.json_data
+                    and content_path.exists()):
+                # 抽出データもファイル一覧も前回と同じならcontentは書き込まない
+                self.sync_result = {'created': [], 'updated': [], 'retired': [],
+                                    'unchanged': list(content_plan.files), 'kept': []}
+                # 元のHTMLなど、メタデータだけが変わった場合は.article.jsonとカタログは更新する
+                metadata_changed = self._metadata_changed(previous_metadata, metadata)
+            else:
+                with stage('content_sync') as record:
+                    self.sync_result = content_plan.sync(str(content_path), previous_metadata.get('files', {}))
+                    record.add(files=len(self.sync_result['created']) + len(self.sync_result['updated']))
+            if previous_metadata:
+                if metadata_changed:
+                    metadata['updated_at'] = datetime.now().isoformat()
+                else:
+                    metadata = previous_metadata
+        else:
+            # contentは一時ディレクトリに一括で書き込んでから入れ替える
+            # （途中で失敗しても作りかけのcontentが残らないようにする）
+            with stage('content_write') as record:
+                write_stats = content_plan.commit_atomic(str(content_path), keep_existing=not replace_content)
+                record.add(files=write_stats['files'], bytes=write_stats['bytes'])
+            if previous_metadata:
+                metadata['updated_at'] = datetime.now().isoformat()
+        
+        if metadata_changed:
+            with stage('metadata_write', files=2):
+                metadata_file = output_path / '.article.json'
+                write_file_atomic(metadata_file, json.dumps(metadata, ensure_ascii=False, indent=2))
+                
+                # 元のJSONデータをコピー（既に同じ場所にある場合はスキップ）
+                source_json_file = output_path / 'source.json'
+                if self.json_file is None or self.source_format != FORMAT_JSON:
+                    write_file_atomic(source_json_file, json.dumps(self.json_data, ensure_ascii=False, indent=2))
+                elif self.json_file.resolve() != source_json_file.resolve():
+                    shutil.copy2(self.json_file, source_json_file)
+        
+        with stage('catalog_update'):
+            self._update_catalog(id_root, metadata, str(output_path), STORAGE_DIRECTORY)
+        
+        return str(output_path)
+    
+    def generate_bundle(self, bundle_file: str, selected_h1_title: Optional[str] = None,
+                        source_html_file: Optional[str] = None, id_root: Optional[str] = None) -> str:
+        """
+        記事の雛形をバンドルファイル（1つのSQLiteファイル）に保存
+        
+        メンバー名はディレクトリ構成と同じ（.article.json, source.json, content/...）。
+        既存のバンドルに保存した場合、content/以下は置き換える。
+        
+        Args:
+            bundle_file: バンドルファイルのパス
+            selected_h1_title: 選択されたH1タイトル（Noneの場合は最初の候補を使用）
+            source_html_file: 元のHTMLファイルのパス（メタデータ用）
+            id_root: 記事IDの連番を割り当てるルートディレクトリ（Noneの場合はバンドルファイルのディレクトリ）。
+                     生成した記事は、このディレクトリのカタログ（ArticleCatalog）にも登録する
+        """
+        h1_title = self._select_h1_title(selected_h1_title)
+        bundle_path = Path(bundle_file)
+        
+        with ArticleBundle(str(bundle_path)) as bundle:
+            previous_metadata = bundle.get_info('article') or {}
+            if previous_metadata.get('article_id'):
+                article_id = previous_metadata['article_id']
+            else:
+                article_id = self._generate_article_id(id_root or str(bundle_path.parent), h1_title)
+            
+            content_plan = self.build_content_plan(h1_title)
+            metadata = self._build_metadata(
+                article_id,
+                h1_title,
+                source_html_file,
+                content_plan,
+                previous_metadata.get('created_at')
+            )
+            
+            metadata_plan = WritePlan()
+            metadata_plan.add('.article.json', json.dumps(metadata, ensure_ascii=False, indent=2), kind='metadata')
+            if self.json_file is None or self.source_format != FORMAT_JSON:
+                source_json = json.dumps(self.json_data, ensure_ascii=False, indent=2)
+            else:
+                with open(self.json_file, 'r', encoding='utf-8') as f:
+                    source_json = f.read()
+            metadata_plan.add('source.json', source_json, kind='source')
+            
+            # content/の置き換えとメタデータを1トランザクションで保存（途中で失敗しても食い違わない）
+            pattern = self.json_data.get('pattern', 'Unknown')
+            bundle.write_plans([
+                {'plan': content_plan, 'prefix': 'content/', 'replace_prefix': True,
+                 'attributes': {'pattern': pattern}},
+                {'plan': metadata_plan},
+            ], info={'article': metadata})
+        
+        with stage('catalog_update'):
+            self._update_catalog(id_root or str(bundle_path.parent), metadata, str(bundle_path), STORAGE_BUNDLE)
+        
+        return str(bundle_path)
+    
+    def _update_catalog(self, catalog_root: str, metadata: Dict, location: str, storage: str):
+        """
+        記事IDのルートディレクトリのカタログに、生成した記事を登録・更新
+        
+        Args:
+            catalog_root: 記事IDのルートディレクトリ
+            metadata: .article.jsonのメタデータ
+            location: 記事のディレクトリ、またはバンドルファイルのパス
+            storage: 保存形式（directory / bundle）
+        """
+        with ArticleCatalog(catalog_root) as catalog:
+            catalog.register(metadata, location, storage, source_data_hash(self.json_data))
+    
+    def _select_h1_title(self, selected_h1_title: Optional[str]) -> str:
+        """使用するH1タイトルを決定（Noneの場合は最初の候補）"""
         h1_candidates = self.json_data.get('h1_title_candidates', [])
         if not h1_candidates:
             raise ValueError("H1タイトル候補が見つかりません。")
@@ -81,54 +270,73 @@ class ArticleStructureGenerator:
         if selected_h1_title:
             if selected_h1_title not in h1_candidates:
                 raise ValueError(f"指定されたH1タイトルが見つかりません: {selected_h1_title}")
-            h1_title = selected_h1_title
-        else:
-            h1_title = h1_candidates[0]
-        
-        # 記事IDを生成（メタデータ用）
-        article_id = self._generate_article_id(str(output_path), h1_title)
-        
-        # サブディレクトリを作成（output直下）
-        content_path = output_path / 'content'
-        content_path.mkdir(exist_ok=True)
-        # promptsディレクトリは作成しない（output/prompts/pattern_Aを直接使用）
-        
-        # メタデータファイルを作成
+            return selected_h1_title
+        return h1_candidates[0]
+    
+    def _build_metadata(self, article_id: str, h1_title: str, source_html_file: Optional[str],
+                        content_plan: WritePlan, created_at: Optional[str] = None) -> Dict:
+        """.article.jsonに保存するメタデータを作成"""
         pattern = self.json_data.get('pattern', 'Unknown')
         article_structure = self.json_data.get('article_structure', [])
         originality_proposals = self.json_data.get('originality_proposals', [])
         total_h2_count = len(article_structure) + len(originality_proposals)
         
-        metadata = {
+        return {
             'article_id': article_id,
             'h1_title': h1_title,
-            'h1_title_candidates': h1_candidates,
+            'h1_title_candidates': self.json_data.get('h1_title_candidates', []),
             'pattern': pattern,
-            'created_at': datetime.now().isoformat(),
-            'source_json': str(self.json_file.name),
+            'created_at': created_at or datetime.now().isoformat(),
+            'source_json': str(self.source_name),
             'source_html': source_html_file if source_html_file else None,
             'h2_count': total_h2_count,
             'h2_count_from_pattern': len(article_structure),
             'h2_count_from_proposals': len(originality_proposals),
-            'originality_proposals_count': len(originality_proposals)
+            'originality_proposals_count': len(originality_proposals),
+            # 生成したファイルの内容のハッシュ（contentからの相対パス → SHA-256、差分更新に使用）
+            'files': content_plan.manifest()
         }
+    
+    def _metadata_changed(self, previous_metadata: Dict, metadata: Dict) -> bool:
+        """前回の.article.jsonから変わったか（更新日時は比較しない）"""
+        previous = {key: value for key, value in previous_metadata.items() if key != 'updated_at'}
+        return previous != metadata
+    
+    def _load_metadata(self, output_path: Path) -> Dict:
+        """既存の.article.jsonを読み込む（存在しない・壊れている場合は空のdict）"""
+        try:
+            with open(output_path / '.article.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def _load_source_json(self, output_path: Path) -> Optional[Dict]:
+        """既存のsource.jsonを読み込む（存在しない・壊れている場合はNone）"""
+        try:
+            with open(output_path / 'source.json', 'rb') as f:
+                return loads_report_data(f.read())
+        except (OSError, ValueError):
+            return None
+    
+    def build_content_plan(self, h1_title: str) -> WritePlan:
+        """
+        contentディレクトリに書き込むファイル（contentからの相対パスと内容）を組み立てる
         
-        metadata_file = output_path / '.article.json'
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
-        
-        # 元のJSONデータをコピー（既に同じ場所にある場合はスキップ）
-        source_json_file = output_path / 'source.json'
-        if self.json_file.resolve() != source_json_file.resolve():
-            shutil.copy2(self.json_file, source_json_file)
+        Args:
+            h1_title: 記事のH1タイトル
+        """
+        plan = WritePlan()
+        pattern = self.json_data.get('pattern', 'Unknown')
         
-        # H1ファイルを作成（contentディレクトリ内）
-        h1_file = content_path / f"h1_{h1_title}.md"
-        with open(h1_file, 'w', encoding='utf-8') as f:
-            f.write(f"# {h1_title}\n\n")
-            f.write("<!-- ここにH1用のコンテンツを記入 -->\n")
+        # H1ファイル
+        plan.add(
+            f"h1_{h1_title}.md",
+            f"# {h1_title}\n\n"
+            "<!-- ここにH1用のコンテンツを記入 -->\n",
+            kind='h1'
+        )
         
-        # 各H2ごとにディレクトリとファイルを作成（contentディレクトリ内）
+        # 各H2ごとにディレクトリとファイルを作成
         article_structure = self.json_data.get('article_structure', [])
         
         for h2_index, h2_section in enumerate(article_structure, start=1):
@@ -136,68 +344,45 @@ class ArticleStructureGenerator:
             if not h2_title:
                 continue
             
-            # H2ディレクトリを作成（contentディレクトリ内）
+            # H2ディレクトリ
             h2_dir_name = f"h2-{h2_index}_{self._sanitize_filename(h2_title)}"
-            h2_path = content_path / h2_dir_name
-            h2_path.mkdir(exist_ok=True)
+            h3_sections = h2_section.get('h3_sections', [])
             
-            # H2ファイルを作成
-            h2_file = h2_path / f"h2-{h2_index}_{h2_title}.md"
-            with open(h2_file, 'w', encoding='utf-8') as f:
-                f.write(f"## {h2_title}\n\n")
-                f.write("<!-- ここにH2用のコンテンツを記入 -->\n")
+            # H2ファイル
+            plan.add(
+                f"{h2_dir_name}/h2-{h2_index}_{h2_title}.md",
+                f"## {h2_title}\n\n"
+                "<!-- ここにH2用のコンテンツを記入 -->\n",
+                kind='h2', h2_index=h2_index
+            )
             
-            # Pascalファイルを作成（H2の設計図・アドバイス）
-            pascal_file = h2_path / f"pascal_h2-{h2_index}.md"
-            with open(pascal_file, 'w', encoding='utf-8') as f:
-                f.write(f"# Pascal設計図: {h2_title}\n\n")
-                f.write(f"**パターン:** {pattern}\n")
-                f.write(f"**H2番号:** {h2_index}\n\n")
-                
-                # H3セクションの情報を書き込む
-                h3_sections = h2_section.get('h3_sections', [])
-                if h3_sections:
-                    f.write("## H3一覧\n\n")
-                    
-                    for h3_index, h3_section in enumerate(h3_sections, start=1):
-                        h3_title = h3_section.get('h3', '')
-                        if not h3_title:
-                            continue
-                        
-                        f.write(f"### H3-{h3_index}: {h3_title}\n\n")
-                        
-                        # 執筆アドバイス
-                        advice = h3_section.get('advice', '')
-                        if advice:
-                            f.write(f"**執筆アドバイス:**\n\n")
-                            f.write(f"{advice}\n\n")
-                        
-                        # キーワード
-                        keywords = h3_section.get('keywords', [])
-                        if keywords:
-                            keywords_str = ', '.join(keywords)
-                            f.write(f"**キーワード:**\n\n")
-                            f.write(f"{keywords_str}\n\n")
-                        
-                        f.write("---\n\n")
+            # Pascalファイル（H2の設計図・アドバイス）
+            plan.add(
+                f"{h2_dir_name}/pascal_h2-{h2_index}.md",
+                self._format_pascal_h2(h2_title, h2_index, pattern, h3_sections),
+                kind='pascal', h2_index=h2_index
+            )
             
-            # Experienceファイルを作成
-            experience_file = h2_path / f"experience_h2-{h2_index}.md"
-            with open(experience_file, 'w', encoding='utf-8') as f:
-                f.write(f"# Experience: {h2_title}\n\n")
-                f.write("<!-- ここに体験談を記入 -->\n")
+            # Experienceファイル
+            plan.add(
+                f"{h2_dir_name}/experience_h2-{h2_index}.md",
+                f"# Experience: {h2_title}\n\n"
+                "<!-- ここに体験談を記入 -->\n",
+                kind='experience', h2_index=h2_index
+            )
             
-            # 各H3ファイルを作成
-            h3_sections = h2_section.get('h3_sections', [])
+            # 各H3ファイル
             for h3_index, h3_section in enumerate(h3_sections, start=1):
                 h3_title = h3_section.get('h3', '')
                 if not h3_title:
                     continue
                 
-                h3_file = h2_path / f"h3-{h3_index}_{h3_title}.md"
-                with open(h3_file, 'w', encoding='utf-8') as f:
-                    f.write(f"### {h3_title}\n\n")
-                    f.write("<!-- ここにH3用のコンテンツを記入 -->\n")
+                plan.add(
+                    f"{h2_dir_name}/h3-{h3_index}_{h3_title}.md",
+                    f"### {h3_title}\n\n"
+                    "<!-- ここにH3用のコンテンツを記入 -->\n",
+                    kind='h3', h2_index=h2_index, h3_index=h3_index
+                )
         
         # 独自性の提案をh2として追加
         originality_proposals = self.json_data.get('originality_proposals', [])
@@ -209,40 +394,132 @@ class ArticleStructureGenerator:
             if not h2_title:
                 continue
             
-            # H2ディレクトリを作成（contentディレクトリ内）
+            # H2ディレクトリ
             h2_dir_name = f"h2-{h2_index}_{self._sanitize_filename(h2_title)}"
-            h2_path = content_path / h2_dir_name
-            h2_path.mkdir(exist_ok=True)
             
-            # H2ファイルを作成
-            h2_file = h2_path / f"h2-{h2_index}_{h2_title}.md"
-            with open(h2_file, 'w', encoding='utf-8') as f:
-                f.write(f"## {h2_title}\n\n")
-                f.write("<!-- ここにH2用のコンテンツを記入 -->\n")
+            # H2ファイル
+            plan.add(
+                f"{h2_dir_name}/h2-{h2_index}_{h2_title}.md",
+                f"## {h2_title}\n\n"
+                "<!-- ここにH2用のコンテンツを記入 -->\n",
+                kind='h2', h2_index=h2_index
+            )
+            
+            # Pascalファイル（独自性の提案のアドバイスを含む）
+            plan.add(
+                f"{h2_dir_name}/pascal_h2-{h2_index}.md",
+                self._format_pascal_proposal(h2_title, h2_index, pattern, proposal.get('advice', '')),
+                kind='pascal', h2_index=h2_index
+            )
             
-            # Pascalファイルを作成（独自性の提案のアドバイスを含む）
-            pascal_file = h2_path / f"pascal_h2-{h2_index}.md"
-            with open(pascal_file, 'w', encoding='utf-8') as f:
-                f.write(f"# Pascal設計図: {h2_title}\n\n")
-                f.write(f"**パターン:** {pattern}\n")
-                f.write(f"**H2番号:** {h2_index}\n")
-                f.write(f"**種別:** 独自性の提案\n\n")
+            # Experienceファイル
+            plan.add(
+                f"{h2_dir_name}/experience_h2-{h2_index}.md",
+                f"# Experience: {h2_title}\n\n"
+                "<!-- ここに体験談を記入 -->\n",
+                kind='experience', h2_index=h2_index
+            )
+        
+        return plan
+    
+    def _format_pascal_h2(self, h2_title: str, h2_index: int, pattern: str, h3_sections: List[Dict]) -> str:
+        """H2のPascal設計図ファイルの内容を作成"""
+        parts = [
+            f"# Pascal設計図: {h2_title}\n\n",
+            f"**パターン:** {pattern}\n",
+            f"**H2番号:** {h2_index}\n\n",
+        ]
+        
+        # H3セクションの情報を書き込む
+        if h3_sections:
+            parts.append("## H3一覧\n\n")
+            
+            for h3_index, h3_section in enumerate(h3_sections, start=1):
+                h3_title = h3_section.get('h3', '')
+                if not h3_title:
+                    continue
+                
+                parts.append(f"### H3-{h3_index}: {h3_title}\n\n")
                 
                 # 執筆アドバイス
-                advice = proposal.get('advice', '')
+                advice = h3_section.get('advice', '')
                 if advice:
-                    f.write(f"**執筆アドバイス:**\n\n")
-                    f.write(f"{advice}\n\n")
-            
-            # Experienceファイルを作成
-            experience_file = h2_path / f"experience_h2-{h2_index}.md"
-            with open(experience_file, 'w', encoding='utf-8') as f:
-                f.write(f"# Experience: {h2_title}\n\n")
-                f.write("<!-- ここに体験談を記入 -->\n")
+                    parts.append("**執筆アドバイス:**\n\n")
+                    parts.append(f"{advice}\n\n")
+                
+                # キーワード
+                keywords = h3_section.get('keywords', [])
+                if keywords:
+                    keywords_str = ', '.join(keywords)
+                    parts.append("**キーワード:**\n\n")
+                    parts.append(f"{keywords_str}\n\n")
+                
+                parts.append("---\n\n")
         
-        return str(output_path)
+        return ''.join(parts)
+    
+    def _format_pascal_proposal(self, h2_title: str, h2_index: int, pattern: str, advice: str) -> str:
+        """独自性の提案のPascal設計図ファイルの内容を作成"""
+        parts = [
+            f"# Pascal設計図: {h2_title}\n\n",
+            f"**パターン:** {pattern}\n",
+            f"**H2番号:** {h2_index}\n",
+            "**種別:** 独自性の提案\n\n",
+        ]
+        
+        # 執筆アドバイス
+        if advice:
+            parts.append("**執筆アドバイス:**\n\n")
+            parts.append(f"{advice}\n\n")
+        
+        return ''.join(parts)
     
     def list_h1_candidates(self) -> List[str]:
         """H1タイトル候補のリストを返す"""
         return self.json_data.get('h1_title_candidates', [])
 
+
+def is_same_source(output_dir: str, source_html_file: str, catalog_root: Optional[str] = None) -> bool:
+    """
+    出力先の記事が同じHTMLファイルから生成されたものか判定
+    
+    同じHTMLから生成し直す場合、既存のcontentは引き継がずに置き換える
+    （generate_structureのreplace_content。書き込みが終わるまで既存のcontentは残る）。
+    
+    Args:
+        output_dir: 記事のディレクトリ
+        source_html_file: 元のHTMLファイルのパス
+        catalog_root: 記事IDのルートディレクトリ（Noneの場合は出力先ディレクトリ）。
+                      カタログに登録されている記事は、.article.jsonを開かずにカタログで判定する
+    
+    Returns:
+        既存のcontentがあり、同じHTMLファイルから生成されたものならTrue
+    """
+    output_path = Path(output_dir)
+    source_html_path = Path(source_html_file).resolve()
+    
+    metadata = None
+    catalog_root = catalog_root or str(output_path)
+    if ArticleCatalog.exists(catalog_root):
+        with ArticleCatalog(catalog_root) as catalog:
+            metadata = catalog.get_by_location(str(output_path))
+    
+    if metadata is None:
+        # カタログがない・登録されていない記事（カタログ導入前に生成したものなど）はメタデータファイルで判定
+        metadata_file = output_path / '.article.json'
+        if not metadata_file.exists():
+            return False
+        
+        try:
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            # メタデータファイルの読み込みに失敗した場合はスキップ
+            return False
+    
+    existing_source_html = metadata.get('source_html')
+    if not existing_source_html or Path(existing_source_html).resolve() != source_html_path:
+        return False
+    
+    # 一時的なプロンプト（output/prompts/pattern_*）は対象外
+    return (output_path / 'content').exists()
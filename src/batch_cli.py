@@ -0,0 +1,127 @@
+"""
+Pascal HTMLレポート一括解析のコマンドラインインターフェース
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .batch_extractor import BatchExtractor, collect_html_files
+    from .parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND
+    from .report_data import REPORT_FORMATS, FORMAT_JSON, BINARY_SUFFIX, pattern_argument
+except ImportError:
+    from batch_extractor import BatchExtractor, collect_html_files
+    from parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND
+    from report_data import REPORT_FORMATS, FORMAT_JSON, BINARY_SUFFIX, pattern_argument
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='ディレクトリまたはglobパターンで指定した複数のPascal HTMLレポートを一括解析します'
+    )
+    parser.add_argument(
+        'source',
+        type=str,
+        help='HTMLファイルのあるディレクトリ、またはglobパターン（例: "input/*.html"）'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        type=str,
+        default='output/batch',
+        help='出力ディレクトリのパス（デフォルト: output/batch）'
+    )
+    parser.add_argument(
+        '--pattern',
+        type=pattern_argument,
+        default='A',
+        help='抽出するパターン（A、Bなど、デフォルト: A）'
+    )
+    parser.add_argument(
+        '--proposals',
+        type=str,
+        default=None,
+        help='すべてのレポートに適用する独自性の提案のインデックス（カンマ区切り、例: 0,1）'
+    )
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=None,
+        help='ワーカープロセス数（デフォルト: 利用可能なCPUコア数）'
+    )
+    parser.add_argument(
+        '-r', '--recursive',
+        action='store_true',
+        help='サブディレクトリ（globの場合は**）も探索する'
+    )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER_BACKEND,
+        help='HTMLパーサーのバックエンド（lxml: XPathで直接検索して高速, soup: BeautifulSoupで全体を解析, stream: 逐次解析でメモリを節約、デフォルト: lxml）'
+    )
+    parser.add_argument(
+        '--output-format',
+        type=str,
+        choices=REPORT_FORMATS,
+        default=FORMAT_JSON,
+        help=f'抽出結果のファイルの形式（json: テキストのJSON, binary: コンパクトなバイナリ形式（拡張子 {BINARY_SUFFIX}）、デフォルト: json）'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    # 独自性の提案のインデックスを解析
+    proposal_indices = []
+    if args.proposals:
+        try:
+            proposal_indices = [int(x.strip()) for x in args.proposals.split(',')]
+        except ValueError:
+            print("エラー: 提案のインデックスは数値でカンマ区切りで指定してください。")
+            sys.exit(1)
+    
+    if args.workers is not None and args.workers < 1:
+        print("エラー: ワーカー数は1以上を指定してください。")
+        sys.exit(1)
+    
+    html_files = collect_html_files(args.source, args.recursive)
+    if not html_files:
+        print(f"エラー: HTMLファイルが見つかりません: {args.source}")
+        sys.exit(1)
+    
+    extractor = BatchExtractor(
+        pattern=args.pattern,
+        proposal_indices=proposal_indices,
+        backend=args.backend,
+        max_workers=args.workers,
+        output_format=args.output_format
+    )
+    
+    print("\n" + "="*60)
+    print(f"{len(html_files)}件のレポートを解析中...（ワーカー数: {min(extractor.max_workers, len(html_files))}）")
+    print("="*60)
+    
+    def report_progress(result):
+        if result['status'] == 'ok':
+            print(f"  完了: {result['html_file']} ({result['seconds']}秒)")
+        else:
+            print(f"  失敗: {result['html_file']} - {result['error']}")
+    
+    summary = extractor.run(html_files, args.output, progress=report_progress)
+    
+    print("\n" + "="*60)
+    print("一括解析結果のサマリー")
+    print("="*60)
+    print(f"成功: {summary['succeeded']}件 / 失敗: {summary['failed']}件 / 合計: {summary['total']}件")
+    print(f"所要時間: {summary['seconds']}秒")
+    print(f"\n出力先: {Path(args.output)}")
+    print(f"サマリー: {Path(args.output) / 'summary.json'}")
+    
+    if summary['failed']:
+        sys.exit(1)
+    print("\n完了しました！")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+複数のPascal HTMLレポートをプロセスプールで一括解析するモジュール
+"""
+import glob
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .parser_backends import DEFAULT_PARSER_BACKEND, create_parser
+    from .report_data import FORMAT_JSON, FORMAT_BINARY, BINARY_SUFFIX, save_report_data
+except ImportError:
+    from parser_backends import DEFAULT_PARSER_BACKEND, create_parser
+    from report_data import FORMAT_JSON, FORMAT_BINARY, BINARY_SUFFIX, save_report_data
+
+
+# 入力がディレクトリの場合に対象とする拡張子
+HTML_SUFFIXES = ('.html', '.htm')
+
+# 一括解析のサマリーのファイル名（レポートごとの出力ファイル名には使わない）
+SUMMARY_FILE = 'summary.json'
+
+
+def collect_html_files(source: str, recursive: bool = False) -> List[Path]:
+    """
+    ディレクトリまたはglobパターンから解析対象のHTMLファイルを列挙
+    
+    Args:
+        source: ディレクトリのパス、またはglobパターン（例: input/*.html）
+        recursive: ディレクトリ指定時にサブディレクトリも探索するか
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        candidates = source_path.rglob('*') if recursive else source_path.iterdir()
+        files = [p for p in candidates if p.is_file() and p.suffix.lower() in HTML_SUFFIXES]
+    else:
+        files = [Path(p) for p in glob.glob(source, recursive=recursive) if Path(p).is_file()]
+    return sorted(files)
+
+
+def extract_report_file(html_file: str, output_file: str, pattern: str,
+                        proposal_indices: List[int], backend: str = DEFAULT_PARSER_BACKEND,
+                        output_format: str = FORMAT_JSON) -> Dict:
+    """
+    1つのレポートを解析してJSON（またはバイナリ形式）で保存（プロセスプールのワーカーで実行）
+    
+    例外は呼び出し元に伝播させず、結果のstatusとerrorに記録する。
+    """
+    started = time.perf_counter()
+    result = {
+        'html_file': html_file,
+        'output_file': output_file,
+        'pattern': pattern,
+        'status': 'ok',
+        'error': None,
+    }
+    try:
+        parser = create_parser(html_file, backend)
+        data = parser.extract_all(pattern, proposal_indices)
+        
+        save_report_data(data, output_file, output_format)
+        
+        result['h2_count'] = len(data['article_structure'])
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['output_file'] = None
+    result['seconds'] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def _output_file_names(html_files: List[Path], extension: str = '.json') -> List[str]:
+    """HTMLファイルごとに重複しない出力ファイル名を決定（summary.htmlなどでサマリーを上書きしない）"""
+    used = {SUMMARY_FILE}
+    names = []
+    for html_file in html_files:
+        name = f"{html_file.stem}{extension}"
+        suffix = 2
+        while name in used:
+            name = f"{html_file.stem}_{suffix}{extension}"
+            suffix += 1
+        used.add(name)
+        names.append(name)
+    return names
+
+
+class BatchExtractor:
+    """Pascal HTMLレポートをプロセスプールで一括解析するクラス"""
+    
+    def __init__(self, pattern: str = 'A', proposal_indices: Optional[List[int]] = None,
+                 backend: str = DEFAULT_PARSER_BACKEND, max_workers: Optional[int] = None,
+                 output_format: str = FORMAT_JSON):
+        """
+        Args:
+            pattern: 抽出するパターン（A/B）
+            proposal_indices: 選択する独自性の提案のインデックス（Noneの場合は選択しない）
+            backend: パーサーのバックエンド
+            max_workers: ワーカープロセス数（Noneの場合は利用可能なCPUコア数）
+            output_format: 抽出結果のファイルの形式（json / binary。binaryの場合、拡張子は .prd）
+        """
+        self.pattern = pattern
+        self.proposal_indices = proposal_indices or []
+        self.backend = backend
+        self.max_workers = max_workers or _available_cpu_count()
+        self.output_format = output_format
+    
+    def run(self, html_files: List[Path], output_dir: str, progress=None) -> Dict:
+        """
+        レポートを一括解析し、1レポートにつき1つのJSON（またはバイナリ形式のファイル）とサマリーを保存
+        
+        Args:
+            html_files: 解析するHTMLファイルのリスト
+            output_dir: 出力ディレクトリ
+            progress: 1件完了するごとに結果のdictを渡して呼ばれる関数（任意）
+        
+        Returns:
+            サマリー（summary.jsonと同じ内容）
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        
+        started = time.perf_counter()
+        results = []
+        output_names = _output_file_names(
+            html_files, BINARY_SUFFIX if self.output_format == FORMAT_BINARY else '.json'
+        )
+        workers = max(1, min(self.max_workers, len(html_files)))
+        
+        # ワーカープロセスが異常終了する（メモリ不足で強制終了されるなど）とプール全体が使えなくなり、
+        # 実行中・待機中のファイルもすべて失敗になる。そのため、終わらなかったファイルを新しいプールで
+        # 1件ずつ実行し直して異常終了の原因のファイルだけを失敗として記録し、残りは並列の実行に戻す
+        pending = [
+            (html_file, str(output_path / output_name))
+            for html_file, output_name in zip(html_files, output_names)
+        ]
+        parallel = True
+        while pending:
+            unfinished = self._run_pool(pending, workers if parallel else 1, results, progress)
+            if not unfinished:
+                break
+            if parallel:
+                parallel = False
+                pending = unfinished
+                continue
+            # 1件ずつ実行した場合、最初に終わらなかったファイルがワーカーを異常終了させたもの
+            crashed_file, _ = unfinished[0]
+            result = self._error_result(crashed_file, "BrokenProcessPool: ワーカープロセスが異常終了しました")
+            results.append(result)
+            if progress:
+                progress(result)
+            pending = unfinished[1:]
+            parallel = True
+        
+        results.sort(key=lambda r: r['html_file'])
+        succeeded = sum(1 for r in results if r['status'] == 'ok')
+        summary = {
+            'total': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'workers': workers,
+            'seconds': round(time.perf_counter() - started, 4),
+            'results': results,
+        }
+        
+        with open(output_path / SUMMARY_FILE, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        
+        return summary
+    
+    def _run_pool(self, tasks: List[Tuple[Path, str]], workers: int, results: List[Dict],
+                  progress=None) -> List[Tuple[Path, str]]:
+        """
+        1つのプロセスプールで (HTMLファイル, 出力ファイル) を解析し、結果をresultsに追加
+        
+        Returns:
+            プールが異常終了したために終わらなかったタスク（投入した順）
+        """
+        # concurrent.futuresは実行するときに初めて読み込む（CLIの起動時間を増やさないため）
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from concurrent.futures.process import BrokenProcessPool
+        
+        unfinished = set()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for index, (html_file, output_file) in enumerate(tasks):
+                try:
+                    future = executor.submit(
+                        extract_report_file,
+                        str(html_file),
+                        output_file,
+                        self.pattern,
+                        self.proposal_indices,
+                        self.backend,
+                        self.output_format
+                    )
+                except BrokenProcessPool:
+                    unfinished.update(range(index, len(tasks)))
+                    break
+                futures[future] = index
+            
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    unfinished.add(index)
+                    continue
+                except Exception as e:
+                    result = self._error_result(tasks[index][0], f"{type(e).__name__}: {e}")
+                results.append(result)
+                if progress:
+                    progress(result)
+        return [tasks[index] for index in sorted(unfinished)]
+    
+    def _error_result(self, html_file: Path, error: str) -> Dict:
+        """ファイル単位の失敗の結果"""
+        return {
+            'html_file': str(html_file),
+            'output_file': None,
+            'pattern': self.pattern,
+            'status': 'error',
+            'error': error,
+            'seconds': None,
+        }
+
+
+def _available_cpu_count() -> int:
+    """このプロセスが利用できるCPUコア数を取得"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
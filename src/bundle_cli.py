@@ -0,0 +1,88 @@
+"""
+バンドルファイル（記事の雛形とプロンプトをまとめたSQLiteファイル）のコマンドラインインターフェース
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .article_bundle import ArticleBundle
+except ImportError:
+    from article_bundle import ArticleBundle
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='バンドルファイルのメンバーを一覧・表示・ディレクトリに書き出します'
+    )
+    parser.add_argument(
+        'bundle_file',
+        type=str,
+        help='バンドルファイルのパス'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    # list: メンバーの一覧
+    list_parser = subparsers.add_parser('list', help='メンバーの一覧を表示')
+    list_parser.add_argument('--kind', type=str, default=None,
+                             help='種別で絞り込む（h1, h2, h3, pascal, experience, prompt, metadata, source）')
+    list_parser.add_argument('--phase', type=str, default=None, help='フェーズで絞り込む（例: phase2）')
+    
+    # show: メンバーの内容を表示
+    show_parser = subparsers.add_parser('show', help='メンバーの内容を表示')
+    show_parser.add_argument('name', type=str, nargs='?', default=None,
+                             help='メンバー名（例: content/h2-1_.../pascal_h2-1.md）')
+    show_parser.add_argument('--kind', type=str, default=None, help='種別で指定')
+    show_parser.add_argument('--phase', type=str, default=None, help='フェーズで指定（例: phase2）')
+    show_parser.add_argument('--h2', type=int, default=None, help='H2番号で指定')
+    show_parser.add_argument('--h3', type=int, default=None, help='H3番号で指定')
+    
+    # export: ディレクトリ構成に書き出し
+    export_parser = subparsers.add_parser('export', help='従来のディレクトリ構成に書き出す')
+    export_parser.add_argument('output_dir', type=str, help='書き出し先のディレクトリ')
+    export_parser.add_argument('--prefix', type=str, default='',
+                               help='このパス以下のメンバーだけを書き出す（例: content/）')
+    
+    args = parser.parse_args(argv)
+    
+    bundle_path = Path(args.bundle_file)
+    if not bundle_path.exists():
+        print(f"エラー: バンドルファイルが見つかりません: {bundle_path}")
+        sys.exit(1)
+    
+    with ArticleBundle(str(bundle_path)) as bundle:
+        if args.command == 'list':
+            members = bundle.find(kind=args.kind, phase=args.phase)
+            for member in members:
+                print(f"{member['size']:>8}  {member['name']}")
+            print(f"\n{len(members)}件")
+        
+        elif args.command == 'show':
+            if args.name:
+                content = bundle.read(args.name)
+                if content is None:
+                    print(f"エラー: メンバーが見つかりません: {args.name}")
+                    sys.exit(1)
+            else:
+                members = bundle.find(kind=args.kind, phase=args.phase,
+                                      h2_index=args.h2, h3_index=args.h3)
+                if not members:
+                    print("エラー: 条件に合うメンバーが見つかりません。")
+                    sys.exit(1)
+                if len(members) > 1:
+                    print(f"エラー: 条件に合うメンバーが{len(members)}件あります。条件を追加してください:")
+                    for member in members:
+                        print(f"  {member['name']}")
+                    sys.exit(1)
+                content = bundle.read(members[0]['name'])
+            print(content)
+        
+        elif args.command == 'export':
+            stats = bundle.export(args.output_dir, args.prefix)
+            print(f"{stats['files']}件のファイルを書き出しました: {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+記事のカタログ（生成した記事の目録）のコマンドラインインターフェース
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .article_catalog import DEFAULT_OUTPUT_ROOT, ArticleCatalog
+except ImportError:
+    from article_catalog import DEFAULT_OUTPUT_ROOT, ArticleCatalog
+
+
+def print_articles(articles: List[Dict]):
+    """記事の一覧を1行ずつ表示"""
+    for article in articles:
+        print(f"{article['article_id']}  [{article['pattern']}]  H2:{article['h2_count']:>3}  {article['location']}")
+    print(f"\n{len(articles)}件")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='生成した記事のカタログから、記事を一覧・検索・表示します'
+    )
+    parser.add_argument(
+        '--root',
+        type=str,
+        default=DEFAULT_OUTPUT_ROOT,
+        help=f'カタログのある記事IDのルートディレクトリ（article/pipelineの--id-root、省略した場合は -o の出力ディレクトリ。デフォルト: {DEFAULT_OUTPUT_ROOT}）'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    # list: 記事の一覧
+    list_parser = subparsers.add_parser('list', help='記事の一覧を作成日時の新しい順に表示')
+    list_parser.add_argument('--pattern', type=str, default=None, help='パターンで絞り込む（例: A）')
+    list_parser.add_argument('--since', type=str, default=None,
+                             help='この日時以降に作成された記事に絞り込む（ISO形式、例: 2024-01-01）')
+    list_parser.add_argument('--limit', type=int, default=None, help='表示する最大件数')
+    
+    # find: 条件で検索
+    find_parser = subparsers.add_parser('find', help='記事ID・タイトル・元のHTMLなどで検索')
+    find_parser.add_argument('--id', type=str, default=None, dest='article_id',
+                             help='記事IDの先頭（例: 20240101 で、その日の記事）')
+    find_parser.add_argument('--title', type=str, default=None, help='H1タイトルに含まれる文字列')
+    find_parser.add_argument('--source-html', type=str, default=None, help='元のHTMLファイルのパス')
+    find_parser.add_argument('--source-hash', type=str, default=None, help='抽出データのハッシュ')
+    find_parser.add_argument('--pattern', type=str, default=None, help='パターン（例: A）')
+    find_parser.add_argument('--limit', type=int, default=None, help='表示する最大件数')
+    
+    # show: 記事の登録内容を表示
+    show_parser = subparsers.add_parser('show', help='記事の登録内容をJSONで表示')
+    show_parser.add_argument('article_id', type=str, help='記事ID')
+    
+    # rebuild: 既存の記事から作り直す
+    rebuild_parser = subparsers.add_parser(
+        'rebuild', help='既存の記事ディレクトリ・バンドルファイルを走査してカタログを作り直す'
+    )
+    rebuild_parser.add_argument('--scan', type=str, default=None,
+                                help='走査するディレクトリ（デフォルト: --rootと同じ）')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command != 'rebuild' and not ArticleCatalog.exists(args.root):
+        print(f"エラー: カタログが見つかりません: {args.root}（rebuild で既存の記事から作成できます）")
+        sys.exit(1)
+    
+    with ArticleCatalog(args.root) as catalog:
+        if args.command == 'list':
+            print_articles(catalog.find(pattern=args.pattern, since=args.since, limit=args.limit))
+        
+        elif args.command == 'find':
+            if not any([args.article_id, args.title, args.source_html, args.source_hash, args.pattern]):
+                print("エラー: 検索条件を1つ以上指定してください（--id, --title, --source-html, --source-hash, --pattern）。")
+                sys.exit(1)
+            print_articles(catalog.find(
+                article_id_prefix=args.article_id,
+                title=args.title,
+                pattern=args.pattern,
+                source_html=args.source_html,
+                source_hash=args.source_hash,
+                limit=args.limit
+            ))
+        
+        elif args.command == 'show':
+            article = catalog.get(args.article_id)
+            if article is None:
+                print(f"エラー: 記事が見つかりません: {args.article_id}")
+                sys.exit(1)
+            print(json.dumps(article, ensure_ascii=False, indent=2))
+        
+        elif args.command == 'rebuild':
+            count = catalog.rebuild(args.scan)
+            print(f"{count}件の記事をカタログに登録しました: {catalog.catalog_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,16 +2,27 @@
 Pascal HTML解析のコマンドラインインターフェース
 """
 import argparse
-import json
 import sys
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 # 相対インポートと絶対インポートの両方に対応
 try:
     from .pascal_parser import PascalParser
+    from .parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND, create_parser
+    from .extraction_cache import ExtractionCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE_MB
+    from .profiling import stage, add_profile_arguments, start_profile, finish_profile
+    from .report_data import ALL_PATTERNS, REPORT_FORMATS, FORMAT_BINARY, BINARY_SUFFIX, pattern_selection_argument, save_report_data
+    from .keyword_index import KeywordIndex
+    from .similarity import SimilarityIndex, format_similar_articles
 except ImportError:
     from pascal_parser import PascalParser
+    from parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND, create_parser
+    from extraction_cache import ExtractionCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE_MB
+    from profiling import stage, add_profile_arguments, start_profile, finish_profile
+    from report_data import ALL_PATTERNS, REPORT_FORMATS, FORMAT_BINARY, BINARY_SUFFIX, pattern_selection_argument, save_report_data
+    from keyword_index import KeywordIndex
+    from similarity import SimilarityIndex, format_similar_articles
 
 
 def print_pattern_info(patterns: dict):
@@ -44,11 +55,14 @@ def select_pattern(parser: PascalParser) -> str:
     
     print_pattern_info(patterns)
     
+    choices = '/'.join(list(patterns) + [ALL_PATTERNS])
     while True:
-        choice = input("\nパターンを選択してください (A/B): ").strip().upper()
-        if choice in patterns:
-            return choice
-        print("無効な選択です。AまたはBを入力してください。")
+        choice = input(f"\nパターンを選択してください ({choices}): ").strip()
+        if choice.lower() == ALL_PATTERNS:
+            return ALL_PATTERNS
+        if choice.upper() in patterns:
+            return choice.upper()
+        print(f"無効な選択です。{choices}のいずれかを入力してください。")
 
 
 def select_proposals(parser: PascalParser) -> List[int]:
@@ -82,16 +96,14 @@ def select_proposals(parser: PascalParser) -> List[int]:
             print("エラー: 数値を入力してください（カンマ区切り）。")
 
 
-def save_output(data: dict, output_path: Path):
-    """結果をJSONファイルに保存"""
-    # 出力ディレクトリが存在しない場合は作成
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"\n結果を保存しました: {output_path}")
+def save_output(data: dict, output_path: Path, output_format: Optional[str] = None):
+    """結果をファイルに保存（形式の指定がなければ拡張子で決定。.prdならバイナリ形式、それ以外はJSON）"""
+    # 出力ディレクトリが存在しない場合は作成される
+    saved_format = save_report_data(data, output_path, output_format)
+    print(f"\n結果を保存しました: {output_path}" + ("（バイナリ形式）" if saved_format == FORMAT_BINARY else ""))
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(
         description='Pascal SEOツールのHTMLレポートを解析して情報を抽出します'
     )
@@ -104,14 +116,20 @@ def main():
         '-o', '--output',
         type=str,
         default=None,
-        help='出力ファイルのパス（デフォルト: output/extracted_data.json）'
+        help=f'出力ファイルのパス（デフォルト: output/extracted_data.json、バイナリ形式の場合は output/extracted_data{BINARY_SUFFIX}）'
     )
     parser.add_argument(
-        '--pattern',
+        '--output-format',
         type=str,
-        choices=['A', 'B'],
+        choices=REPORT_FORMATS,
+        default=None,
+        help=f'出力ファイルの形式（json: テキストのJSON, binary: コンパクトなバイナリ形式。指定しない場合は拡張子で決定し、{BINARY_SUFFIX}ならbinary）'
+    )
+    parser.add_argument(
+        '--pattern',
+        type=pattern_selection_argument,
         default=None,
-        help='パターンを直接指定（指定しない場合は対話的に選択）'
+        help='パターンを直接指定（A、Bなど。allで全パターンを1回の解析で出力。指定しない場合は対話的に選択）'
     )
     parser.add_argument(
         '--proposals',
@@ -119,8 +137,51 @@ def main():
         default=None,
         help='独自性の提案のインデックス（カンマ区切り、例: 0,1,2）'
     )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER_BACKEND,
+        help='HTMLパーサーのバックエンド（lxml: XPathで直接検索して高速, soup: BeautifulSoupで全体を解析, stream: 逐次解析でメモリを節約、デフォルト: lxml）'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='解析結果のキャッシュを使わずにHTMLを解析する'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f'解析結果のキャッシュディレクトリ（デフォルト: {DEFAULT_CACHE_DIR}）'
+    )
+    parser.add_argument(
+        '--cache-size-mb',
+        type=float,
+        default=DEFAULT_CACHE_SIZE_MB,
+        help=f'キャッシュの最大サイズ（MB、デフォルト: {DEFAULT_CACHE_SIZE_MB}）。超えた分は古いものから削除'
+    )
+    parser.add_argument(
+        '--keyword-index',
+        type=str,
+        default=None,
+        help='抽出結果のキーワードを追加する転置索引ファイルのパス（src.keyword_cliで検索）'
+    )
+    parser.add_argument(
+        '--similar-index',
+        type=str,
+        default=None,
+        help='記事構成の類似度の索引ファイルのパス。指定すると、似ている既存の記事を表示してから抽出結果を索引に追加する'
+    )
+    parser.add_argument(
+        '--similar-top-k',
+        type=int,
+        default=5,
+        help='表示する似ている記事の数（パターンごと、デフォルト: 5）'
+    )
+    add_profile_arguments(parser)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # HTMLファイルの存在確認
     html_path = Path(args.html_file)
@@ -128,9 +189,19 @@ def main():
         print(f"エラー: ファイルが見つかりません: {html_path}")
         sys.exit(1)
     
-    # パーサーを初期化
+    profiler = start_profile(args)
+    
+    # パーサーを初期化（キャッシュがあればHTMLの解析を省略）
     try:
-        pascal_parser = PascalParser(str(html_path))
+        with stage('parse', bytes=html_path.stat().st_size):
+            if args.no_cache:
+                pascal_parser = create_parser(str(html_path), args.backend)
+            else:
+                cache = ExtractionCache(args.cache_dir, args.cache_size_mb)
+                pascal_parser = cache.load_report(
+                    str(html_path),
+                    lambda path: create_parser(path, args.backend)
+                )
     except Exception as e:
         print(f"エラー: HTMLファイルの読み込みに失敗しました: {e}")
         sys.exit(1)
@@ -140,7 +211,10 @@ def main():
         pattern = args.pattern
         # パターンの存在確認
         patterns = pascal_parser.extract_patterns()
-        if pattern not in patterns:
+        if pattern == ALL_PATTERNS and not patterns:
+            print("エラー: パターンが見つかりませんでした。")
+            sys.exit(1)
+        if pattern != ALL_PATTERNS and pattern not in patterns:
             print(f"エラー: パターン{pattern}が見つかりません。")
             sys.exit(1)
     else:
@@ -158,7 +232,11 @@ def main():
     
     # データを抽出
     try:
-        result = pascal_parser.extract_all(pattern, proposal_indices)
+        with stage('extract'):
+            if pattern == ALL_PATTERNS:
+                result = pascal_parser.extract_all_patterns(proposal_indices)
+            else:
+                result = pascal_parser.extract_all(pattern, proposal_indices)
     except Exception as e:
         print(f"エラー: データの抽出に失敗しました: {e}")
         sys.exit(1)
@@ -167,8 +245,13 @@ def main():
     print("\n" + "="*60)
     print("抽出結果のサマリー")
     print("="*60)
-    print(f"選択したパターン: {result['pattern']}")
-    print(f"H2の数: {len(result['article_structure'])}")
+    if pattern == ALL_PATTERNS:
+        print(f"選択したパターン: すべて（{', '.join(result['patterns'])}）")
+        for pattern_key, article_structure in result['patterns'].items():
+            print(f"H2の数（パターン{pattern_key}）: {len(article_structure)}")
+    else:
+        print(f"選択したパターン: {result['pattern']}")
+        print(f"H2の数: {len(result['article_structure'])}")
     print(f"選択した独自性の提案: {len(result['originality_proposals'])}件")
     
     # 出力ファイルのパスを決定
@@ -177,10 +260,37 @@ def main():
     else:
         output_dir = Path('output')
         output_dir.mkdir(exist_ok=True)
-        output_path = output_dir / 'extracted_data.json'
+        suffix = BINARY_SUFFIX if args.output_format == FORMAT_BINARY else '.json'
+        output_path = output_dir / f'extracted_data{suffix}'
     
     # 結果を保存
-    save_output(result, output_path)
+    with stage('json_write', files=1):
+        save_output(result, output_path, args.output_format)
+    
+    # キーワードの転置索引を更新（同じ出力先の前回の抽出結果は入れ替える）
+    if args.keyword_index:
+        try:
+            with stage('keyword_index'):
+                with KeywordIndex(args.keyword_index) as index:
+                    index.add_data(str(output_path), result, report=str(html_path), file_stat=output_path.stat())
+        except Exception as e:
+            print(f"エラー: キーワードの索引の更新に失敗しました: {e}")
+            sys.exit(1)
+        print(f"キーワードの索引を更新しました: {args.keyword_index}")
+    
+    # 記事構成が似ている既存の記事を表示し、類似度の索引に追加（同じ出力先の前回の抽出結果は入れ替える）
+    if args.similar_index:
+        try:
+            with stage('similarity'):
+                with SimilarityIndex(args.similar_index) as index:
+                    similar_articles = index.query(result, top_k=args.similar_top_k, exclude_source=str(output_path))
+                    index.add_data(str(output_path), result, report=str(html_path), file_stat=output_path.stat())
+        except Exception as e:
+            print(f"エラー: 類似度の索引の更新に失敗しました: {e}")
+            sys.exit(1)
+        print(format_similar_articles(similar_articles))
+    
+    finish_profile(profiler, args)
     
     print("\n完了しました！")
 
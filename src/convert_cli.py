@@ -0,0 +1,121 @@
+"""
+抽出データのファイルをJSON・バイナリ形式（.prd）の間で変換するコマンドラインインターフェース
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .report_data import (
+        FORMAT_BINARY, BINARY_SUFFIX, REPORT_FORMATS,
+        detect_report_format, dumps_report_data, is_report_data, iter_report_sources, loads_report_data
+    )
+except ImportError:
+    from report_data import (
+        FORMAT_BINARY, BINARY_SUFFIX, REPORT_FORMATS,
+        detect_report_format, dumps_report_data, is_report_data, iter_report_sources, loads_report_data
+    )
+
+
+def destination_path(json_file: Path, root: Path, report_format: str, output_dir: Optional[str]) -> Path:
+    """
+    変換後のファイルのパス
+    
+    出力ディレクトリの指定がなければ元のファイルと同じディレクトリ、指定があれば
+    その下に（ディレクトリを指定した場合はその中の相対パスのまま）、拡張子を変えて保存する。
+    """
+    suffix = BINARY_SUFFIX if report_format == FORMAT_BINARY else '.json'
+    if output_dir is None:
+        return json_file.with_suffix(suffix)
+    relative = json_file.relative_to(root) if root.is_dir() else Path(json_file.name)
+    return Path(output_dir) / relative.with_suffix(suffix)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='抽出データのファイルを、テキストのJSONとコンパクトなバイナリ形式（.prd）の間で変換します'
+    )
+    parser.add_argument(
+        'paths',
+        nargs='+',
+        help='抽出データのファイル、またはディレクトリ（その下の*.json・*.prdをすべて変換。記事ディレクトリは除く）'
+    )
+    parser.add_argument(
+        '--to',
+        type=str,
+        choices=REPORT_FORMATS,
+        default=FORMAT_BINARY,
+        help='変換後の形式（デフォルト: binary）'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        type=str,
+        default=None,
+        help='出力ディレクトリ（デフォルト: 元のファイルと同じディレクトリに、拡張子を変えて保存）'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    missing = [path for path in args.paths if not Path(path).exists()]
+    if missing:
+        print(f"エラー: ファイルが見つかりません: {', '.join(missing)}")
+        sys.exit(1)
+    
+    converted = 0
+    skipped = 0
+    failed = 0
+    source_bytes = 0
+    converted_bytes = 0
+    for path in args.paths:
+        root = Path(path)
+        for _, json_file, article in iter_report_sources(path):
+            # 記事ディレクトリのsource.jsonはJSONのまま残す
+            if article:
+                continue
+            try:
+                with open(json_file, 'rb') as f:
+                    payload = f.read()
+                json_data = loads_report_data(payload)
+            except (OSError, ValueError) as e:
+                print(f"  失敗: {json_file} - {e}")
+                failed += 1
+                continue
+            if not is_report_data(json_data) or detect_report_format(payload) == args.to:
+                skipped += 1
+                continue
+            
+            output_file = destination_path(json_file, root, args.to, args.output)
+            try:
+                converted_payload = dumps_report_data(json_data, args.to)
+                # 書き込む前に、変換したデータを読み戻して元のデータと一致することを確認する
+                if loads_report_data(converted_payload) != json_data:
+                    raise ValueError("変換したデータを読み戻すと元のデータと一致しません")
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(output_file, 'wb') as f:
+                    f.write(converted_payload)
+            except (OSError, TypeError, ValueError) as e:
+                print(f"  失敗: {json_file} - {e}")
+                failed += 1
+                continue
+            
+            print(f"  {json_file} -> {output_file} ({len(payload):,} → {len(converted_payload):,}バイト)")
+            converted += 1
+            source_bytes += len(payload)
+            converted_bytes += len(converted_payload)
+    
+    print("\n" + "="*60)
+    print("変換結果のサマリー")
+    print("="*60)
+    print(f"変換: {converted}件 / 抽出データ以外・変換済み: {skipped}件 / 失敗: {failed}件")
+    if converted:
+        print(f"サイズ: {source_bytes:,}バイト → {converted_bytes:,}バイト"
+              f"（{converted_bytes / source_bytes:.1%}）")
+    
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Pascal HTMLレポートの解析結果をディスクにキャッシュするモジュール
+
+キャッシュのキーはHTMLの内容のハッシュとパーサーのバージョン。
+全パターン・全H1候補・全提案を保存するため、パターンや提案の選択を
+変えて再実行してもHTMLを再解析する必要がない。
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .pascal_parser import PARSER_VERSION, ParsedReport
+except ImportError:
+    from pascal_parser import PARSER_VERSION, ParsedReport
+
+
+DEFAULT_CACHE_DIR = 'output/.cache/extraction'
+DEFAULT_CACHE_SIZE_MB = 256
+
+
+def hash_file(file_path: str) -> str:
+    """ファイル内容のSHA-256ハッシュを計算"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """解析結果をHTMLのハッシュをキーにしてディスクに保存するクラス（LRUで容量を制限）"""
+    
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_size_mb: float = DEFAULT_CACHE_SIZE_MB):
+        """
+        Args:
+            cache_dir: キャッシュディレクトリのパス
+            max_size_mb: キャッシュの最大サイズ（MB）。超えた場合は最も古く使われたものから削除
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+    
+    def _entry_path(self, content_hash: str) -> Path:
+        """キャッシュエントリのファイルパス"""
+        return self.cache_dir / f"{content_hash}-v{PARSER_VERSION}.json"
+    
+    def get(self, content_hash: str) -> Optional[ParsedReport]:
+        """キャッシュから解析結果を取得（存在しない場合はNone）"""
+        entry_path = self._entry_path(content_hash)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(entry, dict) or not isinstance(entry.get('report'), dict):
+            return None
+        if entry.get('parser_version') != PARSER_VERSION or entry.get('html_sha256') != content_hash:
+            return None
+        
+        # 最終使用日時を更新（LRUの判定に使用）
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        try:
+            return ParsedReport.from_dict(entry['report'])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            # 壊れたエントリはキャッシュにないものとして扱う
+            return None
+    
+    def put(self, content_hash: str, report: ParsedReport) -> bool:
+        """
+        解析結果をキャッシュに保存し、容量を超えた分を削除
+        
+        キャッシュは任意のため、ディレクトリが読み取り専用・容量不足などで書き込めない場合は
+        保存せずにFalseを返す（解析結果はそのまま使える）。
+        """
+        entry = {
+            'parser_version': PARSER_VERSION,
+            'html_sha256': content_hash,
+            'report': report.to_dict()
+        }
+        
+        # 一時ファイルに書き込んでから置き換える（書き込み途中のエントリを読まないように）
+        entry_path = self._entry_path(content_hash)
+        temp_path = entry_path.with_name(f".{entry_path.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, entry_path)
+            self._evict(keep=entry_path)
+        except OSError:
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+            return False
+        return True
+    
+    def _evict(self, keep: Path):
+        """最大サイズを超えている場合、最終使用日時が古いエントリから削除"""
+        entries = []
+        total_size = 0
+        for entry_path in self.cache_dir.glob('*.json'):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total_size += stat.st_size
+        
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            if entry_path == keep:
+                continue
+            try:
+                entry_path.unlink()
+            except OSError:
+                continue
+            total_size -= size
+    
+    def load_report(self, html_file: str, parser_factory) -> ParsedReport:
+        """
+        キャッシュから解析結果を取得し、なければ解析してキャッシュに保存
+        
+        Args:
+            html_file: Pascal HTMLファイルのパス
+            parser_factory: HTMLファイルのパスを受け取ってパーサーを返す関数
+        """
+        content_hash = hash_file(html_file)
+        report = self.get(content_hash)
+        if report is None:
+            report = parser_factory(html_file).extract_report()
+            self.put(content_hash, report)
+        return report
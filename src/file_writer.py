@@ -0,0 +1,301 @@
+"""
+生成するファイルをまとめて書き込むモジュール
+
+書き込むファイルの(パス, 内容)を先にすべてメモリ上に組み立て（WritePlan）、
+スレッドプールで一括して書き込む。ネットワークストレージなど、
+ファイルごとのopen/closeの待ち時間が大きい環境向け。
+"""
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# 書き込みスレッド数の上限
+DEFAULT_MAX_WRITE_WORKERS = 16
+
+
+def write_file_atomic(file_path: Path, content: str):
+    """一時ファイルに書き込んでから置き換える（書き込み途中のファイルを残さない）"""
+    file_path = Path(file_path)
+    temp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+
+def content_hash(content: str) -> str:
+    """文字列（UTF-8）のSHA-256ハッシュ"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def file_hash(file_path: Path) -> str:
+    """
+    ファイル内容のSHA-256ハッシュ
+    
+    OSの改行コードは\nに戻して計算するため、encode_textで書き込んだファイルは
+    書き込んだ文字列のcontent_hashと一致する。
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if os.linesep != '\n':
+        data = data.replace(os.linesep.encode('ascii'), b'\n')
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_text(content: str) -> bytes:
+    """ファイルに書き込むバイト列（テキストモードのopenと同じく、改行をOSの改行コードにしてUTF-8で符号化）"""
+    if os.linesep != '\n':
+        content = content.replace('\n', os.linesep)
+    return content.encode('utf-8')
+
+
+class WritePlan:
+    """書き込むファイルの一覧（ルートディレクトリからの相対パスと内容）"""
+    
+    def __init__(self):
+        self.files: Dict[str, str] = {}
+        # ファイルごとの付加情報（種別・フェーズ・H2/H3番号など。アーカイブの索引に使用）
+        self.attributes: Dict[str, Dict[str, any]] = {}
+    
+    def add(self, relative_path: str, content: str, **attributes):
+        """
+        ファイルを追加（同じパスを追加した場合は後の内容で上書き）
+        
+        Args:
+            relative_path: ルートディレクトリからの相対パス
+            content: ファイルの内容
+            attributes: 付加情報（kind, phase, h2_index, h3_index など）
+        """
+        self.files[str(relative_path)] = content
+        self.attributes[str(relative_path)] = attributes
+    
+    def __len__(self) -> int:
+        return len(self.files)
+    
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return iter(self.files.items())
+    
+    def commit(self, root_dir: str, max_workers: Optional[int] = None,
+               skip_unchanged: bool = False) -> Dict[str, any]:
+        """
+        root_dirに全ファイルを書き込む
+        
+        ディレクトリは書き込みの前に1回ずつだけ作成し、ファイルの書き込みは
+        スレッドプールで並列に行う。
+        
+        Args:
+            root_dir: 書き込み先のディレクトリ
+            max_workers: 書き込みスレッド数
+            skip_unchanged: 既存ファイルと内容のハッシュが同じ場合は書き込まない
+        
+        Returns:
+            書き込み結果（files: 書き込んだファイル数, skipped: 省略したファイル数,
+            bytes: 書き込んだバイト数, seconds: 所要時間）
+        """
+        started = time.perf_counter()
+        root_path = Path(root_dir)
+        
+        targets = [(root_path / relative_path, content) for relative_path, content in self.files.items()]
+        
+        # 必要なディレクトリをまとめて作成
+        directories = {file_path.parent for file_path, _ in targets}
+        directories.add(root_path)
+        for directory in sorted(directories, key=lambda d: len(d.parts)):
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        written_files = 0
+        written_bytes = 0
+        if targets:
+            # concurrent.futures（logging等を含む）は書き込むときに初めて読み込む
+            from concurrent.futures import ThreadPoolExecutor
+            
+            write = _write_file_if_changed if skip_unchanged else _write_file
+            workers = min(max_workers or DEFAULT_MAX_WRITE_WORKERS, len(targets))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for size in executor.map(write, targets):
+                    if size is not None:
+                        written_files += 1
+                        written_bytes += size
+        
+        return {
+            'files': written_files,
+            'skipped': len(targets) - written_files,
+            'bytes': written_bytes,
+            'seconds': round(time.perf_counter() - started, 4),
+        }
+    
+    def manifest(self) -> Dict[str, str]:
+        """各ファイルの内容のハッシュ（相対パス → SHA-256）"""
+        return {
+            relative_path: content_hash(content)
+            for relative_path, content in self.files.items()
+        }
+    
+    def sync(self, root_dir: str, previous_manifest: Dict[str, str],
+             max_workers: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        前回書き込んだ内容のハッシュ（previous_manifest）と比較して、変わったファイルだけを書き込む
+        
+        - 新しく増えたファイルは作成する
+        - 前回から内容が変わったファイルは、前回書き込んだまま編集されていなければ更新する
+        - 計画からなくなったファイルは、前回書き込んだまま編集されていなければ削除する
+        - 編集されているファイルは上書き・削除せずに残す
+        
+        Returns:
+            結果（created, updated, retired, unchanged, kept: それぞれ相対パスのリスト）
+        """
+        root_path = Path(root_dir)
+        result = {'created': [], 'updated': [], 'retired': [], 'unchanged': [], 'kept': []}
+        to_write = WritePlan()
+        
+        for relative_path, content in self.files.items():
+            file_path = root_path / relative_path
+            new_hash = content_hash(content)
+            previous_hash = previous_manifest.get(relative_path)
+            
+            if not file_path.exists():
+                to_write.add(relative_path, content)
+                result['created'].append(relative_path)
+            elif previous_hash == new_hash:
+                result['unchanged'].append(relative_path)
+            else:
+                current_hash = file_hash(file_path)
+                if current_hash == new_hash:
+                    result['unchanged'].append(relative_path)
+                elif current_hash == previous_hash:
+                    to_write.add(relative_path, content)
+                    result['updated'].append(relative_path)
+                else:
+                    # 編集済み、または前回の記録がないファイルは上書きしない
+                    result['kept'].append(relative_path)
+        
+        to_write.commit(str(root_path), max_workers)
+        
+        # 計画からなくなったファイルを削除
+        retired_dirs = set()
+        for relative_path, previous_hash in previous_manifest.items():
+            if relative_path in self.files:
+                continue
+            file_path = root_path / relative_path
+            if not file_path.exists():
+                continue
+            if file_hash(file_path) == previous_hash:
+                file_path.unlink()
+                result['retired'].append(relative_path)
+                retired_dirs.add(file_path.parent)
+            else:
+                result['kept'].append(relative_path)
+        
+        # 削除によって空になったディレクトリを削除
+        for directory in sorted(retired_dirs, key=lambda d: len(d.parts), reverse=True):
+            while directory != root_path and root_path in directory.parents:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    break
+                directory = directory.parent
+        
+        return result
+    
+    def commit_atomic(self, target_dir: str, max_workers: Optional[int] = None,
+                      keep_existing: bool = True) -> Dict[str, any]:
+        """
+        一時ディレクトリに全ファイルを書き込んでから、target_dirと入れ替える
+        
+        書き込みの途中で失敗・中断しても、target_dirが作りかけの状態になることはない。
+        
+        Args:
+            target_dir: 書き込み先のディレクトリ
+            max_workers: 書き込みスレッド数
+            keep_existing: target_dirにある、計画に含まれないファイルを引き継ぐか
+        
+        Returns:
+            書き込み結果（commitと同じ形式）
+        """
+        target_path = Path(target_dir)
+        parent_path = target_path.parent
+        parent_path.mkdir(parents=True, exist_ok=True)
+        
+        backup_path = parent_path / f".{target_path.name}.old"
+        _recover_interrupted_swap(target_path, backup_path)
+        
+        staging_path = parent_path / f".{target_path.name}.tmp-{uuid.uuid4().hex}"
+        try:
+            stats = self.commit(str(staging_path), max_workers)
+            if keep_existing and target_path.exists():
+                _carry_over_existing(target_path, staging_path, set(self.files))
+            
+            # 既存のディレクトリを退避してから入れ替える
+            if target_path.exists():
+                os.rename(target_path, backup_path)
+            os.rename(staging_path, target_path)
+        except BaseException:
+            shutil.rmtree(staging_path, ignore_errors=True)
+            _recover_interrupted_swap(target_path, backup_path)
+            raise
+        
+        shutil.rmtree(backup_path, ignore_errors=True)
+        return stats
+
+
+def _write_file(target: Tuple[Path, str]) -> int:
+    """1ファイルを書き込み、書き込んだバイト数を返す"""
+    file_path, content = target
+    data = encode_text(content)
+    with open(file_path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def _write_file_if_changed(target: Tuple[Path, str]) -> Optional[int]:
+    """既存ファイルと内容のハッシュが異なる場合だけ書き込む（書き込まなかった場合はNone）"""
+    file_path, content = target
+    data = encode_text(content)
+    try:
+        if file_path.stat().st_size == len(data):
+            with open(file_path, 'rb') as f:
+                existing_hash = hashlib.sha256(f.read()).digest()
+            if existing_hash == hashlib.sha256(data).digest():
+                return None
+    except OSError:
+        pass
+    with open(file_path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def _carry_over_existing(source_dir: Path, staging_dir: Path, planned: set):
+    """既存ディレクトリにあって計画にないファイル・ディレクトリを一時ディレクトリへ引き継ぐ"""
+    for source_file in source_dir.rglob('*'):
+        relative_path = source_file.relative_to(source_dir)
+        if source_file.is_dir():
+            # 空のディレクトリ（画像用など）も引き継ぐ
+            (staging_dir / relative_path).mkdir(parents=True, exist_ok=True)
+            continue
+        if str(relative_path) in planned:
+            continue
+        staged_file = staging_dir / relative_path
+        staged_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # 同じファイルシステム上ならハードリンクでコピーを省略
+            os.link(source_file, staged_file)
+        except OSError:
+            shutil.copy2(source_file, staged_file)
+
+
+def _recover_interrupted_swap(target_path: Path, backup_path: Path):
+    """入れ替えの途中で中断された場合、退避したディレクトリを元に戻す"""
+    if backup_path.exists():
+        if target_path.exists():
+            shutil.rmtree(backup_path, ignore_errors=True)
+        else:
+            os.rename(backup_path, target_path)
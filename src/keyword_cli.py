@@ -0,0 +1,113 @@
+"""
+キーワードの転置索引のコマンドラインインターフェース
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .keyword_index import KeywordIndex, DEFAULT_KEYWORD_INDEX
+except ImportError:
+    from keyword_index import KeywordIndex, DEFAULT_KEYWORD_INDEX
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='抽出データのキーワード（H3ごと）の転置索引を更新・検索します'
+    )
+    parser.add_argument(
+        '--index',
+        type=str,
+        default=DEFAULT_KEYWORD_INDEX,
+        help=f'索引ファイルのパス（デフォルト: {DEFAULT_KEYWORD_INDEX}）'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    # add: 抽出データを追加
+    add_parser = subparsers.add_parser('add', help='抽出データのJSONファイル・記事ディレクトリを索引に追加（変わったものだけ更新）')
+    add_parser.add_argument('paths', nargs='+',
+                            help='抽出データのJSONファイル、または記事ディレクトリ（その下の記事をすべて追加）')
+    add_parser.add_argument('--report', type=str, default=None,
+                            help='元のHTMLファイルのパス（JSONファイルを1つ指定した場合のみ。重複の集計の単位）')
+    add_parser.add_argument('--prune', action='store_true',
+                            help='元のファイル・ディレクトリがなくなったデータを索引から削除する')
+    
+    # query: キーワードの出現位置
+    query_parser = subparsers.add_parser('query', help='キーワードが出現する記事・H2・H3を表示')
+    query_parser.add_argument('keyword', type=str, help='キーワード（全角・半角、大文字・小文字は区別しない）')
+    query_parser.add_argument('--prefix', action='store_true', help='前方一致で検索')
+    query_parser.add_argument('--limit', type=int, default=None, help='表示する最大件数')
+    
+    # overlap: 重複するキーワード
+    overlap_parser = subparsers.add_parser('overlap', help='複数のレポートで重複するキーワードを表示')
+    overlap_parser.add_argument('reports', nargs='*',
+                                help='指定した場合、これらのレポート（HTML・JSONファイル）すべてに出現するキーワードだけを表示')
+    overlap_parser.add_argument('--min-reports', type=int, default=2,
+                                help='出現するレポートの数の下限（デフォルト: 2）')
+    overlap_parser.add_argument('--limit', type=int, default=50, help='表示する最大件数（デフォルト: 50）')
+    
+    # stats: 索引の件数
+    subparsers.add_parser('stats', help='索引の件数を表示')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command != 'add' and not Path(args.index).exists():
+        print(f"エラー: 索引ファイルが見つかりません: {args.index}（add で作成できます）")
+        sys.exit(1)
+    
+    if args.command == 'add':
+        missing = [path for path in args.paths if not Path(path).exists()]
+        if missing:
+            print(f"エラー: ファイルが見つかりません: {', '.join(missing)}")
+            sys.exit(1)
+        if args.report and (len(args.paths) > 1 or Path(args.paths[0]).is_dir()):
+            print("エラー: --report はJSONファイルを1つ指定した場合のみ使用できます。")
+            sys.exit(1)
+    
+    with KeywordIndex(args.index) as index:
+        if args.command == 'add':
+            updated = 0
+            unchanged = 0
+            skipped = 0
+            try:
+                for path in args.paths:
+                    stats = index.add_path(path, report=args.report)
+                    updated += stats['updated']
+                    unchanged += stats['unchanged']
+                    skipped += stats['skipped']
+            except (OSError, ValueError) as e:
+                print(f"エラー: 索引の更新に失敗しました: {e}")
+                sys.exit(1)
+            print(f"更新 {updated}件, 変更なし {unchanged}件, 抽出データ以外 {skipped}件")
+            if args.prune:
+                removed = index.prune()
+                print(f"削除 {len(removed)}件")
+            stats = index.stats()
+            print(f"索引: レポート {stats['reports']}件, キーワード {stats['keywords']}件, 出現位置 {stats['postings']}件")
+        
+        elif args.command == 'query':
+            postings = index.query(args.keyword, prefix=args.prefix, limit=args.limit)
+            for posting in postings:
+                print(f"{posting['keyword']}  {posting['label']} [{posting['pattern']}]  "
+                      f"H2-{posting['h2_index']} {posting['h2']} > H3-{posting['h3_index']} {posting['h3']}")
+            print(f"\n{len(postings)}件")
+        
+        elif args.command == 'overlap':
+            keywords = index.overlap(min_reports=args.min_reports, reports=args.reports, limit=args.limit)
+            print(f"{'レポート数':>8}{'出現数':>8}  キーワード")
+            for keyword in keywords:
+                print(f"{keyword['report_count']:>8}{keyword['postings']:>8}  {keyword['keyword']}")
+            print(f"\n{len(keywords)}件")
+        
+        elif args.command == 'stats':
+            stats = index.stats()
+            print(f"抽出データ（パターン）: {stats['documents']}件")
+            print(f"レポート: {stats['reports']}件")
+            print(f"キーワード: {stats['keywords']}件")
+            print(f"出現位置: {stats['postings']}件")
+
+
+if __name__ == '__main__':
+    main()
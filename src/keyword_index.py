@@ -0,0 +1,329 @@
+"""
+抽出データのキーワード（H3ごとのblock-keyword-text）の転置索引をSQLiteで管理するモジュール
+
+キーワード → 記事（抽出データ）・H2・H3 の出現位置（ポスティング）を保存する。
+抽出データのファイル・記事ディレクトリごとに追加し、内容が変わったものだけを入れ替えるため、
+レポートが増えても全体を作り直す必要がない。キーワードごとに、出現するレポート（元のHTML）の数を
+追加・削除のたびに更新するため、複数のレポートで重複するキーワードも集計せずに取り出せる。
+"""
+import os
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .article_catalog import normalize_path, source_data_hash
+    from .report_data import ReportSourceIndex, split_patterns
+except ImportError:
+    from article_catalog import normalize_path, source_data_hash
+    from report_data import ReportSourceIndex, split_patterns
+
+
+# 索引ファイルの形式のバージョン
+KEYWORD_INDEX_FORMAT_VERSION = 1
+
+# 索引ファイルのデフォルトのパス
+DEFAULT_KEYWORD_INDEX = 'output/keyword_index.sqlite'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    report TEXT NOT NULL,
+    label TEXT NOT NULL,
+    h1_title TEXT,
+    source_hash TEXT NOT NULL,
+    file_mtime_ns INTEGER,
+    file_size INTEGER,
+    UNIQUE (source, pattern)
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    keyword_id INTEGER PRIMARY KEY,
+    normalized TEXT NOT NULL UNIQUE,
+    keyword TEXT NOT NULL,
+    report_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS keywords_report_count ON keywords (report_count);
+CREATE TABLE IF NOT EXISTS postings (
+    keyword_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    h2_index INTEGER NOT NULL,
+    h3_index INTEGER NOT NULL,
+    h2 TEXT NOT NULL,
+    h3 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_keyword ON postings (keyword_id);
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+CREATE TABLE IF NOT EXISTS keyword_reports (
+    keyword_id INTEGER NOT NULL,
+    report TEXT NOT NULL,
+    postings INTEGER NOT NULL,
+    PRIMARY KEY (keyword_id, report)
+);
+CREATE INDEX IF NOT EXISTS keyword_reports_report ON keyword_reports (report);
+CREATE TABLE IF NOT EXISTS index_info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def normalize_keyword(keyword: str) -> str:
+    """検索用に正規化したキーワード（全角・半角と大文字・小文字を区別しない）"""
+    return unicodedata.normalize('NFKC', keyword).strip().casefold()
+
+
+def iter_keyword_postings(json_data: Dict) -> Iterator[Tuple[str, int, int, str, str]]:
+    """
+    1パターンの抽出データから、(キーワード, H2番号, H3番号, H2, H3) を順に返す
+    
+    H2番号・H3番号は記事ディレクトリ（h2-1_、h3-1_）と同じ1始まり。
+    同じH3に同じキーワードが複数あっても1件として扱う。
+    """
+    for h2_index, h2_section in enumerate(json_data.get('article_structure', []), start=1):
+        h2_title = h2_section.get('h2', '')
+        for h3_index, h3_section in enumerate(h2_section.get('h3_sections', []), start=1):
+            seen = set()
+            for keyword in h3_section.get('keywords', []):
+                normalized = normalize_keyword(keyword)
+                if not normalized or normalized in seen:
+                    continue
+                seen.add(normalized)
+                yield keyword.strip(), h2_index, h3_index, h2_title, h3_section.get('h3', '')
+
+
+class KeywordIndex(ReportSourceIndex):
+    """キーワードの転置索引（SQLite）"""
+    
+    def __init__(self, index_file: str = DEFAULT_KEYWORD_INDEX):
+        """
+        Args:
+            index_file: 索引ファイルのパス（存在しない場合は作成）
+        """
+        # sqlite3は索引を使うときに初めて読み込む（通常のCLIの起動時間を増やさないため）
+        import sqlite3
+        
+        self.index_file = Path(index_file)
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.index_file), timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO index_info (key, value) VALUES ('format_version', ?)",
+                (str(KEYWORD_INDEX_FORMAT_VERSION),)
+            )
+    
+    def __enter__(self) -> 'KeywordIndex':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """索引ファイルを閉じる"""
+        self.connection.close()
+    
+    def add_data(self, source: str, json_data: Dict, report: Optional[str] = None,
+                 label: Optional[str] = None, h1_title: Optional[str] = None,
+                 file_stat: Optional[os.stat_result] = None) -> bool:
+        """
+        抽出データを索引に追加（同じsourceの既存のデータは入れ替える）
+        
+        Args:
+            source: 抽出データの識別子（JSONファイル・記事ディレクトリのパス）
+            json_data: 抽出データ（1パターン・複数パターンのどちらも可）
+            report: 元のレポート（HTMLファイルのパス。Noneの場合はsource）。重複の集計の単位
+            label: 検索結果に表示する名前（Noneの場合はsourceのファイル名）
+            h1_title: 記事のH1タイトル（Noneの場合は最初の候補）
+            file_stat: sourceのファイルの情報（次回、更新日時とサイズが同じなら読み込まずに省略する）
+        
+        Returns:
+            索引を更新した場合はTrue（内容が前回と同じ場合はFalse）
+        """
+        source = normalize_path(source)
+        source_hash = source_data_hash(json_data)
+        if self._is_unchanged_data(source, source_hash, file_stat):
+            return False
+        
+        report = normalize_path(report) if report else source
+        label = label or Path(source).name
+        with self.connection:
+            self._remove_source(source)
+            for pattern_data in split_patterns(json_data):
+                cursor = self.connection.execute(
+                    "INSERT INTO documents (source, pattern, report, label, h1_title, source_hash, "
+                    "file_mtime_ns, file_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        source,
+                        pattern_data.get('pattern', 'Unknown'),
+                        report,
+                        label,
+                        h1_title or (pattern_data.get('h1_title_candidates') or [None])[0],
+                        source_hash,
+                        file_stat.st_mtime_ns if file_stat else None,
+                        file_stat.st_size if file_stat else None,
+                    )
+                )
+                self._add_postings(cursor.lastrowid, report, pattern_data)
+        return True
+    
+    def _keyword_id(self, keyword: str, normalized: str) -> int:
+        """キーワードのIDを取得（未登録なら登録）"""
+        row = self.connection.execute(
+            "SELECT keyword_id FROM keywords WHERE normalized = ?", (normalized,)
+        ).fetchone()
+        if row:
+            return row['keyword_id']
+        return self.connection.execute(
+            "INSERT INTO keywords (normalized, keyword) VALUES (?, ?)", (normalized, keyword)
+        ).lastrowid
+    
+    def _add_postings(self, doc_id: int, report: str, json_data: Dict):
+        """1パターンの抽出データのポスティングを追加し、レポートごとの出現数を増やす"""
+        rows = []
+        report_postings = {}
+        keyword_ids = {}
+        for keyword, h2_index, h3_index, h2_title, h3_title in iter_keyword_postings(json_data):
+            normalized = normalize_keyword(keyword)
+            keyword_id = keyword_ids.get(normalized)
+            if keyword_id is None:
+                keyword_id = self._keyword_id(keyword, normalized)
+                keyword_ids[normalized] = keyword_id
+            rows.append((keyword_id, doc_id, h2_index, h3_index, h2_title, h3_title))
+            report_postings[keyword_id] = report_postings.get(keyword_id, 0) + 1
+        
+        self.connection.executemany(
+            "INSERT INTO postings (keyword_id, doc_id, h2_index, h3_index, h2, h3) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        for keyword_id, count in report_postings.items():
+            updated = self.connection.execute(
+                "UPDATE keyword_reports SET postings = postings + ? WHERE keyword_id = ? AND report = ?",
+                (count, keyword_id, report)
+            ).rowcount
+            if not updated:
+                self.connection.execute(
+                    "INSERT INTO keyword_reports (keyword_id, report, postings) VALUES (?, ?, ?)",
+                    (keyword_id, report, count)
+                )
+                self.connection.execute(
+                    "UPDATE keywords SET report_count = report_count + 1 WHERE keyword_id = ?", (keyword_id,)
+                )
+    
+    def _remove_source(self, source: str):
+        """sourceのデータ（全パターン）を削除し、レポートごとの出現数を減らす（トランザクションは呼び出し側で管理）"""
+        doc_ids = [row['doc_id'] for row in self.connection.execute(
+            "SELECT doc_id FROM documents WHERE source = ?", (source,)
+        )]
+        if not doc_ids:
+            return
+        
+        placeholders = ', '.join('?' * len(doc_ids))
+        counts = self.connection.execute(
+            f"SELECT p.keyword_id, d.report, COUNT(*) AS count FROM postings p "
+            f"JOIN documents d ON d.doc_id = p.doc_id WHERE p.doc_id IN ({placeholders}) "
+            f"GROUP BY p.keyword_id, d.report",
+            doc_ids
+        ).fetchall()
+        for row in counts:
+            self.connection.execute(
+                "UPDATE keyword_reports SET postings = postings - ? WHERE keyword_id = ? AND report = ?",
+                (row['count'], row['keyword_id'], row['report'])
+            )
+            removed = self.connection.execute(
+                "DELETE FROM keyword_reports WHERE keyword_id = ? AND report = ? AND postings <= 0",
+                (row['keyword_id'], row['report'])
+            ).rowcount
+            if removed:
+                self.connection.execute(
+                    "UPDATE keywords SET report_count = report_count - 1 WHERE keyword_id = ?", (row['keyword_id'],)
+                )
+        self.connection.execute(f"DELETE FROM postings WHERE doc_id IN ({placeholders})", doc_ids)
+        self.connection.execute(f"DELETE FROM documents WHERE doc_id IN ({placeholders})", doc_ids)
+        self.connection.execute("DELETE FROM keywords WHERE report_count <= 0")
+    
+    def query(self, keyword: str, prefix: bool = False, limit: Optional[int] = None) -> List[Dict]:
+        """
+        キーワードが出現する記事・H2・H3を取得
+        
+        Args:
+            keyword: キーワード（正規化して完全一致）
+            prefix: Trueの場合、キーワードの前方一致で検索
+            limit: 最大件数
+        """
+        normalized = normalize_keyword(keyword)
+        if prefix:
+            # keywordsの索引を使えるように、前方一致を範囲で指定する
+            condition = "k.normalized >= ? AND k.normalized < ?"
+            params = [normalized, normalized + '\U0010ffff']
+        else:
+            condition = "k.normalized = ?"
+            params = [normalized]
+        
+        query = (
+            "SELECT k.keyword, d.label, d.source, d.report, d.pattern, d.h1_title, "
+            "p.h2_index, p.h3_index, p.h2, p.h3 "
+            "FROM keywords k JOIN postings p ON p.keyword_id = k.keyword_id "
+            f"JOIN documents d ON d.doc_id = p.doc_id WHERE {condition} "
+            "ORDER BY k.normalized, d.label, d.pattern, p.h2_index, p.h3_index"
+        )
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.connection.execute(query, params)]
+    
+    def overlap(self, min_reports: int = 2, reports: Optional[List[str]] = None,
+                limit: Optional[int] = None) -> List[Dict]:
+        """
+        複数のレポートで重複するキーワードを取得（出現するレポートの数が多い順）
+        
+        Args:
+            min_reports: 出現するレポートの数の下限
+            reports: 指定した場合、これらのレポートすべてに出現するキーワードだけを返す
+            limit: 最大件数
+        """
+        if reports:
+            reports = [normalize_path(report) for report in reports]
+            placeholders = ', '.join('?' * len(reports))
+            query = (
+                "SELECT k.keyword, k.report_count, SUM(r.postings) AS postings FROM keyword_reports r "
+                f"JOIN keywords k ON k.keyword_id = r.keyword_id WHERE r.report IN ({placeholders}) "
+                "GROUP BY r.keyword_id HAVING COUNT(*) = ? "
+                "ORDER BY k.report_count DESC, postings DESC, k.normalized"
+            )
+            params = reports + [len(reports)]
+        else:
+            query = (
+                "SELECT k.keyword, k.report_count, "
+                "(SELECT SUM(r.postings) FROM keyword_reports r WHERE r.keyword_id = k.keyword_id) AS postings "
+                "FROM keywords k WHERE k.report_count >= ? "
+                "ORDER BY k.report_count DESC, postings DESC, k.normalized"
+            )
+            params = [min_reports]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.connection.execute(query, params)]
+    
+    def keyword_reports(self, keyword: str) -> List[str]:
+        """キーワードが出現するレポートの一覧"""
+        return [row['report'] for row in self.connection.execute(
+            "SELECT r.report FROM keyword_reports r JOIN keywords k ON k.keyword_id = r.keyword_id "
+            "WHERE k.normalized = ? ORDER BY r.report",
+            (normalize_keyword(keyword),)
+        )]
+    
+    def stats(self) -> Dict[str, int]:
+        """索引の件数（documents: 抽出データ（パターン）の数, reports: レポートの数, keywords, postings）"""
+        counts = {}
+        for name, query in [
+            ('documents', "SELECT COUNT(*) FROM documents"),
+            ('reports', "SELECT COUNT(DISTINCT report) FROM documents"),
+            ('keywords', "SELECT COUNT(*) FROM keywords"),
+            ('postings', "SELECT COUNT(*) FROM postings"),
+        ]:
+            counts[name] = self.connection.execute(query).fetchone()[0]
+        return counts
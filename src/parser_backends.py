@@ -0,0 +1,63 @@
+"""
+Pascal HTMLパーサーのバックエンドを選択するモジュール
+"""
+
+# 利用可能なバックエンド名
+PARSER_BACKENDS = ['soup', 'stream', 'lxml']
+# 'lxml' は tests/test_parser_backends.py で 'soup' と抽出結果が一致することを確認している
+DEFAULT_PARSER_BACKEND = 'lxml'
+
+
+def load_parser_class(backend: str = DEFAULT_PARSER_BACKEND):
+    """
+    指定したバックエンドのパーサークラスを読み込む
+    
+    Args:
+        backend: 'soup'（BeautifulSoupで全体を解析）、
+                 'stream'（lxmlで逐次解析し、対象セクションのみ保持）または
+                 'lxml'（lxmlで全体を解析し、XPathで直接検索）
+    """
+    if backend == 'soup':
+        try:
+            from .pascal_parser import PascalParser
+        except ImportError:
+            from pascal_parser import PascalParser
+        return PascalParser
+    
+    if backend == 'stream':
+        try:
+            from .pascal_stream_parser import PascalStreamParser
+        except ImportError:
+            from pascal_stream_parser import PascalStreamParser
+        return PascalStreamParser
+    
+    if backend == 'lxml':
+        try:
+            from .pascal_lxml_parser import PascalLxmlParser
+        except ImportError:
+            from pascal_lxml_parser import PascalLxmlParser
+        return PascalLxmlParser
+    
+    raise ValueError(f"不明なパーサーバックエンドです: {backend}（利用可能: {PARSER_BACKENDS}）")
+
+
+def create_parser(html_file_path: str, backend: str = DEFAULT_PARSER_BACKEND):
+    """
+    指定したバックエンドでPascalパーサーを生成
+    
+    Args:
+        html_file_path: Pascal HTMLファイルのパス
+        backend: パーサーのバックエンド（PARSER_BACKENDSのいずれか）
+    """
+    return load_parser_class(backend)(html_file_path)
+
+
+def create_parser_from_html(html: str, backend: str = DEFAULT_PARSER_BACKEND):
+    """
+    指定したバックエンドで、HTML文字列を解析するPascalパーサーを生成
+    
+    Args:
+        html: Pascal HTMLレポートの内容
+        backend: パーサーのバックエンド（PARSER_BACKENDSのいずれか）
+    """
+    return load_parser_class(backend).from_html(html)
@@ -0,0 +1,188 @@
+"""
+Pascal HTMLレポートをlxmlで直接解析するモジュール
+
+BeautifulSoupを使わず、lxmlの木に対してコンパイル済みのXPathで要素を検索する。
+find / find_parent / find_all と同じ検索、get_text(strip=True) と .string と同じ
+テキストの取得を再現しているため、抽出結果はPascalParserと同一。
+"""
+from lxml import etree
+from typing import Dict, List, Optional, Tuple
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .pascal_parser import PascalParser
+    from .profiling import stage
+except ImportError:
+    from pascal_parser import PascalParser
+    from profiling import stage
+
+
+# クラス名での絞り込み（contains()は候補の絞り込みのみ。完全な判定は_has_classで行う）
+_DOCUMENT_CANDIDATES = etree.XPath(
+    "//h2[contains(@class, 'title')] | //h4[contains(@class, 'title')]"
+    " | //div[contains(@class, 'section-draft-title')]"
+)
+
+# (軸, タグ名) ごとのコンパイル済みXPath（例: descendant::div[contains(@class, $class_name)]）
+_CLASS_XPATHS: Dict[Tuple[str, str], etree.XPath] = {}
+
+# BeautifulSoupのget_text()が対象外とする文字列を含むタグ（Script・Stylesheetなどの文字列になる）
+_NON_TEXT_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+
+def _class_xpath(axis: str, name: str) -> etree.XPath:
+    """指定した軸・タグ名で、クラス名の候補を絞り込むXPathを返す（初回のみコンパイル）"""
+    key = (axis, name)
+    xpath = _CLASS_XPATHS.get(key)
+    if xpath is None:
+        xpath = etree.XPath(f"{axis}::{name}[contains(@class, $class_name)]")
+        _CLASS_XPATHS[key] = xpath
+    return xpath
+
+
+class PascalLxmlParser(PascalParser):
+    """lxmlとXPathでPascal HTMLレポートを解析するクラス
+    
+    抽出メソッドと出力形式はPascalParserと同一で、要素の検索と
+    テキストの取得だけをlxmlの要素に対して行う。
+    """
+    
+    def __init__(self, html_file_path: str):
+        """
+        Args:
+            html_file_path: Pascal HTMLファイルのパス
+        """
+        self.html_file_path = html_file_path
+        with stage('html_read') as record:
+            with open(html_file_path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            record.add(chars=len(html))
+        with stage('tree_build'):
+            self.root = self._parse(html)
+        self._reset_extraction_cache()
+    
+    @classmethod
+    def from_html(cls, html: str) -> 'PascalLxmlParser':
+        """
+        ファイルを経由せずに、HTML文字列から解析する（HTTP APIなどで受け取ったHTML用）
+        
+        Args:
+            html: Pascal HTMLレポートの内容
+        """
+        parser = cls.__new__(cls)
+        parser.html_file_path = None
+        with stage('tree_build', chars=len(html)):
+            parser.root = parser._parse(html)
+        parser._reset_extraction_cache()
+        return parser
+    
+    def _parse(self, html: str):
+        """HTML文字列をlxmlの木に変換（空のドキュメントはNone）"""
+        # BeautifulSoupと同じく、文字列のままlxmlに渡す（metaのcharsetは使わない）
+        return etree.fromstring(html, etree.HTMLParser())
+    
+    def _has_class(self, element, class_name: str) -> bool:
+        """要素が指定したクラスを持つか判定"""
+        return class_name in (element.get('class') or '').split()
+    
+    def _find(self, element, name: str, class_name: str):
+        """子孫から、指定したタグ名・クラスを持つ最初の要素を探す（なければNone）"""
+        for candidate in _class_xpath('descendant', name)(element, class_name=class_name):
+            if self._has_class(candidate, class_name):
+                return candidate
+        return None
+    
+    def _find_all(self, element, name: str, class_name: Optional[str] = None) -> List:
+        """子孫から、指定したタグ名（・クラス）を持つ要素を文書順にすべて探す"""
+        if class_name is None:
+            return list(element.iterdescendants(name))
+        candidates = _class_xpath('descendant', name)(element, class_name=class_name)
+        return [candidate for candidate in candidates if self._has_class(candidate, class_name)]
+    
+    def _find_parent(self, element, name: str, class_name: str):
+        """祖先から、指定したタグ名・クラスを持つ最も近い要素を探す（なければNone）"""
+        # ancestor軸の結果は文書順（外側から）なので、逆順にたどる
+        for candidate in reversed(_class_xpath('ancestor', name)(element, class_name=class_name)):
+            if self._has_class(candidate, class_name):
+                return candidate
+        return None
+    
+    def _child_elements(self, element, name: str) -> List:
+        """指定したタグ名の子要素（孫以下は含まない）"""
+        return list(element.iterchildren(name))
+    
+    def _text(self, element) -> str:
+        """要素内のテキストを、各文字列の前後の空白を除いて連結（get_text(strip=True)）"""
+        return self._joined_text(element, None)
+    
+    def _text_without_icons(self, element) -> str:
+        """check-iconの中を読み飛ばして要素内のテキストを取得（木は変更しない）"""
+        return self._joined_text(element, 'check-icon')
+    
+    def _joined_text(self, element, skip_class: Optional[str]) -> str:
+        """テキストを集めて、前後の空白を除いた空でないものだけを連結"""
+        strings = []
+        self._collect_strings(element, skip_class, strings)
+        return ''.join(text for text in (string.strip() for string in strings) if text)
+    
+    def _collect_strings(self, element, skip_class: Optional[str], strings: List[str]):
+        """
+        要素内の文字列を文書順に集める
+        
+        コメント・処理命令の中身と、script・styleなどの中の文字列は
+        BeautifulSoupのget_text()と同じく含めない（後ろに続くtailは含める）。
+        """
+        if element.text:
+            strings.append(element.text)
+        for child in element:
+            tag = child.tag
+            if isinstance(tag, str) and tag not in _NON_TEXT_TAGS \
+                    and not (skip_class and self._has_class(child, skip_class)):
+                self._collect_strings(child, skip_class, strings)
+            if child.tail:
+                strings.append(child.tail)
+    
+    def _string(self, element) -> Optional[str]:
+        """
+        BeautifulSoupの.stringと同じ値を返す
+        
+        子（テキスト・要素・コメント）がちょうど1つのときだけ、テキストならその文字列、
+        要素ならその要素の.stringを返す。それ以外はNone。
+        """
+        while True:
+            children = len(element)
+            if children == 0:
+                return element.text or None
+            if children > 1 or element.text or element[0].tail:
+                return None
+            element = element[0]
+            if not isinstance(element.tag, str):
+                # コメント・処理命令は、BeautifulSoupでも文字列として扱われる
+                return element.text
+    
+    def _is_inside(self, element, ancestor) -> bool:
+        """elementがancestorの子孫か判定"""
+        for parent in element.iterancestors():
+            if parent is ancestor:
+                return True
+        return False
+    
+    def _collect_index_candidates(self) -> Tuple[List, List, List]:
+        """ドキュメント全体から、H2見出し・H4見出し・パターン見出しの候補を文書順に集める"""
+        h2_candidates = []
+        h4_candidates = []
+        draft_titles = []
+        if self.root is None:
+            return h2_candidates, h4_candidates, draft_titles
+        
+        for element in _DOCUMENT_CANDIDATES(self.root):
+            tag = element.tag
+            if tag == 'h2':
+                if self._has_class(element, 'title'):
+                    h2_candidates.append(element)
+            elif tag == 'h4':
+                if self._has_class(element, 'title'):
+                    h4_candidates.append(element)
+            elif self._has_class(element, 'section-draft-title'):
+                draft_titles.append(element)
+        return h2_candidates, h4_candidates, draft_titles
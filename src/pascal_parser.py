@@ -1,53 +1,239 @@
 """
 Pascal SEOツールのHTMLレポートを解析するモジュール
 """
-from bs4 import BeautifulSoup
 from typing import Dict, List, Optional, Tuple
+import copy
 import re
+import threading
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .profiling import stage
+except ImportError:
+    from profiling import stage
+
+
+# 抽出ロジックのバージョン（抽出結果が変わる変更をしたら上げる。キャッシュのキーに使用）
+PARSER_VERSION = 2
+
+# パターン見出し（section-draft-title）からパターン名（A、B、C...）を取り出す正規表現
+PATTERN_TITLE_REGEX = re.compile('記事構成案 パターン([A-Z])')
 
 
 class PascalParser:
-    """Pascal HTMLレポートを解析するクラス"""
+    """Pascal HTMLレポートを解析するクラス
+    
+    抽出メソッドは解析済みの木を変更しない（check-iconなどは読み飛ばすだけ）ため、
+    何度呼んでも、どの順番で呼んでも同じ結果を返す。索引と抽出結果は初回に
+    ロックを取って1回だけ作成するので、1つのパーサーを複数のスレッドで共有し、
+    それぞれ別のパターン・提案を抽出してよい（extract_allなどの戻り値はスレッドごとの複製）。
+    """
     
     def __init__(self, html_file_path: str):
         """
         Args:
             html_file_path: Pascal HTMLファイルのパス
         """
+        # bs4（とlxml）は読み込みに時間がかかるため、解析するときに初めて読み込む
+        from bs4 import BeautifulSoup
+        
         self.html_file_path = html_file_path
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            self.soup = BeautifulSoup(f.read(), 'lxml')
+        with stage('html_read') as record:
+            with open(html_file_path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            record.add(chars=len(html))
+        with stage('soup_build'):
+            self.soup = BeautifulSoup(html, 'lxml')
+        self._reset_extraction_cache()
+    
+    @classmethod
+    def from_html(cls, html: str) -> 'PascalParser':
+        """
+        ファイルを経由せずに、HTML文字列から解析する（HTTP APIなどで受け取ったHTML用）
+        
+        Args:
+            html: Pascal HTMLレポートの内容
+        """
+        from bs4 import BeautifulSoup
+        
+        parser = cls.__new__(cls)
+        parser.html_file_path = None
+        with stage('soup_build', chars=len(html)):
+            parser.soup = BeautifulSoup(html, 'lxml')
+        parser._reset_extraction_cache()
+        return parser
+    
+    def _reset_extraction_cache(self):
+        """抽出結果のキャッシュを初期化（_build_indexで1回だけ走査する）"""
+        # 索引・抽出結果を作成するときのロック（extract_patternsから_build_indexを呼ぶため再入可能）
+        self._lock = threading.RLock()
+        self._index = None
+        self._patterns = None
+        self._h1_title_candidates = None
+        self._originality_proposals = None
+    
+    def _has_class(self, element, class_name: str) -> bool:
+        """要素が指定したクラスを持つか判定"""
+        return class_name in (element.get('class') or [])
+    
+    # 以下の要素の検索・テキスト取得はバックエンドごとに差し替える（PascalLxmlParserを参照）
+    
+    def _find(self, element, name: str, class_name: str):
+        """子孫から、指定したタグ名・クラスを持つ最初の要素を探す（なければNone）"""
+        return element.find(name, class_=class_name)
+    
+    def _find_all(self, element, name: str, class_name: Optional[str] = None) -> List:
+        """子孫から、指定したタグ名（・クラス）を持つ要素を文書順にすべて探す"""
+        if class_name is None:
+            return element.find_all(name)
+        return element.find_all(name, class_=class_name)
+    
+    def _find_parent(self, element, name: str, class_name: str):
+        """祖先から、指定したタグ名・クラスを持つ最も近い要素を探す（なければNone）"""
+        return element.find_parent(name, class_=class_name)
+    
+    def _child_elements(self, element, name: str) -> List:
+        """指定したタグ名の子要素（孫以下は含まない）"""
+        return element.find_all([name], recursive=False)
+    
+    def _text(self, element) -> str:
+        """要素内のテキストを、各文字列の前後の空白を除いて連結（get_text(strip=True)）"""
+        return element.get_text(strip=True)
+    
+    def _text_without_icons(self, element) -> str:
+        """check-iconの中の文字列を読み飛ばして要素内のテキストを取得（木は変更しない）"""
+        strings = []
+        for string in element.strings:
+            if self._inside_icon(string, element):
+                continue
+            string = string.strip()
+            if string:
+                strings.append(string)
+        return ''.join(strings)
+    
+    def _inside_icon(self, string, element) -> bool:
+        """文字列がelement内のcheck-iconの中にあるか判定"""
+        for parent in string.parents:
+            if parent is element:
+                return False
+            if parent.name == 'span' and self._has_class(parent, 'check-icon'):
+                return True
+        return False
+    
+    def _collect_index_candidates(self) -> Tuple[List, List, List]:
+        """ドキュメント全体から、H2見出し・H4見出し・パターン見出しの候補を文書順に集める"""
+        h2_candidates = []
+        h4_candidates = []
+        draft_titles = []
+        for element in self.soup.find_all(True):
+            name = element.name
+            if name == 'h2':
+                if self._has_class(element, 'title'):
+                    h2_candidates.append(element)
+            elif name == 'h4':
+                if self._has_class(element, 'title'):
+                    h4_candidates.append(element)
+            elif name == 'div':
+                if self._has_class(element, 'section-draft-title'):
+                    draft_titles.append(element)
+        return h2_candidates, h4_candidates, draft_titles
+    
+    def _build_index(self) -> Dict[str, any]:
+        """
+        ドキュメントを1回だけ走査して、抽出に必要なノードの索引を作成
+        
+        走査中に「AIによる記事構成案」のH2、独自性の提案などのH4、
+        パターン見出し（section-draft-title）の候補を文書順に集め、
+        最後にsectionContents内のものだけに絞り込む。
+        結果はインスタンスにキャッシュされ、2回目以降は走査しない。
+        """
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    with stage('section_lookup'):
+                        self._index = self._scan_index()
+        return self._index
+    
+    def _scan_index(self) -> Dict[str, any]:
+        """ドキュメントを走査して索引を作成（キャッシュなし）"""
+        h2_candidates, h4_candidates, draft_titles = self._collect_index_candidates()
+        
+        section = None
+        for h2_title in h2_candidates:
+            if self._string_matches(h2_title, 'AIによる記事構成案'):
+                # 親のsectionContentsを取得
+                section = self._find_parent(h2_title, 'div', 'sectionContents')
+                break
+        
+        if section is not None:
+            h4_candidates = [e for e in h4_candidates if self._is_inside(e, section)]
+            draft_titles = [e for e in draft_titles if self._is_inside(e, section)]
+        else:
+            h4_candidates = []
+            draft_titles = []
+        
+        return {
+            'section': section,
+            'h4_titles': h4_candidates,
+            'draft_titles': draft_titles,
+        }
+    
+    def _string(self, element) -> Optional[str]:
+        """要素の.string（子が1つの文字列だけのときの文字列、それ以外はNone）"""
+        return element.string
+    
+    def _string_matches(self, element, pattern: str) -> bool:
+        """要素の.stringが正規表現に一致するか判定（BeautifulSoupのstring=と同じ判定）"""
+        string = self._string(element)
+        return string is not None and re.search(pattern, string) is not None
+    
+    def _is_inside(self, element, ancestor) -> bool:
+        """elementがancestorの子孫か判定"""
+        for parent in element.parents:
+            if parent is ancestor:
+                return True
+        return False
+    
+    def _find_h4_block(self, title_text: str):
+        """索引からH4見出しを探し、親のsectionBlockを返す"""
+        for h4_title in self._build_index()['h4_titles']:
+            if self._string_matches(h4_title, title_text):
+                return self._find_parent(h4_title, 'div', 'sectionBlock')
+        return None
     
     def find_ai_article_section(self) -> Optional:
         """AIによる記事構成案セクションを検索"""
-        # 「AIによる記事構成案」というH2を探す
-        h2_title = self.soup.find('h2', class_='title', string=re.compile('AIによる記事構成案'))
-        if not h2_title:
-            return None
-        
-        # 親のsectionContentsを取得
-        section = h2_title.find_parent('div', class_='sectionContents')
-        return section
+        return self._build_index()['section']
     
     def extract_patterns(self) -> Dict[str, any]:
-        """パターンAとパターンBを抽出"""
-        section = self.find_ai_article_section()
-        if not section:
+        """すべてのパターン（A、B...）を抽出"""
+        if self._patterns is None:
+            with self._lock:
+                if self._patterns is None:
+                    self._patterns = self._extract_patterns()
+        return self._patterns
+    
+    def _extract_patterns(self) -> Dict[str, any]:
+        """パターンを索引から抽出（キャッシュなし）"""
+        index = self._build_index()
+        if index['section'] is None:
             return {}
         
-        patterns = {}
+        # パターン名ごとに最初のパターン見出しを採用し、パターン名の順に並べる
+        containers = {}
+        for draft_title in index['draft_titles']:
+            string = self._string(draft_title)
+            if string is None:
+                continue
+            for pattern in PATTERN_TITLE_REGEX.findall(string):
+                if pattern not in containers:
+                    containers[pattern] = self._find_parent(draft_title, 'div', 'section-draft-inn')
         
-        # パターンAを探す
-        pattern_a_title = section.find('div', class_='section-draft-title', string=re.compile('記事構成案 パターンA'))
-        if pattern_a_title:
-            pattern_a_container = pattern_a_title.find_parent('div', class_='section-draft-inn')
-            patterns['A'] = self._extract_pattern_structure(pattern_a_container)
-        
-        # パターンBを探す
-        pattern_b_title = section.find('div', class_='section-draft-title', string=re.compile('記事構成案 パターンB'))
-        if pattern_b_title:
-            pattern_b_container = pattern_b_title.find_parent('div', class_='section-draft-inn')
-            patterns['B'] = self._extract_pattern_structure(pattern_b_container)
+        patterns = {}
+        with stage('pattern_extract') as record:
+            for pattern in sorted(containers):
+                patterns[pattern] = self._extract_pattern_structure(containers[pattern])
+                record.add(h2=len(patterns[pattern]))
         
         return patterns
     
@@ -58,9 +244,9 @@ class PascalParser:
         current_h3_list = []
         
         # コンテナ内のすべての要素を順番に処理
-        for element in container.find_all(['div'], recursive=False):
+        for element in self._child_elements(container, 'div'):
             # H2の検出
-            if element.get('class') and 'h2' in element.get('class', []):
+            if self._has_class(element, 'h2'):
                 # 前のH2を保存
                 if current_h2:
                     structure.append({
@@ -69,13 +255,13 @@ class PascalParser:
                     })
                 
                 # 新しいH2を取得
-                h2_text_elem = element.find('div', class_='block-tag-text')
-                if h2_text_elem:
-                    current_h2 = h2_text_elem.get_text(strip=True)
+                h2_text_elem = self._find(element, 'div', 'block-tag-text')
+                if h2_text_elem is not None:
+                    current_h2 = self._text(h2_text_elem)
                     current_h3_list = []
             
             # H3の検出
-            elif element.get('class') and 'h3' in element.get('class', []):
+            elif self._has_class(element, 'h3'):
                 h3_data = self._extract_h3_data(element)
                 if h3_data:
                     current_h3_list.append(h3_data)
@@ -92,22 +278,22 @@ class PascalParser:
     def _extract_h3_data(self, h3_element) -> Optional[Dict]:
         """H3要素からデータを抽出"""
         # H3見出しを取得
-        h3_title_elem = h3_element.find('div', class_='h3-left')
-        if not h3_title_elem:
+        h3_title_elem = self._find(h3_element, 'div', 'h3-left')
+        if h3_title_elem is None:
             return None
         
-        h3_title = h3_title_elem.get_text(strip=True)
+        h3_title = self._text(h3_title_elem)
         
         # 執筆のアドバイスを取得
-        advice_elem = h3_element.find('div', class_='block-advice-text')
-        advice = advice_elem.get_text(strip=True) if advice_elem else ""
+        advice_elem = self._find(h3_element, 'div', 'block-advice-text')
+        advice = self._text(advice_elem) if advice_elem is not None else ""
         
         # キーワードを取得
-        keyword_elem = h3_element.find('div', class_='block-keyword-text')
+        keyword_elem = self._find(h3_element, 'div', 'block-keyword-text')
         keywords = []
-        if keyword_elem:
-            keyword_spans = keyword_elem.find_all('span')
-            keywords = [span.get_text(strip=True) for span in keyword_spans if span.get_text(strip=True)]
+        if keyword_elem is not None:
+            keyword_spans = self._find_all(keyword_elem, 'span')
+            keywords = [text for text in (self._text(span) for span in keyword_spans) if text]
         
         return {
             'h3': h3_title,
@@ -117,34 +303,32 @@ class PascalParser:
     
     def extract_h1_title_candidates(self) -> List[str]:
         """記事タイトルの候補（H1）を抽出"""
-        section = self.find_ai_article_section()
-        if not section:
-            return []
-        
-        # 「記事タイトルの候補」というH4を探す
-        h4_title = section.find('h4', class_='title', string=re.compile('記事タイトルの候補'))
-        if not h4_title:
-            return []
-        
-        # 親のsectionBlockを取得
-        section_block = h4_title.find_parent('div', class_='sectionBlock')
-        if not section_block:
+        if self._h1_title_candidates is None:
+            with self._lock:
+                if self._h1_title_candidates is None:
+                    with stage('h1_extract'):
+                        self._h1_title_candidates = self._extract_h1_title_candidates()
+        return self._h1_title_candidates
+    
+    def _extract_h1_title_candidates(self) -> List[str]:
+        """記事タイトルの候補を索引から抽出（キャッシュなし）"""
+        # 「記事タイトルの候補」というH4の親sectionBlockを取得
+        section_block = self._find_h4_block('記事タイトルの候補')
+        if section_block is None:
             return []
         
         # section-title要素を探す
-        section_title = section_block.find('div', class_='section-title')
-        if not section_title:
+        section_title = self._find(section_block, 'div', 'section-title')
+        if section_title is None:
             return []
         
         titles = []
         
         # 各title要素を取得
-        title_elements = section_title.find_all('div', class_='title')
+        title_elements = self._find_all(section_title, 'div', 'title')
         for title_elem in title_elements:
-            # check-iconを削除してテキストを取得
-            for icon in title_elem.find_all('span', class_='check-icon'):
-                icon.decompose()
-            title = title_elem.get_text(strip=True)
+            # check-iconを除いてテキストを取得
+            title = self._text_without_icons(title_elem)
             if title:
                 titles.append(title)
         
@@ -152,38 +336,35 @@ class PascalParser:
     
     def extract_originality_proposals(self) -> List[Dict]:
         """独自性の提案セクションを抽出"""
-        section = self.find_ai_article_section()
-        if not section:
-            return []
-        
-        # 「独自性の提案」というH4を探す
-        h4_title = section.find('h4', class_='title', string=re.compile('独自性の提案'))
-        if not h4_title:
-            return []
-        
-        # 親のsectionBlockを取得
-        section_block = h4_title.find_parent('div', class_='sectionBlock')
-        if not section_block:
+        if self._originality_proposals is None:
+            with self._lock:
+                if self._originality_proposals is None:
+                    with stage('proposal_extract'):
+                        self._originality_proposals = self._extract_originality_proposals()
+        return self._originality_proposals
+    
+    def _extract_originality_proposals(self) -> List[Dict]:
+        """独自性の提案を索引から抽出（キャッシュなし）"""
+        # 「独自性の提案」というH4の親sectionBlockを取得
+        section_block = self._find_h4_block('独自性の提案')
+        if section_block is None:
             return []
         
         proposals = []
         
         # block-original要素を探す
-        original_blocks = section_block.find_all('div', class_='block-original')
+        original_blocks = self._find_all(section_block, 'div', 'block-original')
         for block in original_blocks:
             # 見出しを取得（check-iconを除く）
-            title_elem = block.find('div', class_='block-title')
-            if title_elem:
-                # check-iconを削除してテキストを取得
-                for icon in title_elem.find_all('span', class_='check-icon'):
-                    icon.decompose()
-                title = title_elem.get_text(strip=True)
+            title_elem = self._find(block, 'div', 'block-title')
+            if title_elem is not None:
+                title = self._text_without_icons(title_elem)
             else:
                 title = ""
             
             # 執筆のアドバイスを取得
-            advice_elem = block.find('div', class_='block-text')
-            advice = advice_elem.get_text(strip=True) if advice_elem else ""
+            advice_elem = self._find(block, 'div', 'block-text')
+            advice = self._text(advice_elem) if advice_elem is not None else ""
             
             if title:  # タイトルがある場合のみ追加
                 proposals.append({
@@ -193,6 +374,82 @@ class PascalParser:
         
         return proposals
     
+    def extract_report(self) -> 'ParsedReport':
+        """パターン・H1タイトル候補・独自性の提案をすべて抽出してParsedReportにまとめる"""
+        return ParsedReport(
+            self.extract_patterns(),
+            self.extract_h1_title_candidates(),
+            self.extract_originality_proposals()
+        )
+    
+    def extract_selected_pattern(self, pattern: str) -> Dict:
+        """選択したパターンのデータを抽出"""
+        return self.extract_report().extract_selected_pattern(pattern)
+    
+    def extract_selected_proposals(self, selected_indices: List[int]) -> List[Dict]:
+        """選択した独自性の提案を抽出"""
+        return self.extract_report().extract_selected_proposals(selected_indices)
+    
+    def extract_all(self, pattern: str, proposal_indices: List[int] = None) -> Dict:
+        """すべての情報を抽出して統合"""
+        return self.extract_report().extract_all(pattern, proposal_indices)
+    
+    def extract_all_patterns(self, proposal_indices: List[int] = None) -> Dict:
+        """すべてのパターンの情報を抽出して統合（複数パターンのデータ）"""
+        return self.extract_report().extract_all_patterns(proposal_indices)
+
+
+class ParsedReport:
+    """
+    解析済みのPascalレポート（全パターン・全H1候補・全提案）を保持するクラス
+    
+    PascalParserと同じ抽出メソッドを持つため、HTMLを再解析せずに
+    パターンや提案の選択だけをやり直すことができる（キャッシュからの復元に使用）。
+    extract_selected_pattern・extract_selected_proposals・extract_allは
+    保持しているデータの複製を返すため、戻り値を変更しても他の呼び出し元には影響しない。
+    """
+    
+    def __init__(self, patterns: Dict[str, List[Dict]], h1_title_candidates: List[str],
+                 originality_proposals: List[Dict]):
+        """
+        Args:
+            patterns: パターン名をキーとした記事構成
+            h1_title_candidates: H1タイトル候補
+            originality_proposals: すべての独自性の提案
+        """
+        self.patterns = patterns
+        self.h1_title_candidates = h1_title_candidates
+        self.originality_proposals = originality_proposals
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ParsedReport':
+        """to_dictで出力した辞書から復元"""
+        return cls(
+            data.get('patterns', {}),
+            data.get('h1_title_candidates', []),
+            data.get('originality_proposals', [])
+        )
+    
+    def to_dict(self) -> Dict:
+        """JSONに保存できる辞書に変換"""
+        return {
+            'patterns': self.patterns,
+            'h1_title_candidates': self.h1_title_candidates,
+            'originality_proposals': self.originality_proposals
+        }
+    
+    def extract_patterns(self) -> Dict[str, any]:
+        """すべてのパターン（A、B...）を返す"""
+        return self.patterns
+    
+    def extract_h1_title_candidates(self) -> List[str]:
+        """記事タイトルの候補（H1）を返す"""
+        return self.h1_title_candidates
+    
+    def extract_originality_proposals(self) -> List[Dict]:
+        """独自性の提案を返す"""
+        return self.originality_proposals
+    
     def extract_selected_pattern(self, pattern: str) -> Dict:
         """選択したパターンのデータを抽出"""
         patterns = self.extract_patterns()
@@ -201,7 +458,7 @@ class PascalParser:
         
         return {
             'pattern': pattern,
-            'article_structure': patterns[pattern]
+            'article_structure': copy.deepcopy(patterns[pattern])
         }
     
     def extract_selected_proposals(self, selected_indices: List[int]) -> List[Dict]:
@@ -211,7 +468,7 @@ class PascalParser:
         
         for idx in selected_indices:
             if 0 <= idx < len(all_proposals):
-                selected.append(all_proposals[idx])
+                selected.append(dict(all_proposals[idx]))
         
         return selected
     
@@ -220,7 +477,24 @@ class PascalParser:
         result = self.extract_selected_pattern(pattern)
         
         # H1タイトル候補を追加
-        result['h1_title_candidates'] = self.extract_h1_title_candidates()
+        result['h1_title_candidates'] = list(self.extract_h1_title_candidates())
+        
+        if proposal_indices is not None:
+            result['originality_proposals'] = self.extract_selected_proposals(proposal_indices)
+        else:
+            result['originality_proposals'] = []
+        
+        return result
+    
+    def extract_all_patterns(self, proposal_indices: List[int] = None) -> Dict:
+        """
+        すべてのパターンの情報を抽出して統合
+        
+        1回の解析で全パターンを出力するためのデータ（report_dataの複数パターンの形式）で、
+        article_structureの代わりにパターン名をキーとしたpatternsを持つ。
+        """
+        result = {'patterns': copy.deepcopy(self.extract_patterns())}
+        result['h1_title_candidates'] = list(self.extract_h1_title_candidates())
         
         if proposal_indices is not None:
             result['originality_proposals'] = self.extract_selected_proposals(proposal_indices)
@@ -228,4 +502,3 @@ class PascalParser:
             result['originality_proposals'] = []
         
         return result
-
@@ -0,0 +1,129 @@
+"""
+Pascal HTMLレポートを逐次解析するモジュール
+
+巨大なレポート（SERPデータを大量に含むものなど）でも、
+「AIによる記事構成案」のsectionContentsだけをメモリに残して解析する。
+"""
+from bs4 import BeautifulSoup
+from lxml import etree
+from typing import BinaryIO
+import io
+import re
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .pascal_parser import PascalParser
+    from .profiling import stage
+except ImportError:
+    from pascal_parser import PascalParser
+    from profiling import stage
+
+
+class PascalStreamParser(PascalParser):
+    """lxmlのインクリメンタル解析でPascal HTMLレポートを解析するクラス
+    
+    HTMLをチャンク単位でlxmlに流し込み、対象のsectionContents以外の要素は
+    閉じた時点で破棄する。対象セクションのみをBeautifulSoupに変換するため、
+    抽出メソッドと出力形式はPascalParserと同一。
+    """
+    
+    # 一度に読み込むバイト数
+    CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, html_file_path: str):
+        """
+        Args:
+            html_file_path: Pascal HTMLファイルのパス
+        """
+        self.html_file_path = html_file_path
+        with stage('stream_scan') as record:
+            with open(html_file_path, 'rb') as f:
+                section_html = self._read_ai_article_section(f)
+                record.add(bytes=f.tell())
+        with stage('soup_build', chars=len(section_html)):
+            self.soup = BeautifulSoup(section_html, 'lxml')
+        self._reset_extraction_cache()
+    
+    @classmethod
+    def from_html(cls, html: str) -> 'PascalStreamParser':
+        """
+        ファイルを経由せずに、HTML文字列から解析する（HTTP APIなどで受け取ったHTML用）
+        
+        Args:
+            html: Pascal HTMLレポートの内容
+        """
+        parser = cls.__new__(cls)
+        parser.html_file_path = None
+        with stage('stream_scan', chars=len(html)):
+            section_html = parser._read_ai_article_section(io.BytesIO(html.encode('utf-8')))
+        with stage('soup_build', chars=len(section_html)):
+            parser.soup = BeautifulSoup(section_html, 'lxml')
+        parser._reset_extraction_cache()
+        return parser
+    
+    def _read_ai_article_section(self, stream: BinaryIO) -> str:
+        """HTMLを逐次解析し、AIによる記事構成案のsectionContentsだけをHTML文字列で返す"""
+        pull_parser = etree.HTMLPullParser(events=('start', 'end'), encoding='utf-8')
+        # 開いているsectionContentsの深さ（0のときは対象外の要素として破棄する）
+        section_depth = 0
+        fed = False
+        
+        while True:
+            chunk = stream.read(self.CHUNK_SIZE)
+            if chunk:
+                pull_parser.feed(chunk)
+                fed = True
+            elif not fed:
+                # 空のファイルはclose()が「no element found」になるため、セクションなしとして扱う
+                return ''
+            else:
+                pull_parser.close()
+            
+            for event, element in pull_parser.read_events():
+                is_section = element.tag == 'div' and self._element_has_class(element, 'sectionContents')
+                
+                if event == 'start':
+                    if is_section:
+                        section_depth += 1
+                    continue
+                
+                if is_section:
+                    section_depth -= 1
+                    if self._is_ai_article_section(element):
+                        return etree.tostring(element, encoding='unicode', method='html')
+                
+                if section_depth == 0:
+                    self._discard(element)
+            
+            if not chunk:
+                break
+        
+        return ''
+    
+    def _element_has_class(self, element, class_name: str) -> bool:
+        """lxml要素が指定したクラスを持つか判定"""
+        return class_name in (element.get('class') or '').split()
+    
+    def _is_ai_article_section(self, section) -> bool:
+        """sectionContentsが「AIによる記事構成案」のH2を直接含むセクションか判定"""
+        for h2 in section.iter('h2'):
+            if not self._element_has_class(h2, 'title'):
+                continue
+            if len(h2) == 0 and h2.text and re.search('AIによる記事構成案', h2.text):
+                # 入れ子のsectionContentsの中にあるH2は、内側のセクションで判定済み
+                parent = h2.getparent()
+                while parent is not None and parent is not section:
+                    if parent.tag == 'div' and self._element_has_class(parent, 'sectionContents'):
+                        break
+                    parent = parent.getparent()
+                if parent is section:
+                    return True
+        return False
+    
+    def _discard(self, element):
+        """閉じた要素と、それより前の兄弟要素を破棄してメモリを解放"""
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
@@ -0,0 +1,119 @@
+"""
+抽出・プロンプト生成・記事ディレクトリ生成を1つのプロセス内で実行するモジュール
+
+各ステージ間のデータはメモリ上のdictで受け渡し、中間JSONファイルは
+指定された場合にだけ書き出す。
+"""
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .article_catalog import DEFAULT_OUTPUT_ROOT, default_id_root
+    from .article_structure_generator import ArticleStructureGenerator, is_same_source
+    from .parser_backends import DEFAULT_PARSER_BACKEND, create_parser
+    from .prompt_generator import ALL_PHASES, PromptGenerator
+    from .report_data import save_report_data
+except ImportError:
+    from article_catalog import DEFAULT_OUTPUT_ROOT, default_id_root
+    from article_structure_generator import ArticleStructureGenerator, is_same_source
+    from parser_backends import DEFAULT_PARSER_BACKEND, create_parser
+    from prompt_generator import ALL_PHASES, PromptGenerator
+    from report_data import save_report_data
+
+
+class ArticlePipeline:
+    """Pascal HTMLレポートから、プロンプトと記事ディレクトリ構造までを一括で生成するクラス
+    
+    テンプレートは初期化時に1回だけ読み込むため、同じインスタンスで
+    複数の記事を続けて処理できる。
+    """
+    
+    def __init__(self, template_file: str = 'templates/prompts.md',
+                 backend: str = DEFAULT_PARSER_BACKEND, cache=None, id_root: Optional[str] = None):
+        """
+        Args:
+            template_file: プロンプトテンプレートファイルのパス
+            backend: HTMLパーサーのバックエンド
+            cache: 解析結果のキャッシュ（ExtractionCache、Noneの場合は使用しない）
+            id_root: 記事IDの連番を割り当てるルートディレクトリ（Noneの場合は記事ディレクトリの出力先）
+        """
+        self.prompt_generator = PromptGenerator(template_file)
+        self.backend = backend
+        self.cache = cache
+        self.id_root = id_root
+    
+    def extract(self, html_file: str, pattern: str, proposal_indices: Optional[List[int]] = None) -> Dict:
+        """HTMLからデータを抽出（cli.pyと同じ形式のdictを返す）"""
+        if self.cache is not None:
+            report = self.cache.load_report(html_file, lambda path: create_parser(path, self.backend))
+        else:
+            report = create_parser(html_file, self.backend)
+        return report.extract_all(pattern, proposal_indices)
+    
+    def run(self, html_file: str, pattern: str, proposal_indices: Optional[List[int]] = None,
+            article_output: str = DEFAULT_OUTPUT_ROOT, prompts_output: str = 'output/prompts',
+            h1_title: Optional[str] = None, phases: Optional[List[str]] = None,
+            json_output: Optional[str] = None, incremental: bool = False,
+            id_root: Optional[str] = None) -> Dict:
+        """
+        抽出・プロンプト生成・記事ディレクトリ生成を順に実行
+        
+        Args:
+            html_file: Pascal HTMLファイルのパス
+            pattern: 抽出するパターン（A/B）
+            proposal_indices: 選択する独自性の提案のインデックス
+            article_output: 記事ディレクトリの出力先
+            prompts_output: プロンプトの出力先
+            h1_title: 使用するH1タイトル（Noneの場合は最初の候補）
+            phases: 生成するフェーズ（Noneの場合はすべて）
+            json_output: 指定した場合は抽出結果をJSONファイルにも保存（拡張子が .prd ならバイナリ形式）
+            incremental: 記事ディレクトリを差分更新するか
+            id_root: 記事IDの連番を割り当てるルートディレクトリ（Noneの場合は初期化時の指定）
+        
+        Returns:
+            実行結果（抽出データ、出力先、ステージごとの所要時間）
+        """
+        timings = {}
+        
+        # 1. HTMLからデータを抽出
+        started = time.perf_counter()
+        json_data = self.extract(html_file, pattern, proposal_indices or [])
+        if json_output:
+            save_report_data(json_data, json_output)
+        timings['extract'] = round(time.perf_counter() - started, 4)
+        
+        # 2. プロンプトを生成
+        started = time.perf_counter()
+        prompts_to_save = self.prompt_generator.generate_phases(json_data, phases or ALL_PHASES)
+        self.prompt_generator.save_prompts(prompts_to_save, prompts_output, json_data)
+        timings['prompts'] = round(time.perf_counter() - started, 4)
+        
+        # 3. 記事ディレクトリ構造を生成
+        started = time.perf_counter()
+        source_name = Path(json_output).name if json_output else 'extracted_data.json'
+        article_generator = ArticleStructureGenerator.from_data(json_data, source_name)
+        id_root = id_root or self.id_root or default_id_root(article_output)
+        article_path = article_generator.generate_structure(
+            article_output,
+            h1_title,
+            html_file,
+            incremental=incremental,
+            id_root=id_root,
+            replace_content=not incremental and is_same_source(article_output, html_file, id_root)
+        )
+        timings['article'] = round(time.perf_counter() - started, 4)
+        
+        return {
+            'html_file': html_file,
+            'pattern': pattern,
+            'json_data': json_data,
+            'json_output': json_output,
+            'prompts_dir': str(Path(prompts_output) / f"pattern_{pattern}"),
+            'article_dir': article_path,
+            'prompt_counts': {phase: len(prompts) if isinstance(prompts, list) else 1
+                              for phase, prompts in prompts_to_save.items() if prompts},
+            'sync_result': article_generator.sync_result,
+            'timings': timings,
+        }
@@ -0,0 +1,177 @@
+"""
+抽出・プロンプト生成・記事ディレクトリ生成を一括で行うコマンドラインインターフェース
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .article_catalog import DEFAULT_OUTPUT_ROOT
+    from .pipeline import ArticlePipeline
+    from .parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND
+    from .extraction_cache import ExtractionCache, DEFAULT_CACHE_DIR
+    from .report_data import pattern_argument
+except ImportError:
+    from article_catalog import DEFAULT_OUTPUT_ROOT
+    from pipeline import ArticlePipeline
+    from parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND
+    from extraction_cache import ExtractionCache, DEFAULT_CACHE_DIR
+    from report_data import pattern_argument
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='Pascal HTMLレポートから、プロンプトと記事ディレクトリ構造までを1つのプロセスで生成します'
+    )
+    parser.add_argument(
+        'html_file',
+        type=str,
+        help='解析するPascal HTMLファイルのパス'
+    )
+    parser.add_argument(
+        '--pattern',
+        type=pattern_argument,
+        required=True,
+        help='抽出するパターン（A、Bなど）'
+    )
+    parser.add_argument(
+        '--proposals',
+        type=str,
+        default=None,
+        help='独自性の提案のインデックス（カンマ区切り、例: 0,1,2）'
+    )
+    parser.add_argument(
+        '--h1-title',
+        type=str,
+        default=None,
+        help='使用するH1タイトル（指定しない場合は最初の候補を使用）'
+    )
+    parser.add_argument(
+        '-t', '--template',
+        type=str,
+        default='templates/prompts.md',
+        help='プロンプトテンプレートファイルのパス（デフォルト: templates/prompts.md）'
+    )
+    parser.add_argument(
+        '--phases',
+        type=str,
+        default=None,
+        help='生成するフェーズを指定（カンマ区切り、例: 1,2,3）。指定しない場合はすべて生成'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        type=str,
+        default=DEFAULT_OUTPUT_ROOT,
+        help=f'記事ディレクトリの出力先（デフォルト: {DEFAULT_OUTPUT_ROOT}）'
+    )
+    parser.add_argument(
+        '--prompts-dir',
+        type=str,
+        default='output/prompts',
+        help='プロンプトの出力先（デフォルト: output/prompts）'
+    )
+    parser.add_argument(
+        '--save-json',
+        type=str,
+        default=None,
+        help='抽出結果をJSONファイルにも保存する場合、そのパス（拡張子が .prd ならバイナリ形式）'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='既存のcontentを置き換えず、変わったファイルだけを更新する'
+    )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER_BACKEND,
+        help='HTMLパーサーのバックエンド（lxml: XPathで直接検索して高速, soup: BeautifulSoupで全体を解析, stream: 逐次解析でメモリを節約、デフォルト: lxml）'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='解析結果のキャッシュを使わずにHTMLを解析する'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f'解析結果のキャッシュディレクトリ（デフォルト: {DEFAULT_CACHE_DIR}）'
+    )
+    parser.add_argument(
+        '--id-root',
+        type=str,
+        default=None,
+        help='記事IDの連番とカタログのルートディレクトリ（デフォルト: -o の出力ディレクトリ）。同じルートを使う記事同士で連番が重複しない'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    html_path = Path(args.html_file)
+    if not html_path.exists():
+        print(f"エラー: ファイルが見つかりません: {html_path}")
+        sys.exit(1)
+    
+    template_path = Path(args.template)
+    if not template_path.exists():
+        print(f"エラー: テンプレートファイルが見つかりません: {template_path}")
+        sys.exit(1)
+    
+    proposal_indices = []
+    if args.proposals:
+        try:
+            proposal_indices = [int(x.strip()) for x in args.proposals.split(',')]
+        except ValueError:
+            print("エラー: 提案のインデックスは数値でカンマ区切りで指定してください。")
+            sys.exit(1)
+    
+    phases = None
+    if args.phases:
+        try:
+            phases = [f'phase{int(x.strip())}' for x in args.phases.split(',')]
+        except ValueError:
+            print("エラー: フェーズ番号は数値でカンマ区切りで指定してください。")
+            sys.exit(1)
+    
+    cache = None if args.no_cache else ExtractionCache(args.cache_dir)
+    
+    try:
+        pipeline = ArticlePipeline(str(template_path), backend=args.backend, cache=cache, id_root=args.id_root)
+        result = pipeline.run(
+            str(html_path),
+            args.pattern,
+            proposal_indices,
+            article_output=args.output,
+            prompts_output=args.prompts_dir,
+            h1_title=args.h1_title,
+            phases=phases,
+            json_output=args.save_json,
+            incremental=args.incremental
+        )
+    except Exception as e:
+        print(f"エラー: 処理に失敗しました: {e}")
+        sys.exit(1)
+    
+    json_data = result['json_data']
+    timings = result['timings']
+    
+    print("\n" + "="*60)
+    print("生成結果のサマリー")
+    print("="*60)
+    print(f"**パターン:** {result['pattern']}")
+    print(f"**H2の数:** {len(json_data['article_structure'])} (独自性の提案: {len(json_data['originality_proposals'])})")
+    for phase, count in result['prompt_counts'].items():
+        print(f"{phase}: {count}件のプロンプトを生成")
+    print(f"\n所要時間: 抽出 {timings['extract']}秒 / プロンプト {timings['prompts']}秒 / 記事構造 {timings['article']}秒")
+    if result['json_output']:
+        print(f"\n抽出結果: {result['json_output']}")
+    print(f"プロンプト: {result['prompts_dir']}")
+    print(f"記事ディレクトリ: {result['article_dir']}")
+    print("\n完了しました！")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""
+処理の段階ごとの計測（プロファイリング）を行うモジュール
+
+PascalParser・PromptGenerator・ArticleStructureGeneratorの各段階
+（HTMLの読み込み、soupの構築、セクションの検索、パターンの抽出、テンプレートの展開、
+ファイルの書き込みなど）を stage() で囲んでおき、プロファイラーが有効なときだけ
+経過時間・CPU時間・メモリ確保のピーク（tracemalloc）・ファイル数/バイト数を記録する。
+プロファイラーが無効なときの stage() は何もしない。
+
+    profiler = Profiler()
+    with profiler:
+        with stage('parse', bytes=1234) as record:
+            ...
+            record.add(files=1)
+    profiler.print_summary()
+    profiler.export('profile.json', 'chrome')
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+# 出力形式（JSON Lines / Chromeのトレースイベント形式）
+PROFILE_FORMATS = ['jsonl', 'chrome']
+
+# 有効なプロファイラー（Noneのときはstage()は何もしない）
+_active_profiler: Optional['Profiler'] = None
+
+
+class StageRecord:
+    """1つの段階の計測結果"""
+    
+    def __init__(self, name: str, depth: int, counts: Dict[str, int]):
+        self.name = name
+        self.depth = depth
+        self.counts = dict(counts)
+        self.start_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_alloc_bytes = None
+        self.thread_id = threading.get_ident()
+    
+    def add(self, **counts):
+        """ファイル数・バイト数などの件数を加算"""
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+    
+    def to_dict(self) -> Dict[str, any]:
+        return {
+            'stage': self.name,
+            'depth': self.depth,
+            'start_ms': round(self.start_seconds * 1000, 3),
+            'wall_ms': round(self.wall_seconds * 1000, 3),
+            'cpu_ms': round(self.cpu_seconds * 1000, 3),
+            'peak_alloc_bytes': self.peak_alloc_bytes,
+            'counts': self.counts,
+        }
+
+
+class _NullStage:
+    """プロファイラーが無効なときのstage()（何も記録しない）"""
+    
+    def __enter__(self) -> '_NullStage':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+    
+    def add(self, **counts):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str, **counts):
+    """
+    段階を計測するコンテキストマネージャー（プロファイラーが無効なら何もしない）
+    
+    Args:
+        name: 段階の名前（例: soup_build、render_phase2）
+        counts: 最初から分かっている件数（files、bytes、itemsなど）
+    """
+    if _active_profiler is None:
+        return _NULL_STAGE
+    return _active_profiler.stage(name, **counts)
+
+
+def active_profiler() -> Optional['Profiler']:
+    """有効なプロファイラー（なければNone）"""
+    return _active_profiler
+
+
+class Profiler:
+    """段階ごとの経過時間・CPU時間・メモリ確保のピーク・件数を記録するクラス"""
+    
+    def __init__(self, trace_memory: bool = True):
+        """
+        Args:
+            trace_memory: tracemallocでメモリ確保のピークを計測するか（計測中は処理が遅くなる）
+        """
+        self.trace_memory = trace_memory
+        self.records: List[StageRecord] = []
+        self._stack: List[Dict[str, any]] = []
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = False
+    
+    def __enter__(self) -> 'Profiler':
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+    
+    def start(self):
+        """プロファイラーを有効にする（stage()の記録を開始）"""
+        global _active_profiler
+        # tracemallocはpickleなどを読み込むため、計測するときに初めて読み込む
+        import tracemalloc
+        
+        self._origin = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        _active_profiler = self
+    
+    def stop(self):
+        """プロファイラーを無効にする"""
+        global _active_profiler
+        if _active_profiler is self:
+            _active_profiler = None
+        if self._started_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+    
+    @contextmanager
+    def stage(self, name: str, **counts):
+        """段階を計測する（stage()から呼ばれる）"""
+        import tracemalloc
+        
+        record = StageRecord(name, len(self._stack), counts)
+        frame = {'peak': 0, 'start_memory': 0}
+        
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # 親の段階のここまでのピークを保存してから、この段階のためにリセットする
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start_memory'] = current
+        
+        self._stack.append(frame)
+        record.start_seconds = time.perf_counter() - self._origin
+        cpu_started = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - self._origin - record.start_seconds
+            record.cpu_seconds = time.process_time() - cpu_started
+            self._stack.pop()
+            
+            if tracing and tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                peak = max(frame['peak'], peak)
+                record.peak_alloc_bytes = max(0, peak - frame['start_memory'])
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            
+            self.records.append(record)
+    
+    def sorted_records(self) -> List[StageRecord]:
+        """開始時刻順の計測結果"""
+        return sorted(self.records, key=lambda record: (record.start_seconds, record.depth))
+    
+    def print_summary(self):
+        """段階ごとの計測結果を表示"""
+        print("\n" + "="*60)
+        print("プロファイル")
+        print("="*60)
+        print(f"{'段階':<28}{'経過(ms)':>10}{'CPU(ms)':>10}{'ピーク(KB)':>12}  件数")
+        for record in self.sorted_records():
+            name = '  ' * record.depth + record.name
+            peak = f"{record.peak_alloc_bytes / 1024:.1f}" if record.peak_alloc_bytes is not None else '-'
+            counts = ', '.join(f"{key}={value}" for key, value in record.counts.items())
+            print(f"{name:<28}{record.wall_seconds * 1000:>10.2f}{record.cpu_seconds * 1000:>10.2f}"
+                  f"{peak:>12}  {counts}")
+    
+    def export(self, output_file: str, profile_format: str = 'jsonl'):
+        """
+        計測結果をファイルに書き出す
+        
+        Args:
+            output_file: 出力先のパス
+            profile_format: 'jsonl'（1段階1行のJSON）または
+                            'chrome'（chrome://tracing や Perfetto で開けるトレースイベント形式）
+        """
+        if profile_format not in PROFILE_FORMATS:
+            raise ValueError(f"不明な形式です: {profile_format}（利用可能: {PROFILE_FORMATS}）")
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            if profile_format == 'jsonl':
+                for record in self.sorted_records():
+                    f.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+                return
+            
+            pid = os.getpid()
+            events = []
+            for record in self.sorted_records():
+                args = dict(record.counts)
+                args['cpu_ms'] = round(record.cpu_seconds * 1000, 3)
+                if record.peak_alloc_bytes is not None:
+                    args['peak_alloc_bytes'] = record.peak_alloc_bytes
+                events.append({
+                    'name': record.name,
+                    'cat': 'stage',
+                    'ph': 'X',
+                    'ts': round(record.start_seconds * 1_000_000, 1),
+                    'dur': round(record.wall_seconds * 1_000_000, 1),
+                    'pid': pid,
+                    'tid': record.thread_id,
+                    'args': args,
+                })
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+
+def add_profile_arguments(parser):
+    """CLIに--profileと--profile-formatの引数を追加"""
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='',
+        default=None,
+        metavar='FILE',
+        help='段階ごとの経過時間・CPU時間・メモリ確保のピーク・件数を表示する（FILEを指定した場合は書き出す）'
+    )
+    parser.add_argument(
+        '--profile-format',
+        type=str,
+        choices=PROFILE_FORMATS,
+        default='jsonl',
+        help='--profileで書き出す形式（jsonl: 1段階1行のJSON, chrome: chrome://tracing・Perfetto用、デフォルト: jsonl）'
+    )
+
+
+def start_profile(args) -> Optional[Profiler]:
+    """--profileが指定されていればプロファイラーを開始して返す"""
+    if args.profile is None:
+        return None
+    profiler = Profiler()
+    profiler.start()
+    return profiler
+
+
+def finish_profile(profiler: Optional[Profiler], args):
+    """プロファイラーを停止し、結果を表示・書き出す"""
+    if profiler is None:
+        return
+    profiler.stop()
+    profiler.print_summary()
+    if args.profile:
+        profiler.export(args.profile, args.profile_format)
+        print(f"\nプロファイルを保存しました: {args.profile}（{args.profile_format}）")
@@ -4,22 +4,49 @@
 import argparse
 import sys
 from pathlib import Path
+from typing import List, Optional
 
 # 相対インポートと絶対インポートの両方に対応
 try:
-    from .prompt_generator import PromptGenerator
+    from .prompt_generator import ALL_PHASES, PromptGenerator
+    from .profiling import stage, add_profile_arguments, start_profile, finish_profile
+    from .report_data import split_patterns
 except ImportError:
-    from prompt_generator import PromptGenerator
+    from prompt_generator import ALL_PHASES, PromptGenerator
+    from profiling import stage, add_profile_arguments, start_profile, finish_profile
+    from report_data import split_patterns
 
 
-def main():
+def print_prompt_summary(pattern: str, prompts_to_save: dict):
+    """パターンごとの生成結果を表示"""
+    print(f"**パターン:** {pattern}")
+    
+    phase1_count = len(prompts_to_save.get('phase1', []))
+    phase2_count = len(prompts_to_save.get('phase2', []))
+    phase3_count = len(prompts_to_save.get('phase3', []))
+    
+    if phase1_count > 0:
+        print(f"Phase 1: {phase1_count}件のプロンプトを生成（各H2ごと）")
+    if phase2_count > 0:
+        print(f"Phase 2: {phase2_count}件のプロンプトを生成（各H3ごと）")
+    if phase3_count > 0:
+        print(f"Phase 3: {phase3_count}件のプロンプトを生成（各H2ごと）")
+    if 'phase4' in prompts_to_save:
+        print("Phase 4: 記事執筆プロンプトを生成")
+    if 'phase5' in prompts_to_save:
+        print("Phase 5: 画像生成プロンプトを生成")
+    if 'phase6' in prompts_to_save:
+        print("Phase 6: まとめプロンプトを生成")
+
+
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(
         description='JSONデータからプロンプトを生成します'
     )
     parser.add_argument(
         'json_file',
         type=str,
-        help='抽出されたJSONデータファイルのパス'
+        help='抽出されたJSONデータファイルのパス（バイナリ形式の .prd も可）'
     )
     parser.add_argument(
         '-t', '--template',
@@ -39,8 +66,31 @@ def main():
         default=None,
         help='生成するフェーズを指定（カンマ区切り、例: 1,2,3）。指定しない場合はすべて生成'
     )
+    parser.add_argument(
+        '--skip-unchanged',
+        action='store_true',
+        help='既存のプロンプトファイルと内容が同じ場合は書き込まない'
+    )
+    parser.add_argument(
+        '--write-workers',
+        type=int,
+        default=None,
+        help='プロンプトファイルを書き込むスレッド数（デフォルト: 16）'
+    )
+    parser.add_argument(
+        '--bundle',
+        type=str,
+        default=None,
+        help='プロンプトを個別のファイルではなく、指定したバンドルファイル（1つのSQLiteファイル）に保存する'
+    )
+    parser.add_argument(
+        '--no-template-cache',
+        action='store_true',
+        help='解析済みテンプレートのキャッシュファイル（テンプレートと同じ場所の.<名前>.compiled）を使わない'
+    )
+    add_profile_arguments(parser)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # JSONファイルの存在確認
     json_path = Path(args.json_file)
@@ -54,16 +104,19 @@ def main():
         print(f"エラー: テンプレートファイルが見つかりません: {template_path}")
         sys.exit(1)
     
+    profiler = start_profile(args)
+    
     # プロンプトジェネレーターを初期化
     try:
-        generator = PromptGenerator(str(template_path))
+        generator = PromptGenerator(str(template_path), not args.no_template_cache)
     except Exception as e:
         print(f"エラー: テンプレートファイルの読み込みに失敗しました: {e}")
         sys.exit(1)
     
     # JSONデータを読み込む
     try:
-        json_data = generator.load_json_data(str(json_path))
+        with stage('json_load', bytes=json_path.stat().st_size):
+            json_data = generator.load_json_data(str(json_path))
     except Exception as e:
         print(f"エラー: JSONファイルの読み込みに失敗しました: {e}")
         sys.exit(1)
@@ -74,9 +127,14 @@ def main():
     else:
         output_dir = Path('output') / 'prompts'
     
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if not args.bundle:
+        output_dir.mkdir(parents=True, exist_ok=True)
     
     # 生成するフェーズを決定
+    if args.write_workers is not None and args.write_workers < 1:
+        print("エラー: 書き込みスレッド数は1以上を指定してください。")
+        sys.exit(1)
+    
     if args.phases:
         try:
             phase_numbers = [int(x.strip()) for x in args.phases.split(',')]
@@ -85,60 +143,67 @@ def main():
             print("エラー: フェーズ番号は数値でカンマ区切りで指定してください。")
             sys.exit(1)
     else:
-        phases_to_generate = ['phase1', 'phase2', 'phase3', 'phase4', 'phase5', 'phase6']
+        phases_to_generate = list(ALL_PHASES)
     
     # プロンプトを生成
     print("\n" + "="*60)
     print("プロンプト生成中...")
     print("="*60)
     
-    all_prompts = generator.generate_all(json_data)
-    
-    # 指定されたフェーズのみを保存
-    prompts_to_save = {}
+    # 指定されたフェーズのみを生成
     for phase in phases_to_generate:
-        if phase in all_prompts:
-            prompts_to_save[phase] = all_prompts[phase]
-        else:
+        if phase not in ALL_PHASES:
             print(f"警告: {phase}が見つかりませんでした。")
     
-    # プロンプトを保存
-    try:
-        generator.save_prompts(prompts_to_save, str(output_dir), json_data)
-    except Exception as e:
-        print(f"エラー: プロンプトの保存に失敗しました: {e}")
-        sys.exit(1)
+    # 複数パターンのデータ（--pattern all）は、コンパイル済みのテンプレートを共有してパターンごとに生成
+    results = []
+    for pattern_data in split_patterns(json_data):
+        prompts_to_save = generator.generate_phases(pattern_data, phases_to_generate)
+        
+        # プロンプトを保存
+        try:
+            if args.bundle:
+                write_stats = generator.save_prompts_bundle(prompts_to_save, args.bundle, pattern_data)
+            else:
+                write_stats = generator.save_prompts(
+                    prompts_to_save,
+                    str(output_dir),
+                    pattern_data,
+                    max_workers=args.write_workers,
+                    skip_unchanged=args.skip_unchanged
+                )
+        except Exception as e:
+            print(f"エラー: プロンプトの保存に失敗しました: {e}")
+            sys.exit(1)
+        results.append((pattern_data.get('pattern', 'Unknown'), prompts_to_save, write_stats))
     
     # 結果を表示
-    pattern = json_data.get('pattern', 'Unknown')
-    pattern_dir = Path(output_dir) / f"pattern_{pattern}"
-    
     print("\n" + "="*60)
     print("生成結果のサマリー")
     print("="*60)
-    print(f"**パターン:** {pattern}")
-    
-    phase1_count = len(prompts_to_save.get('phase1', []))
-    phase2_count = len(prompts_to_save.get('phase2', []))
-    phase3_count = len(prompts_to_save.get('phase3', []))
     
-    if phase1_count > 0:
-        print(f"Phase 1: {phase1_count}件のプロンプトを生成（各H2ごと）")
-    if phase2_count > 0:
-        print(f"Phase 2: {phase2_count}件のプロンプトを生成（各H3ごと）")
-    if phase3_count > 0:
-        print(f"Phase 3: {phase3_count}件のプロンプトを生成（各H2ごと）")
-    if 'phase4' in prompts_to_save:
-        print("Phase 4: 記事執筆プロンプトを生成")
-    if 'phase5' in prompts_to_save:
-        print("Phase 5: 画像生成プロンプトを生成")
-    if 'phase6' in prompts_to_save:
-        print("Phase 6: まとめプロンプトを生成")
-    
-    print(f"\n出力先: {pattern_dir}")
+    for i, (pattern, prompts_to_save, write_stats) in enumerate(results):
+        if i > 0:
+            print()
+        print_prompt_summary(pattern, prompts_to_save)
+        
+        if args.bundle:
+            print(f"\n出力先: {args.bundle}（prompts/pattern_{pattern}/）")
+            continue
+        
+        print("\nファイル書き込み:")
+        for phase in phases_to_generate:
+            stats = write_stats.get(phase)
+            if not stats or not (stats['files'] or stats['skipped']):
+                continue
+            print(f"  {phase}: {stats['files']}件 {stats['bytes']}バイト "
+                  f"(変更なしで省略: {stats['skipped']}件, {stats['seconds']}秒)")
+        
+        print(f"\n出力先: {Path(output_dir) / f'pattern_{pattern}'}")
+    
+    finish_profile(profiler, args)
     print("\n完了しました！")
 
 
 if __name__ == '__main__':
     main()
-
@@ -1,139 +1,367 @@
 """
 プロンプトテンプレートからJSONデータを埋め込んでプロンプトを生成するモジュール
 """
-import json
+import hashlib
+import marshal
+import os
 import re
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .article_bundle import ArticleBundle
+    from .file_writer import WritePlan
+    from .profiling import stage
+    from .report_data import load_report_data
+except ImportError:
+    from article_bundle import ArticleBundle
+    from file_writer import WritePlan
+    from profiling import stage
+    from report_data import load_report_data
+
+
+# テンプレート内のプレースホルダー
+PLACEHOLDER_THEME = '[ここにH2または記事の主要テーマを入力]'
+PLACEHOLDER_H3 = '[ここにH3を入力]'
+PLACEHOLDER_H2 = '[ここにH2を入力]'
+PLACEHOLDER_H3_LIST = '[ここにH3のリストをすべて貼り付け]'
+PLACEHOLDERS = [PLACEHOLDER_THEME, PLACEHOLDER_H3, PLACEHOLDER_H2, PLACEHOLDER_H3_LIST]
+
+# フェーズ見出し（## ）から次のフェーズ見出しまでを1つのフェーズとして扱う
+PHASE_SECTION_PATTERN = re.compile(r'## ([^\n]*)\n(.*?)(?=\n## |\Z)', re.DOTALL)
+PLACEHOLDER_PATTERN = re.compile('(' + '|'.join(re.escape(p) for p in PLACEHOLDERS) + ')')
+
+# H2・H3ごとに展開するフェーズのテンプレート名
+PHASE1_TEMPLATE = 'phase1（FACT_ソース集め）'
+PHASE2_TEMPLATE = 'phase2（FACT_アウトプット）'
+PHASE3_TEMPLATE = 'phase3（Experience_アウトプット）'
+
+# 生成できるフェーズ
+ALL_PHASES = ['phase1', 'phase2', 'phase3', 'phase4', 'phase5', 'phase6']
+
+
+class CompiledTemplate:
+    """
+    プロンプトテンプレートを解析済みの形で保持するクラス
+    
+    テンプレートを一度だけフェーズごとに分割し、各フェーズ本文を
+    リテラル部分とプレースホルダー部分のセグメント列に変換しておく。
+    プロンプトの生成はセグメントを連結するだけで行う。
+    """
+    
+    def __init__(self, phases: List[Tuple[str, List[Tuple[bool, str]]]]):
+        """
+        Args:
+            phases: (見出し行, セグメント列) のリスト。セグメントは (プレースホルダーか, テキスト)
+        """
+        self.phases = phases
+        self._phase_lookup = {}
+    
+    @classmethod
+    def compile(cls, template_content: str) -> 'CompiledTemplate':
+        """テンプレート文字列を解析してCompiledTemplateを作成"""
+        # テンプレート内の`\_`を`_`に正規化
+        # （Markdownのエスケープ記法に対応）
+        normalized_content = template_content.replace('\\_', '_')
+        phases = []
+        for match in PHASE_SECTION_PATTERN.finditer(normalized_content):
+            heading = match.group(1)
+            body = match.group(2).strip()
+            segments = [
+                (index % 2 == 1, part)
+                for index, part in enumerate(PLACEHOLDER_PATTERN.split(body))
+                if part
+            ]
+            phases.append((heading, segments))
+        return cls(phases)
+    
+    def find_phase(self, phase_name: str) -> Optional[List[Tuple[bool, str]]]:
+        """見出しがphase_nameで始まる最初のフェーズのセグメント列を取得"""
+        if phase_name not in self._phase_lookup:
+            segments = None
+            for heading, phase_segments in self.phases:
+                if heading.startswith(phase_name):
+                    segments = phase_segments
+                    break
+            self._phase_lookup[phase_name] = segments
+        return self._phase_lookup[phase_name]
+    
+    def phase_text(self, phase_name: str) -> Optional[str]:
+        """フェーズ本文をプレースホルダーを埋めずにそのまま取得"""
+        segments = self.find_phase(phase_name)
+        if segments is None:
+            return None
+        return ''.join(text for _, text in segments)
+    
+    def render(self, phase_name: str, values: Dict[str, str]) -> Optional[str]:
+        """
+        フェーズ本文のプレースホルダーを値で置き換えたプロンプトを生成
+        
+        Args:
+            phase_name: フェーズ名（見出しの先頭部分）
+            values: プレースホルダーをキーとした置換後の文字列
+        """
+        segments = self.find_phase(phase_name)
+        if segments is None:
+            return None
+        return ''.join(
+            values.get(text, text) if is_placeholder else text
+            for is_placeholder, text in segments
+        )
+
+
+# 解析済みテンプレートキャッシュファイルの形式のバージョン（形式を変えたら上げる）
+TEMPLATE_CACHE_VERSION = 1
+
+# プロセス内で解析済みのテンプレート（テンプレート内容のハッシュをキーとする）
+_compiled_templates: Dict[str, CompiledTemplate] = {}
+
+
+def template_cache_path(template_file: Path) -> Path:
+    """解析済みテンプレートのキャッシュファイルのパス（テンプレートと同じディレクトリ）"""
+    return template_file.with_name(f".{template_file.name}.compiled")
+
+
+def _read_template_cache(cache_file: Path, mtime_ns: int, content_hash: str) -> Optional[CompiledTemplate]:
+    """キャッシュファイルを読み込む（テンプレートの更新日時かハッシュが変わっていればNone）"""
+    try:
+        with open(cache_file, 'rb') as f:
+            payload = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    
+    if not isinstance(payload, dict):
+        return None
+    if (payload.get('version') != TEMPLATE_CACHE_VERSION
+            or payload.get('marshal_version') != marshal.version
+            or payload.get('mtime_ns') != mtime_ns
+            or payload.get('sha256') != content_hash):
+        return None
+    return CompiledTemplate(payload['phases'])
+
+
+def _write_template_cache(cache_file: Path, mtime_ns: int, content_hash: str, compiled: CompiledTemplate):
+    """キャッシュファイルを書き込む（書き込めない場合は何もしない）"""
+    payload = {
+        'version': TEMPLATE_CACHE_VERSION,
+        'marshal_version': marshal.version,
+        'mtime_ns': mtime_ns,
+        'sha256': content_hash,
+        'phases': compiled.phases
+    }
+    temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_file, 'wb') as f:
+            marshal.dump(payload, f)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        try:
+            temp_file.unlink()
+        except OSError:
+            pass
+
+
+def load_compiled_template(template_file: Path, template_content: str,
+                           use_disk_cache: bool = True) -> CompiledTemplate:
+    """
+    解析済みテンプレートを取得
+    
+    プロセス内で解析済みならそれを再利用し、なければテンプレートと同じ
+    ディレクトリのキャッシュファイルから読み込む。テンプレートの更新日時または
+    ハッシュが変わっている場合は解析し直してキャッシュファイルを更新する。
+    
+    Args:
+        template_file: テンプレートファイルのパス
+        template_content: テンプレートファイルの内容
+        use_disk_cache: キャッシュファイルを使用するか
+    """
+    content_hash = hashlib.sha256(template_content.encode('utf-8')).hexdigest()
+    compiled = _compiled_templates.get(content_hash)
+    if compiled is not None:
+        return compiled
+    
+    if use_disk_cache:
+        cache_file = template_cache_path(template_file)
+        mtime_ns = template_file.stat().st_mtime_ns
+        compiled = _read_template_cache(cache_file, mtime_ns, content_hash)
+        if compiled is None:
+            compiled = CompiledTemplate.compile(template_content)
+            _write_template_cache(cache_file, mtime_ns, content_hash, compiled)
+    else:
+        compiled = CompiledTemplate.compile(template_content)
+    
+    _compiled_templates[content_hash] = compiled
+    return compiled
 
 
 class PromptGenerator:
     """プロンプトテンプレートにJSONデータを埋め込んで生成するクラス"""
     
-    def __init__(self, template_file: str):
+    def __init__(self, template_file: str, use_template_cache: bool = True):
         """
         Args:
             template_file: プロンプトテンプレートファイルのパス
+            use_template_cache: 解析済みテンプレートのキャッシュファイルを使用するか
         """
         self.template_file = Path(template_file)
         if not self.template_file.exists():
             raise FileNotFoundError(f"テンプレートファイルが見つかりません: {template_file}")
         
-        with open(self.template_file, 'r', encoding='utf-8') as f:
-            self.template_content = f.read()
+        with stage('template_load', files=1):
+            with open(self.template_file, 'r', encoding='utf-8') as f:
+                self.template_content = f.read()
+            self.compiled_template = load_compiled_template(
+                self.template_file,
+                self.template_content,
+                use_template_cache
+            )
     
     def load_json_data(self, json_file: str) -> Dict:
-        """JSONファイルを読み込む"""
+        """抽出データのファイルを読み込む（JSON・バイナリ形式は自動判別）"""
         json_path = Path(json_file)
         if not json_path.exists():
             raise FileNotFoundError(f"JSONファイルが見つかりません: {json_file}")
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_report_data(json_path)
     
     def extract_phase(self, phase_name: str) -> Optional[str]:
         """テンプレートから特定のフェーズを抽出"""
-        # テンプレート内の`\_`を`_`に正規化してから検索
-        # （Markdownのエスケープ記法に対応）
-        normalized_content = self.template_content.replace('\\_', '_')
-        # フェーズの開始パターンを検索
-        pattern = rf'## {re.escape(phase_name)}.*?\n(.*?)(?=\n## |\Z)'
-        match = re.search(pattern, normalized_content, re.DOTALL)
-        if match:
-            return match.group(1).strip()
-        return None
+        return self.compiled_template.phase_text(phase_name)
     
     def generate_phase1(self, json_data: Dict) -> List[Dict[str, str]]:
         """phase1プロンプトを生成（各H2ごとに）"""
-        prompts = []
-        phase_template = self.extract_phase('phase1（FACT_ソース集め）')
-        if not phase_template:
-            return prompts
-        
-        for h2_index, h2_section in enumerate(json_data.get('article_structure', []), start=1):
-            h2_title = h2_section.get('h2', '')
-            if not h2_title:
-                continue
-            
-            prompt = phase_template.replace(
-                '[ここにH2または記事の主要テーマを入力]',
-                h2_title
-            )
-            
-            prompts.append({
-                'phase': 'phase1',
-                'h2_index': h2_index,
-                'h2': h2_title,
-                'prompt': prompt
-            })
-        
-        return prompts
+        return list(self.iter_phase1(json_data))
     
     def generate_phase2(self, json_data: Dict) -> List[Dict[str, str]]:
         """phase2プロンプトを生成（各H3ごとに）"""
-        prompts = []
-        phase_template = self.extract_phase('phase2（FACT_アウトプット）')
-        if not phase_template:
-            return prompts
-        
-        for h2_index, h2_section in enumerate(json_data.get('article_structure', []), start=1):
-            h2_title = h2_section.get('h2', '')
-            h3_sections = h2_section.get('h3_sections', [])
-            
-            for h3_index, h3_section in enumerate(h3_sections, start=1):
-                h3_title = h3_section.get('h3', '')
-                if not h3_title:
-                    continue
-                
-                prompt = phase_template.replace(
-                    '[ここにH3を入力]',
-                    h3_title
-                )
-                
-                prompts.append({
-                    'phase': 'phase2',
-                    'h2_index': h2_index,
-                    'h3_index': h3_index,
-                    'h2': h2_title,
-                    'h3': h3_title,
-                    'prompt': prompt
-                })
-        
-        return prompts
+        return list(self.iter_phase2(json_data))
     
     def generate_phase3(self, json_data: Dict) -> List[Dict[str, str]]:
         """phase3プロンプトを生成（各H2ごとに）"""
-        prompts = []
-        phase_template = self.extract_phase('phase3（Experience_アウトプット）')
-        if not phase_template:
-            return prompts
-        
+        return list(self.iter_phase3(json_data))
+    
+    def iter_phase1(self, json_data: Dict) -> Iterator[Dict[str, str]]:
+        """phase1プロンプトを1件ずつ生成（取り出した分だけテンプレートを展開する）"""
+        if not self.extract_phase(PHASE1_TEMPLATE):
+            return
         for h2_index, h2_section in enumerate(json_data.get('article_structure', []), start=1):
-            h2_title = h2_section.get('h2', '')
-            h3_sections = h2_section.get('h3_sections', [])
-            
-            if not h2_title or not h3_sections:
-                continue
-            
-            # H3のリストを作成
-            h3_list = '\n'.join([f"- {h3.get('h3', '')}" for h3 in h3_sections if h3.get('h3')])
-            
-            prompt = phase_template.replace(
-                '[ここにH2を入力]',
-                h2_title
-            ).replace(
-                '[ここにH3のリストをすべて貼り付け]',
-                h3_list
-            )
-            
-            prompts.append({
-                'phase': 'phase3',
-                'h2_index': h2_index,
-                'h2': h2_title,
-                'prompt': prompt
-            })
+            prompt_data = self._render_phase1(h2_index, h2_section)
+            if prompt_data:
+                yield prompt_data
+    
+    def iter_phase2(self, json_data: Dict) -> Iterator[Dict[str, str]]:
+        """phase2プロンプトを1件ずつ生成（取り出した分だけテンプレートを展開する）"""
+        if not self.extract_phase(PHASE2_TEMPLATE):
+            return
+        for h2_index, h2_section in enumerate(json_data.get('article_structure', []), start=1):
+            for h3_index, h3_section in enumerate(h2_section.get('h3_sections', []), start=1):
+                prompt_data = self._render_phase2(h2_index, h2_section, h3_index, h3_section)
+                if prompt_data:
+                    yield prompt_data
+    
+    def iter_phase3(self, json_data: Dict) -> Iterator[Dict[str, str]]:
+        """phase3プロンプトを1件ずつ生成（取り出した分だけテンプレートを展開する）"""
+        if not self.extract_phase(PHASE3_TEMPLATE):
+            return
+        for h2_index, h2_section in enumerate(json_data.get('article_structure', []), start=1):
+            prompt_data = self._render_phase3(h2_index, h2_section)
+            if prompt_data:
+                yield prompt_data
+    
+    def _render_phase1(self, h2_index: int, h2_section: Dict) -> Optional[Dict[str, str]]:
+        """H2 1件分のphase1プロンプト（H2タイトルがなければNone）"""
+        h2_title = h2_section.get('h2', '')
+        if not h2_title:
+            return None
         
-        return prompts
+        prompt = self.compiled_template.render(PHASE1_TEMPLATE, {PLACEHOLDER_THEME: h2_title})
+        
+        return {
+            'phase': 'phase1',
+            'h2_index': h2_index,
+            'h2': h2_title,
+            'prompt': prompt
+        }
+    
+    def _render_phase2(self, h2_index: int, h2_section: Dict,
+                       h3_index: int, h3_section: Dict) -> Optional[Dict[str, str]]:
+        """H3 1件分のphase2プロンプト（H3タイトルがなければNone）"""
+        h3_title = h3_section.get('h3', '')
+        if not h3_title:
+            return None
+        
+        prompt = self.compiled_template.render(PHASE2_TEMPLATE, {PLACEHOLDER_H3: h3_title})
+        
+        return {
+            'phase': 'phase2',
+            'h2_index': h2_index,
+            'h3_index': h3_index,
+            'h2': h2_section.get('h2', ''),
+            'h3': h3_title,
+            'prompt': prompt
+        }
+    
+    def _render_phase3(self, h2_index: int, h2_section: Dict) -> Optional[Dict[str, str]]:
+        """H2 1件分のphase3プロンプト（H2タイトルまたはH3がなければNone）"""
+        h2_title = h2_section.get('h2', '')
+        h3_sections = h2_section.get('h3_sections', [])
+        
+        if not h2_title or not h3_sections:
+            return None
+        
+        # H3のリストを作成
+        h3_list = '\n'.join([f"- {h3.get('h3', '')}" for h3 in h3_sections if h3.get('h3')])
+        
+        prompt = self.compiled_template.render(PHASE3_TEMPLATE, {
+            PLACEHOLDER_H2: h2_title,
+            PLACEHOLDER_H3_LIST: h3_list
+        })
+        
+        return {
+            'phase': 'phase3',
+            'h2_index': h2_index,
+            'h2': h2_title,
+            'prompt': prompt
+        }
+    
+    def render_prompt(self, json_data: Dict, phase: str, h2_index: Optional[int] = None,
+                      h3_index: Optional[int] = None) -> Optional[Dict[str, str]]:
+        """
+        指定したプロンプト1件だけを生成（他のプロンプトは展開しない）
+        
+        Args:
+            json_data: 抽出されたJSONデータ
+            phase: フェーズ（phase1〜phase6）
+            h2_index: H2番号（1始まり、phase1〜3で必須）
+            h3_index: H3番号（1始まり、phase2で必須）
+        
+        Returns:
+            generate_allの要素と同じ形式のプロンプト（存在しない場合はNone）
+        """
+        if phase not in ALL_PHASES:
+            raise ValueError(f"不明なフェーズです: {phase}（利用可能: {ALL_PHASES}）")
+        if phase in ('phase4', 'phase5', 'phase6'):
+            return self.generate_phases(json_data, [phase])[phase] or None
+        
+        template_name = {'phase1': PHASE1_TEMPLATE, 'phase2': PHASE2_TEMPLATE, 'phase3': PHASE3_TEMPLATE}[phase]
+        if not self.extract_phase(template_name):
+            return None
+        
+        h2_sections = json_data.get('article_structure', [])
+        if h2_index is None or not 1 <= h2_index <= len(h2_sections):
+            return None
+        h2_section = h2_sections[h2_index - 1]
+        
+        if phase == 'phase1':
+            return self._render_phase1(h2_index, h2_section)
+        if phase == 'phase3':
+            return self._render_phase3(h2_index, h2_section)
+        
+        h3_sections = h2_section.get('h3_sections', [])
+        if h3_index is None or not 1 <= h3_index <= len(h3_sections):
+            return None
+        return self._render_phase2(h2_index, h2_section, h3_index, h3_sections[h3_index - 1])
     
     def generate_phase4(self, json_data: Dict) -> Dict[str, str]:
         """phase4プロンプトを生成（設計図全体）"""
@@ -213,112 +441,138 @@ class PromptGenerator:
     
     def generate_all(self, json_data: Dict) -> Dict[str, any]:
         """すべてのフェーズのプロンプトを生成"""
-        return {
-            'phase1': self.generate_phase1(json_data),
-            'phase2': self.generate_phase2(json_data),
-            'phase3': self.generate_phase3(json_data),
-            'phase4': self.generate_phase4(json_data),
-            'phase5': self.generate_phase5(),
-            'phase6': self.generate_phase6()
+        return self.generate_phases(json_data, ALL_PHASES)
+    
+    def generate_phases(self, json_data: Dict, phases: List[str]) -> Dict[str, any]:
+        """
+        指定したフェーズのプロンプトだけを生成（ALL_PHASESにないフェーズは含めない）
+        
+        Args:
+            json_data: 抽出されたJSONデータ
+            phases: 生成するフェーズ（例: ['phase1', 'phase4']）
+        """
+        generators = {
+            'phase1': lambda: self.generate_phase1(json_data),
+            'phase2': lambda: self.generate_phase2(json_data),
+            'phase3': lambda: self.generate_phase3(json_data),
+            'phase4': lambda: self.generate_phase4(json_data),
+            'phase5': self.generate_phase5,
+            'phase6': self.generate_phase6,
         }
+        prompts = {}
+        for phase in phases:
+            if phase not in generators:
+                continue
+            with stage(f'render_{phase}') as record:
+                prompts[phase] = generators[phase]()
+                record.add(prompts=len(prompts[phase]) if isinstance(prompts[phase], list) else int(bool(prompts[phase])))
+        return prompts
     
-    def save_prompts(self, prompts: Dict[str, any], output_dir: str, json_data: Dict):
-        """生成されたプロンプトをファイルに保存"""
+    def save_prompts(self, prompts: Dict[str, any], output_dir: str, json_data: Dict,
+                     max_workers: Optional[int] = None, skip_unchanged: bool = False) -> Dict[str, Dict]:
+        """
+        生成されたプロンプトをファイルに保存
+        
+        すべてのプロンプトのファイル内容を先に組み立て、フェーズごとに
+        スレッドプールで並列に書き込む。
+        
+        Args:
+            prompts: generate_allの戻り値
+            output_dir: 出力ディレクトリ
+            json_data: 抽出されたJSONデータ（パターン情報に使用）
+            max_workers: 書き込みスレッド数
+            skip_unchanged: 既存ファイルと内容が同じ場合は書き込まない
+        
+        Returns:
+            フェーズごとの書き込み結果（files, skipped, bytes, seconds）
+        """
         # パターン情報を取得
         pattern = json_data.get('pattern', 'Unknown')
         
-        # パターン別のベースディレクトリを作成
+        # パターン別のベースディレクトリ
         base_path = Path(output_dir) / f"pattern_{pattern}"
-        base_path.mkdir(parents=True, exist_ok=True)
+        
+        stats = {}
+        for phase, plan in self.build_prompt_plans(prompts).items():
+            with stage(f'write_{phase}') as record:
+                stats[phase] = plan.commit(str(base_path / phase), max_workers, skip_unchanged)
+                record.add(files=stats[phase]['files'], bytes=stats[phase]['bytes'])
+        return stats
+    
+    def save_prompts_bundle(self, prompts: Dict[str, any], bundle_file: str, json_data: Dict) -> Dict[str, Dict]:
+        """
+        生成されたプロンプトをバンドルファイル（1つのSQLiteファイル）に保存
+        
+        メンバー名はprompts/pattern_X/phaseN/...。指定したフェーズの既存メンバーは置き換える。
+        
+        Returns:
+            フェーズごとの書き込み結果（files, bytes）
+        """
+        pattern = json_data.get('pattern', 'Unknown')
+        
+        stats = {}
+        with ArticleBundle(bundle_file) as bundle:
+            for phase, plan in self.build_prompt_plans(prompts).items():
+                if phase not in prompts:
+                    continue
+                stats[phase] = bundle.write_plan(
+                    plan,
+                    prefix=f"prompts/pattern_{pattern}/{phase}/",
+                    replace_prefix=True,
+                    pattern=pattern
+                )
+        return stats
+    
+    def build_prompt_plans(self, prompts: Dict[str, any]) -> Dict[str, WritePlan]:
+        """フェーズごとに、保存するプロンプトファイル（フェーズディレクトリからの相対パスと内容）を組み立てる"""
+        plans = {}
         
         # phase1: 各H2ごとに保存（プロンプト本文のみ）
-        phase1_dir = base_path / "phase1"
-        phase1_dir.mkdir(exist_ok=True)
+        plan = plans['phase1'] = WritePlan()
         for prompt_data in prompts.get('phase1', []):
             h2_index = prompt_data.get('h2_index', 0)
             h2_safe = self._sanitize_filename(prompt_data['h2'])
-            file_path = phase1_dir / f"{h2_index:02d}_{h2_safe}.md"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                # プロンプト本文のみを保存（メタデータと最後の区切り線は含めない）
-                prompt_text = prompt_data['prompt'].rstrip()
-                # 最後の「---」を削除
-                if prompt_text.endswith('---'):
-                    prompt_text = prompt_text[:-3].rstrip()
-                f.write(prompt_text)
+            plan.add(f"{h2_index:02d}_{h2_safe}.md", self._prompt_body(prompt_data),
+                     kind='prompt', phase='phase1', h2_index=h2_index)
         
         # phase2: 各H3ごとに保存（プロンプト本文のみ）
-        phase2_dir = base_path / "phase2"
-        phase2_dir.mkdir(exist_ok=True)
+        plan = plans['phase2'] = WritePlan()
         for prompt_data in prompts.get('phase2', []):
             h2_index = prompt_data.get('h2_index', 0)
             h3_index = prompt_data.get('h3_index', 0)
-            h2_safe = self._sanitize_filename(prompt_data['h2'])
             h3_safe = self._sanitize_filename(prompt_data['h3'])
-            file_path = phase2_dir / f"{h2_index:02d}_{h3_index:02d}_{h3_safe}.md"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                # プロンプト本文のみを保存（メタデータと最後の区切り線は含めない）
-                prompt_text = prompt_data['prompt'].rstrip()
-                # 最後の「---」を削除
-                if prompt_text.endswith('---'):
-                    prompt_text = prompt_text[:-3].rstrip()
-                f.write(prompt_text)
+            plan.add(f"{h2_index:02d}_{h3_index:02d}_{h3_safe}.md", self._prompt_body(prompt_data),
+                     kind='prompt', phase='phase2', h2_index=h2_index, h3_index=h3_index)
         
         # phase3: 各H2ごとに保存（プロンプト本文のみ）
-        phase3_dir = base_path / "phase3"
-        phase3_dir.mkdir(exist_ok=True)
+        plan = plans['phase3'] = WritePlan()
         for prompt_data in prompts.get('phase3', []):
             h2_index = prompt_data.get('h2_index', 0)
             h2_safe = self._sanitize_filename(prompt_data['h2'])
-            file_path = phase3_dir / f"{h2_index:02d}_{h2_safe}.md"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                # プロンプト本文のみを保存（メタデータと最後の区切り線は含めない）
-                prompt_text = prompt_data['prompt'].rstrip()
-                # 最後の「---」を削除
-                if prompt_text.endswith('---'):
-                    prompt_text = prompt_text[:-3].rstrip()
-                f.write(prompt_text)
-        
-        # phase4: プロンプト本文のみを保存（メタデータと設計図は含めない）
-        phase4_dir = base_path / "phase4"
-        phase4_dir.mkdir(exist_ok=True)
-        phase4_data = prompts.get('phase4', {})
-        if phase4_data:
-            file_path = phase4_dir / "記事執筆.md"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                # プロンプト本文のみを保存（メタデータと最後の区切り線は含めない）
-                prompt_text = phase4_data['prompt'].rstrip()
-                # 最後の「---」を削除
-                if prompt_text.endswith('---'):
-                    prompt_text = prompt_text[:-3].rstrip()
-                f.write(prompt_text)
-        
-        # phase5: プロンプト本文のみを保存（メタデータは含めない）
-        phase5_dir = base_path / "phase5"
-        phase5_dir.mkdir(exist_ok=True)
-        phase5_data = prompts.get('phase5', {})
-        if phase5_data:
-            file_path = phase5_dir / "まとめ.md"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                # プロンプト本文のみを保存（メタデータと最後の区切り線は含めない）
-                prompt_text = phase5_data['prompt'].rstrip()
-                # 最後の「---」を削除
-                if prompt_text.endswith('---'):
-                    prompt_text = prompt_text[:-3].rstrip()
-                f.write(prompt_text)
-        
-        # phase6: プロンプト本文のみを保存（メタデータは含めない）
-        phase6_dir = base_path / "phase6"
-        phase6_dir.mkdir(exist_ok=True)
-        phase6_data = prompts.get('phase6', {})
-        if phase6_data:
-            file_path = phase6_dir / "画像生成.md"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                # プロンプト本文のみを保存（メタデータと最後の区切り線は含めない）
-                prompt_text = phase6_data['prompt'].rstrip()
-                # 最後の「---」を削除
-                if prompt_text.endswith('---'):
-                    prompt_text = prompt_text[:-3].rstrip()
-                f.write(prompt_text)
+            plan.add(f"{h2_index:02d}_{h2_safe}.md", self._prompt_body(prompt_data),
+                     kind='prompt', phase='phase3', h2_index=h2_index)
+        
+        # phase4〜6: プロンプト本文のみを保存（メタデータと設計図は含めない）
+        single_files = [
+            ('phase4', '記事執筆.md'),
+            ('phase5', 'まとめ.md'),
+            ('phase6', '画像生成.md'),
+        ]
+        for phase, file_name in single_files:
+            plan = plans[phase] = WritePlan()
+            phase_data = prompts.get(phase, {})
+            if phase_data:
+                plan.add(file_name, self._prompt_body(phase_data), kind='prompt', phase=phase)
+        
+        return plans
+    
+    def _prompt_body(self, prompt_data: Dict) -> str:
+        """保存するプロンプト本文（メタデータと最後の区切り線は含めない）"""
+        prompt_text = prompt_data['prompt'].rstrip()
+        # 最後の「---」を削除
+        if prompt_text.endswith('---'):
+            prompt_text = prompt_text[:-3].rstrip()
+        return prompt_text
     
     def _sanitize_filename(self, filename: str) -> str:
         """ファイル名に使えない文字を置換"""
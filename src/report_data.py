@@ -0,0 +1,507 @@
+"""
+抽出結果のJSONデータ（レポートデータ）の形式を扱うモジュール
+
+1パターンのデータ（--pattern A など）:
+
+    {"pattern": "A", "article_structure": [...], "h1_title_candidates": [...], "originality_proposals": [...]}
+
+複数パターンのデータ（--pattern all）:
+
+    {"patterns": {"A": [...], "B": [...]}, "h1_title_candidates": [...], "originality_proposals": [...]}
+
+プロンプト生成・記事ディレクトリ生成は、split_patternsで1パターンずつのデータに分けて処理する。
+キーワードの索引・類似度の索引は、ReportSourceIndex（iter_report_sourcesで抽出データのファイルと
+記事ディレクトリを集め、変わったものだけを入れ替える）を共有する。
+
+ファイルの形式は、テキストのJSONと、コンパクトなバイナリ形式（拡張子 .prd）の2種類。
+バイナリ形式は先頭のマジックナンバーで判別するため、load_report_dataはどちらの形式も読み込める。
+バイナリ形式のレイアウト（数値はすべてリトルエンディアンの符号なし32ビット）:
+
+    マジックナンバー（b'\\x00PRD'）, バージョン（1バイト）
+    文字列の数, 文字列の連結のバイト数, dictの形のトークンの数, トークンの数
+    各文字列の長さ（文字数）, 文字列の連結（UTF-8）, dictの形のトークン, トークン
+
+文字列（dictのキーを含む）は文字列表に1回だけ格納し、トークンからは表の番号で参照するため、
+繰り返し現れるキーワードやアドバイス・キーは1回分の大きさで済む。同じキーの並びのdictは
+キーの並び（形）を共有する。トークンは下位4ビットが種類、残りが値（文字列・形の番号、要素数、
+整数）で、dict・listの後には要素のトークンが続く。
+"""
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+from array import array
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .article_catalog import normalize_path
+    from .file_writer import encode_text
+except ImportError:
+    from article_catalog import normalize_path
+    from file_writer import encode_text
+
+# 全パターンを指定するときの値（--pattern all）
+ALL_PATTERNS = 'all'
+
+# パターン名（1文字の英大文字）
+_PATTERN_NAME_REGEX = re.compile('[A-Z]')
+
+# ファイルの形式
+FORMAT_JSON = 'json'
+FORMAT_BINARY = 'binary'
+REPORT_FORMATS = [FORMAT_JSON, FORMAT_BINARY]
+
+# バイナリ形式のファイルの拡張子
+BINARY_SUFFIX = '.prd'
+
+# バイナリ形式のマジックナンバーとバージョン（JSONのテキストはNUL文字で始まらないため判別できる）
+BINARY_MAGIC = b'\x00PRD'
+BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct('<4sBIIII')
+
+# トークンの種類（下位4ビット）
+_TOKEN_NULL = 0
+_TOKEN_FALSE = 1
+_TOKEN_TRUE = 2
+_TOKEN_INT = 3
+_TOKEN_NUMBER = 4
+_TOKEN_STRING = 5
+_TOKEN_LIST = 6
+_TOKEN_STRING_LIST = 7
+_TOKEN_DICT = 8
+_TOKEN_KIND_BITS = 4
+_TOKEN_KIND_MASK = (1 << _TOKEN_KIND_BITS) - 1
+
+# トークンの値の上限（これを超える整数・小数は、文字列表に文字列として格納する）
+_TOKEN_VALUE_LIMIT = 1 << (32 - _TOKEN_KIND_BITS)
+
+
+def is_report_data(json_data) -> bool:
+    """抽出結果のデータ（1パターン・複数パターン）か判定"""
+    return isinstance(json_data, dict) and ('article_structure' in json_data or 'patterns' in json_data)
+
+
+def is_multi_pattern(json_data: Dict) -> bool:
+    """複数パターンのデータか判定"""
+    return 'patterns' in json_data and 'article_structure' not in json_data
+
+
+def pattern_names(json_data: Dict) -> List[str]:
+    """データに含まれるパターン名"""
+    if is_multi_pattern(json_data):
+        return list(json_data['patterns'])
+    return [json_data.get('pattern', 'Unknown')]
+
+
+def split_patterns(json_data: Dict) -> List[Dict]:
+    """
+    1パターンずつのデータに分ける（1パターンのデータはそのまま1件で返す）
+    
+    各データのキーの並びはPascalParser.extract_allの戻り値と同じなので、
+    --pattern Aで抽出したデータと同じプロンプト・記事が生成される。
+    """
+    if not is_multi_pattern(json_data):
+        return [json_data]
+    
+    return [
+        {
+            'pattern': pattern,
+            'article_structure': article_structure,
+            'h1_title_candidates': json_data.get('h1_title_candidates', []),
+            'originality_proposals': json_data.get('originality_proposals', []),
+        }
+        for pattern, article_structure in json_data['patterns'].items()
+    ]
+
+
+def pattern_argument(value: str) -> str:
+    """argparseのtype: パターン名（A、B...。小文字も可）"""
+    pattern = value.strip().upper()
+    if not _PATTERN_NAME_REGEX.fullmatch(pattern):
+        raise argparse.ArgumentTypeError(f"パターンは1文字の英字で指定してください: {value}")
+    return pattern
+
+
+def pattern_selection_argument(value: str) -> str:
+    """argparseのtype: パターン名、または全パターン（all）"""
+    if value.strip().lower() == ALL_PATTERNS:
+        return ALL_PATTERNS
+    return pattern_argument(value)
+
+
+def iter_report_sources(path: str) -> Iterator[Tuple[Path, Path, bool]]:
+    """
+    ファイル・ディレクトリから、抽出データの (識別子, JSONファイル, 記事か) を順に返す
+    
+    ファイルはそのまま返す。ディレクトリの場合は、その下の記事（.article.jsonとsource.jsonを
+    持つディレクトリ。識別子は記事ディレクトリ）と、それ以外の*.json・*.prdファイルを返す
+    （抽出データかどうかはload_report_sourceで判定する）。
+    """
+    path = Path(path)
+    if not path.is_dir():
+        yield path, path, False
+        return
+    
+    for directory, dir_names, file_names in os.walk(path):
+        directory_path = Path(directory)
+        if '.article.json' in file_names and 'source.json' in file_names:
+            yield directory_path, directory_path / 'source.json', True
+            # 記事の中（content）はたどらない
+            dir_names[:] = [name for name in dir_names if name != 'content']
+            continue
+        for file_name in sorted(file_names):
+            if file_name.endswith(('.json', BINARY_SUFFIX)) and not file_name.startswith('.'):
+                yield directory_path / file_name, directory_path / file_name, False
+
+
+def load_report_source(source: Path, json_file: Path, article: bool = False) -> Optional[Dict]:
+    """
+    iter_report_sourcesが返した抽出データを読み込む
+    
+    Returns:
+        json_data（抽出データ）・report（元のHTML、不明ならNone）・label（記事ID、不明ならNone）・
+        h1_title（記事のH1タイトル、不明ならNone）のdict。抽出データではないJSONファイルはNone
+    """
+    try:
+        json_data = load_report_data(json_file)
+    except ValueError:
+        if article:
+            raise
+        return None
+    if not is_report_data(json_data):
+        return None
+    
+    loaded = {'json_data': json_data, 'report': None, 'label': None, 'h1_title': None}
+    if article:
+        with open(source / '.article.json', 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        loaded['report'] = metadata.get('source_html')
+        loaded['label'] = metadata.get('article_id')
+        loaded['h1_title'] = metadata.get('h1_title')
+    return loaded
+
+
+class ReportSourceIndex:
+    """
+    抽出データのファイル・記事ディレクトリ（source）単位で更新する索引（SQLite）の共通処理
+    
+    KeywordIndexとSimilarityIndexが継承し、変更の検出（ファイルの更新日時・サイズと抽出データのハッシュ）、
+    ディレクトリの追加、削除を共有する。サブクラスはself.connection（row_factoryはsqlite3.Row）に
+    source・source_hash・file_mtime_ns・file_sizeの列を持つdocumentsテーブルを用意し、
+    add_dataと_remove_sourceを実装する。
+    """
+    
+    def add_data(self, source: str, json_data: Dict, report: Optional[str] = None,
+                 label: Optional[str] = None, h1_title: Optional[str] = None,
+                 file_stat: Optional[os.stat_result] = None) -> bool:
+        """抽出データを索引に追加（サブクラスで実装）"""
+        raise NotImplementedError
+    
+    def _remove_source(self, source: str):
+        """sourceのデータを削除（サブクラスで実装。トランザクションは呼び出し側で管理）"""
+        raise NotImplementedError
+    
+    def add_path(self, path: str, report: Optional[str] = None) -> Dict[str, int]:
+        """
+        抽出データのJSONファイル、または記事ディレクトリを索引に追加
+        
+        ディレクトリの場合は、その下の記事（.article.jsonとsource.jsonを持つディレクトリ）と
+        抽出データのJSONファイルをすべて追加する（抽出データ以外のJSONファイルは読み飛ばす）。
+        更新日時とサイズが前回と同じファイルは読み込まない。
+        
+        Args:
+            path: JSONファイル、またはディレクトリ
+            report: 元のレポート（JSONファイルの場合のみ。記事は.article.jsonのsource_html）
+        
+        Returns:
+            追加結果（updated: 更新した数, unchanged: 変更がなかった数, skipped: 抽出データではなかった数）
+        """
+        stats = {'updated': 0, 'unchanged': 0, 'skipped': 0}
+        for source, json_file, article in iter_report_sources(path):
+            file_stat = json_file.stat()
+            if self._is_unchanged_file(normalize_path(str(source)), file_stat):
+                stats['unchanged'] += 1
+                continue
+            loaded = load_report_source(source, json_file, article)
+            if loaded is None:
+                stats['skipped'] += 1
+                continue
+            updated = self.add_data(str(source), loaded['json_data'], report=loaded['report'] or report,
+                                    label=loaded['label'], h1_title=loaded['h1_title'], file_stat=file_stat)
+            stats['updated' if updated else 'unchanged'] += 1
+        return stats
+    
+    def _is_unchanged_data(self, source: str, source_hash: str,
+                           file_stat: Optional[os.stat_result] = None) -> bool:
+        """
+        抽出データが前回追加したときと同じか判定（add_dataで入れ替えを省略するため）
+        
+        同じ場合は、次回ファイルを読み込まずに済むように、ファイルの更新日時・サイズだけを更新する。
+        """
+        if self._stored_hash(source) != source_hash:
+            return False
+        if file_stat is not None:
+            with self.connection:
+                self.connection.execute(
+                    "UPDATE documents SET file_mtime_ns = ?, file_size = ? WHERE source = ?",
+                    (file_stat.st_mtime_ns, file_stat.st_size, source)
+                )
+        return True
+    
+    def _is_unchanged_file(self, source: str, file_stat: os.stat_result) -> bool:
+        """前回追加したときとファイルの更新日時・サイズが同じか判定"""
+        row = self.connection.execute(
+            "SELECT file_mtime_ns, file_size FROM documents WHERE source = ? LIMIT 1", (source,)
+        ).fetchone()
+        return row is not None and (row['file_mtime_ns'], row['file_size']) == (file_stat.st_mtime_ns, file_stat.st_size)
+    
+    def _stored_hash(self, source: str) -> Optional[str]:
+        """前回追加したときの抽出データのハッシュ（未登録ならNone）"""
+        row = self.connection.execute(
+            "SELECT source_hash FROM documents WHERE source = ? LIMIT 1", (source,)
+        ).fetchone()
+        return row['source_hash'] if row else None
+    
+    def remove(self, source: str) -> bool:
+        """sourceのデータを索引から削除（登録されていなかった場合はFalse）"""
+        source = normalize_path(source)
+        if self._stored_hash(source) is None:
+            return False
+        with self.connection:
+            self._remove_source(source)
+        return True
+    
+    def prune(self) -> List[str]:
+        """
+        元のファイル・ディレクトリがなくなったsourceを索引から削除
+        
+        Returns:
+            削除したsourceのリスト
+        """
+        sources = [row['source'] for row in self.connection.execute("SELECT DISTINCT source FROM documents")]
+        missing = [source for source in sources if not Path(source).exists()]
+        with self.connection:
+            for source in missing:
+                self._remove_source(source)
+        return missing
+
+
+def encode_report_data(json_data: Dict) -> bytes:
+    """データをバイナリ形式に変換"""
+    string_ids = {}
+    shape_ids = {}
+    shape_tokens = array('I')
+    tokens = array('I')
+    
+    def string_id(text: str) -> int:
+        index = string_ids.get(text)
+        if index is None:
+            index = len(string_ids)
+            string_ids[text] = index
+        return index
+    
+    def shape_id(keys: Tuple[str, ...]) -> int:
+        index = shape_ids.get(keys)
+        if index is None:
+            index = len(shape_ids)
+            shape_ids[keys] = index
+            shape_tokens.append(len(keys))
+            shape_tokens.extend(string_id(key) for key in keys)
+        return index
+    
+    def token(kind: int, value: int = 0):
+        if value >= _TOKEN_VALUE_LIMIT:
+            raise ValueError("バイナリ形式に変換できる大きさを超えています")
+        tokens.append(value << _TOKEN_KIND_BITS | kind)
+    
+    def encode(value):
+        if value is None:
+            token(_TOKEN_NULL)
+        elif value is True:
+            token(_TOKEN_TRUE)
+        elif value is False:
+            token(_TOKEN_FALSE)
+        elif isinstance(value, str):
+            token(_TOKEN_STRING, string_id(value))
+        elif isinstance(value, int) and 0 <= value < _TOKEN_VALUE_LIMIT:
+            token(_TOKEN_INT, value)
+        elif isinstance(value, (int, float)):
+            token(_TOKEN_NUMBER, string_id(repr(value)))
+        elif isinstance(value, (list, tuple)):
+            if value and all(isinstance(item, str) for item in value):
+                # キーワードのような文字列だけのリストは、文字列の番号を並べるだけにする
+                token(_TOKEN_STRING_LIST, len(value))
+                tokens.extend(string_id(item) for item in value)
+            else:
+                token(_TOKEN_LIST, len(value))
+                for item in value:
+                    encode(item)
+        elif isinstance(value, dict):
+            # 同じキーの並びのdict（H3セクションなど）は、キーの並び（形）を1回だけ格納して共有する
+            token(_TOKEN_DICT, shape_id(tuple(str(key) for key in value)))
+            for item in value.values():
+                encode(item)
+        else:
+            raise TypeError(f"バイナリ形式に変換できない値です: {type(value).__name__}")
+    
+    encode(json_data)
+    lengths = array('I', map(len, string_ids))
+    text = ''.join(string_ids).encode('utf-8')
+    if sys.byteorder == 'big':
+        for values in (lengths, shape_tokens, tokens):
+            values.byteswap()
+    header = _BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(lengths), len(text),
+                                 len(shape_tokens), len(tokens))
+    return b''.join([header, lengths.tobytes(), text, shape_tokens.tobytes(), tokens.tobytes()])
+
+
+def decode_report_data(payload: bytes) -> Dict:
+    """バイナリ形式のデータを読み込む（壊れている場合はValueError）"""
+    if len(payload) < _BINARY_HEADER.size:
+        raise ValueError("バイナリ形式のデータが壊れています（ヘッダーが足りません）")
+    magic, version, string_count, text_size, shape_token_count, token_count = _BINARY_HEADER.unpack_from(payload)
+    if magic != BINARY_MAGIC:
+        raise ValueError("バイナリ形式のデータではありません")
+    if version != BINARY_VERSION:
+        raise ValueError(f"対応していないバイナリ形式のバージョンです: {version}")
+    
+    lengths_start = _BINARY_HEADER.size
+    text_start = lengths_start + 4 * string_count
+    shapes_start = text_start + text_size
+    tokens_start = shapes_start + 4 * shape_token_count
+    if len(payload) != tokens_start + 4 * token_count:
+        raise ValueError("バイナリ形式のデータが壊れています（サイズが一致しません）")
+    sections = []
+    for start, end in ((lengths_start, text_start), (shapes_start, tokens_start), (tokens_start, len(payload))):
+        values = array('I')
+        values.frombytes(payload[start:end])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        sections.append(values)
+    lengths, shape_tokens, tokens = sections
+    
+    try:
+        # 文字列表: 連結した文字列を1回でデコードしてから、文字数で切り分ける
+        text = payload[text_start:shapes_start].decode('utf-8')
+        strings = []
+        position = 0
+        for length in lengths:
+            strings.append(text[position:position + length])
+            position += length
+        if position != len(text):
+            raise ValueError("バイナリ形式のデータが壊れています（文字列表の長さが一致しません）")
+        
+        shapes = []
+        position = 0
+        while position < len(shape_tokens):
+            key_count = shape_tokens[position]
+            shapes.append(tuple(strings[index] for index in shape_tokens[position + 1:position + 1 + key_count]))
+            position += 1 + key_count
+        
+        token_iterator = iter(tokens)
+        next_token = token_iterator.__next__
+        
+        def decode(token: int):
+            kind = token & _TOKEN_KIND_MASK
+            value = token >> _TOKEN_KIND_BITS
+            if kind == _TOKEN_STRING:
+                return strings[value]
+            if kind == _TOKEN_STRING_LIST:
+                return list(map(strings.__getitem__, islice(token_iterator, value)))
+            if kind == _TOKEN_DICT:
+                keys = shapes[value]
+                return dict(zip(keys, decode_items(len(keys))))
+            if kind == _TOKEN_LIST:
+                return decode_items(value)
+            if kind == _TOKEN_INT:
+                return value
+            if kind == _TOKEN_NUMBER:
+                number = strings[value]
+                return int(number) if number.lstrip('-').isdigit() else float(number)
+            if kind == _TOKEN_NULL:
+                return None
+            if kind in (_TOKEN_TRUE, _TOKEN_FALSE):
+                return kind == _TOKEN_TRUE
+            raise ValueError(f"バイナリ形式のデータが壊れています（不明なトークン: {kind}）")
+        
+        def decode_items(count: int) -> List:
+            # 要素の大半は文字列・文字列のリストなので、関数を呼ばずにその場で取り出す
+            items = []
+            for _ in range(count):
+                token = next_token()
+                kind = token & _TOKEN_KIND_MASK
+                if kind == _TOKEN_STRING:
+                    items.append(strings[token >> _TOKEN_KIND_BITS])
+                elif kind == _TOKEN_STRING_LIST:
+                    items.append(list(map(strings.__getitem__, islice(token_iterator, token >> _TOKEN_KIND_BITS))))
+                else:
+                    items.append(decode(token))
+            return items
+        
+        json_data = decode(next_token())
+    except (StopIteration, IndexError, UnicodeDecodeError):
+        raise ValueError("バイナリ形式のデータが壊れています") from None
+    if next(token_iterator, None) is not None:
+        raise ValueError("バイナリ形式のデータが壊れています（余分なデータがあります）")
+    return json_data
+
+
+def detect_report_format(payload: bytes) -> str:
+    """データの先頭から、ファイルの形式（json / binary）を判別"""
+    return FORMAT_BINARY if payload[:len(BINARY_MAGIC)] == BINARY_MAGIC else FORMAT_JSON
+
+
+def format_for_path(path: Union[str, Path], report_format: Optional[str] = None) -> str:
+    """保存する形式（指定がなければ、拡張子が .prd ならバイナリ形式、それ以外はJSON）"""
+    if report_format:
+        return report_format
+    return FORMAT_BINARY if Path(path).suffix.lower() == BINARY_SUFFIX else FORMAT_JSON
+
+
+def dumps_report_data(json_data: Dict, report_format: str = FORMAT_JSON) -> bytes:
+    """
+    データを指定した形式のバイト列に変換
+    
+    JSONはインデント付き・ensure_ascii=Falseで、改行はテキストモードで書き込んだ場合と同じOSの改行コード。
+    """
+    if report_format == FORMAT_BINARY:
+        return encode_report_data(json_data)
+    return encode_text(json.dumps(json_data, ensure_ascii=False, indent=2))
+
+
+def loads_report_data(payload: bytes) -> Dict:
+    """JSON・バイナリ形式のどちらのバイト列も読み込む（形式は自動判別）"""
+    if detect_report_format(payload) == FORMAT_BINARY:
+        return decode_report_data(payload)
+    return json.loads(payload.decode('utf-8'))
+
+
+def load_report_data(path: Union[str, Path]) -> Dict:
+    """JSON・バイナリ形式のどちらのファイルも読み込む（形式は自動判別）"""
+    with open(path, 'rb') as f:
+        return loads_report_data(f.read())
+
+
+def save_report_data(json_data: Dict, path: Union[str, Path], report_format: Optional[str] = None) -> str:
+    """
+    データをファイルに保存
+    
+    Args:
+        json_data: 保存するデータ
+        path: 保存先のパス（親ディレクトリがなければ作成）
+        report_format: json / binary（Noneの場合は拡張子で決定。format_for_pathを参照）
+    
+    Returns:
+        保存した形式
+    """
+    report_format = format_for_path(path, report_format)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(dumps_report_data(json_data, report_format))
+    return report_format
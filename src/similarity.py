@@ -0,0 +1,352 @@
+"""
+記事構成（H2・H3の見出しとアドバイス）の類似度を、MinHashとLSHで検索するモジュール
+
+見出しとアドバイスの文字n-gram（日本語は単語に区切れないため文字単位）の集合を
+MinHashの署名（NUM_PERMUTATIONS個の最小ハッシュ値）に要約し、署名を帯（LSH_BANDS個）に分けて
+帯ごとのハッシュ値をSQLiteに索引付けする。新しいレポートは、いずれかの帯が一致する記事だけを
+候補として署名を比較するため、既存の記事すべてと総当たりで比較せずに類似する記事を取り出せる。
+"""
+import hashlib
+import os
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .article_catalog import normalize_path, source_data_hash
+    from .report_data import ReportSourceIndex, split_patterns
+except ImportError:
+    from article_catalog import normalize_path, source_data_hash
+    from report_data import ReportSourceIndex, split_patterns
+
+
+# 索引ファイルの形式のバージョン
+SIMILARITY_INDEX_FORMAT_VERSION = 1
+
+# 索引ファイルのデフォルトのパス
+DEFAULT_SIMILARITY_INDEX = 'output/similarity_index.sqlite'
+
+# 文字n-gramの長さ
+SHINGLE_SIZE = 3
+
+# MinHashの署名の長さ（区画の数）と、LSHの帯の数（1つの帯の行数 = NUM_PERMUTATIONS / LSH_BANDS）
+# 32帯×4行では、類似度が約0.42を超える記事が候補になりやすい（(1 / LSH_BANDS) ** (1 / 行数)）
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+
+# 区画の値の上限（64ビットのハッシュ値から区画の番号の7ビットを除いた残り）と、空の区画を補完するときの間隔
+_VALUE_BITS = 64 - (NUM_PERMUTATIONS - 1).bit_length()
+_EMPTY = 1 << _VALUE_BITS
+_DENSIFY_OFFSET = _EMPTY
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    report TEXT NOT NULL,
+    label TEXT NOT NULL,
+    h1_title TEXT,
+    source_hash TEXT NOT NULL,
+    file_mtime_ns INTEGER,
+    file_size INTEGER,
+    shingle_count INTEGER NOT NULL,
+    signature BLOB NOT NULL,
+    UNIQUE (source, pattern)
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lsh_buckets_lookup ON lsh_buckets (band, bucket);
+CREATE INDEX IF NOT EXISTS lsh_buckets_doc ON lsh_buckets (doc_id);
+CREATE TABLE IF NOT EXISTS index_info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _normalize_text(text: str) -> str:
+    """n-gramを作る前の正規化（全角・半角と大文字・小文字を揃え、空白を除く）"""
+    return ''.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+def structure_shingles(json_data: Dict, size: int = SHINGLE_SIZE) -> Set[str]:
+    """
+    1パターンの抽出データの、H2・H3の見出しとアドバイス（独自性の提案を含む）の文字n-gramの集合
+    
+    n-gramは見出し・アドバイスごとに作り、テキストをまたいだn-gramは作らない。
+    size文字より短いテキストは、そのまま1つのn-gramとして扱う。
+    """
+    texts = []
+    for h2_section in json_data.get('article_structure', []):
+        texts.append(h2_section.get('h2', ''))
+        for h3_section in h2_section.get('h3_sections', []):
+            texts.append(h3_section.get('h3', ''))
+            texts.append(h3_section.get('advice', ''))
+    for proposal in json_data.get('originality_proposals', []):
+        texts.append(proposal.get('title', ''))
+        texts.append(proposal.get('advice', ''))
+    
+    shingles = set()
+    for text in texts:
+        text = _normalize_text(text)
+        if len(text) <= size:
+            if text:
+                shingles.add(text)
+            continue
+        shingles.update(text[i:i + size] for i in range(len(text) - size + 1))
+    return shingles
+
+
+def minhash_signature(shingles: Set[str]) -> List[int]:
+    """
+    n-gramの集合のMinHashの署名（NUM_PERMUTATIONS個の値）
+    
+    ハッシュ関数をNUM_PERMUTATIONS個使う代わりに、n-gramごとに1回だけ64ビットのハッシュ値を求め、
+    下位ビットで区画に振り分けて区画ごとの最小値を署名とする（one permutation hashing）。
+    n-gramが入らなかった区画は、右隣（循環）の空でない区画の値に距離に応じた値を足して補完する
+    （densification）ため、2つの署名の一致した区画の割合がJaccard係数の推定値になる。
+    """
+    if not shingles:
+        return [_EMPTY] * NUM_PERMUTATIONS
+    
+    signature = [_EMPTY] * NUM_PERMUTATIONS
+    mask = NUM_PERMUTATIONS - 1
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        slot = value & mask
+        value >>= NUM_PERMUTATIONS.bit_length() - 1
+        if value < signature[slot]:
+            signature[slot] = value
+    
+    filled = [slot for slot, value in enumerate(signature) if value != _EMPTY]
+    if len(filled) < NUM_PERMUTATIONS:
+        densified = list(signature)
+        for slot in range(NUM_PERMUTATIONS):
+            if signature[slot] != _EMPTY:
+                continue
+            distance = 1
+            while signature[(slot + distance) % NUM_PERMUTATIONS] == _EMPTY:
+                distance += 1
+            densified[slot] = signature[(slot + distance) % NUM_PERMUTATIONS] + distance * _DENSIFY_OFFSET
+        signature = densified
+    return signature
+
+
+def estimate_similarity(signature: List[int], other: List[int]) -> float:
+    """2つの署名から、n-gramの集合のJaccard係数を推定"""
+    return sum(1 for x, y in zip(signature, other) if x == y) / len(signature)
+
+
+def _pack_signature(signature: List[int]) -> bytes:
+    """署名をSQLiteのBLOBに変換（補完した値は64ビットを超えるため、1つの値を9バイトで保存）"""
+    return b''.join(value.to_bytes(9, 'little') for value in signature)
+
+
+def _unpack_signature(packed: bytes) -> List[int]:
+    """_pack_signatureで変換したBLOBを署名に戻す"""
+    return [int.from_bytes(packed[i:i + 9], 'little') for i in range(0, len(packed), 9)]
+
+
+def lsh_buckets(signature: List[int]) -> List[int]:
+    """署名を帯に分け、帯ごとのハッシュ値（SQLiteのINTEGERに収まる符号付き64ビット）を返す"""
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    buckets = []
+    for band in range(LSH_BANDS):
+        values = b''.join(value.to_bytes(9, 'little') for value in signature[band * rows:(band + 1) * rows])
+        buckets.append(int.from_bytes(hashlib.blake2b(values, digest_size=8).digest(), 'little', signed=True))
+    return buckets
+
+
+def format_similar_articles(results: List[Dict]) -> str:
+    """SimilarityIndex.queryの結果を、パターンごとに表示用の文字列にする"""
+    lines = []
+    for result in results:
+        lines.append(f"\nパターン{result['pattern']}に似ている記事:")
+        if not result['shingle_count']:
+            lines.append("  見出しがないため比較できません。")
+        elif not result['matches']:
+            lines.append("  見つかりませんでした。")
+        for match in result['matches']:
+            lines.append(f"  {match['similarity']:.2f}  {match['label']} [{match['pattern']}]  {match['h1_title']}")
+    return '\n'.join(lines)
+
+
+class SimilarityIndex(ReportSourceIndex):
+    """記事構成の類似度の索引（MinHashの署名とLSHの帯をSQLiteに保存）"""
+    
+    def __init__(self, index_file: str = DEFAULT_SIMILARITY_INDEX):
+        """
+        Args:
+            index_file: 索引ファイルのパス（存在しない場合は作成）
+        """
+        # sqlite3は索引を使うときに初めて読み込む（通常のCLIの起動時間を増やさないため）
+        import sqlite3
+        
+        self.index_file = Path(index_file)
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.index_file), timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+        parameters = {
+            'format_version': str(SIMILARITY_INDEX_FORMAT_VERSION),
+            'shingle_size': str(SHINGLE_SIZE),
+            'num_permutations': str(NUM_PERMUTATIONS),
+            'lsh_bands': str(LSH_BANDS),
+        }
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO index_info (key, value) VALUES (?, ?)", parameters.items()
+            )
+        stored = dict(tuple(row) for row in self.connection.execute("SELECT key, value FROM index_info"))
+        mismatched = [key for key, value in parameters.items() if stored.get(key) != value]
+        if mismatched:
+            self.connection.close()
+            raise ValueError(f"索引ファイルの設定（{', '.join(mismatched)}）が異なります。索引を作り直してください: {index_file}")
+    
+    def __enter__(self) -> 'SimilarityIndex':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """索引ファイルを閉じる"""
+        self.connection.close()
+    
+    def add_data(self, source: str, json_data: Dict, report: Optional[str] = None,
+                 label: Optional[str] = None, h1_title: Optional[str] = None,
+                 file_stat: Optional[os.stat_result] = None) -> bool:
+        """
+        抽出データを索引に追加（同じsourceの既存のデータは入れ替える）
+        
+        Args:
+            source: 抽出データの識別子（JSONファイル・記事ディレクトリのパス）
+            json_data: 抽出データ（1パターン・複数パターンのどちらも可。パターンごとに1件として扱う）
+            report: 元のレポート（HTMLファイルのパス。Noneの場合はsource）
+            label: 検索結果に表示する名前（Noneの場合はsourceのファイル名）
+            h1_title: 記事のH1タイトル（Noneの場合は最初の候補）
+            file_stat: sourceのファイルの情報（次回、更新日時とサイズが同じなら読み込まずに省略する）
+        
+        Returns:
+            索引を更新した場合はTrue（内容が前回と同じ場合はFalse）
+        """
+        source = normalize_path(source)
+        source_hash = source_data_hash(json_data)
+        if self._is_unchanged_data(source, source_hash, file_stat):
+            return False
+        
+        report = normalize_path(report) if report else source
+        label = label or Path(source).name
+        # 署名の計算は書き込みのトランザクションの外で行う
+        documents = []
+        for pattern_data in split_patterns(json_data):
+            shingles = structure_shingles(pattern_data)
+            documents.append((pattern_data, len(shingles), minhash_signature(shingles)))
+        
+        with self.connection:
+            self._remove_source(source)
+            for pattern_data, shingle_count, signature in documents:
+                doc_id = self.connection.execute(
+                    "INSERT INTO documents (source, pattern, report, label, h1_title, source_hash, "
+                    "file_mtime_ns, file_size, shingle_count, signature) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        source,
+                        pattern_data.get('pattern', 'Unknown'),
+                        report,
+                        label,
+                        h1_title or (pattern_data.get('h1_title_candidates') or [None])[0],
+                        source_hash,
+                        file_stat.st_mtime_ns if file_stat else None,
+                        file_stat.st_size if file_stat else None,
+                        shingle_count,
+                        _pack_signature(signature),
+                    )
+                ).lastrowid
+                # 見出しのない記事は、どの記事の候補にもしない
+                if shingle_count:
+                    self.connection.executemany(
+                        "INSERT INTO lsh_buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                        [(band, bucket, doc_id) for band, bucket in enumerate(lsh_buckets(signature))]
+                    )
+        return True
+    
+    def _remove_source(self, source: str):
+        """sourceのデータ（全パターン）を削除（トランザクションは呼び出し側で管理）"""
+        self.connection.execute(
+            "DELETE FROM lsh_buckets WHERE doc_id IN (SELECT doc_id FROM documents WHERE source = ?)", (source,)
+        )
+        self.connection.execute("DELETE FROM documents WHERE source = ?", (source,))
+    
+    def query(self, json_data: Dict, top_k: int = 5, threshold: float = 0.0,
+              exclude_source: Optional[str] = None) -> List[Dict]:
+        """
+        抽出データの各パターンと記事構成が似ている記事を、推定類似度の高い順に取得
+        
+        LSHの帯が1つ以上一致した記事だけを候補にするため、類似度の低い記事（目安として0.4未満）は
+        候補にならないことがある。
+        
+        Args:
+            json_data: 抽出データ（1パターン・複数パターンのどちらも可）
+            top_k: パターンごとの最大件数
+            threshold: 推定類似度（0〜1）の下限
+            exclude_source: 結果から除く記事の識別子（索引に追加済みの自分自身など）
+        
+        Returns:
+            パターンごとの {'pattern', 'shingle_count', 'matches': [{label, source, report, pattern,
+            h1_title, similarity}, ...]} のリスト
+        """
+        exclude_source = normalize_path(exclude_source) if exclude_source else None
+        results = []
+        for pattern_data in split_patterns(json_data):
+            shingles = structure_shingles(pattern_data)
+            matches = []
+            if shingles:
+                signature = minhash_signature(shingles)
+                matches = self._query_signature(signature, top_k, threshold, exclude_source)
+            results.append({
+                'pattern': pattern_data.get('pattern', 'Unknown'),
+                'shingle_count': len(shingles),
+                'matches': matches,
+            })
+        return results
+    
+    def _query_signature(self, signature: List[int], top_k: int, threshold: float,
+                         exclude_source: Optional[str]) -> List[Dict]:
+        """LSHの帯が一致した候補の署名を比較し、類似度の高い順にtop_k件を返す"""
+        conditions = ' OR '.join(['(b.band = ? AND b.bucket = ?)'] * LSH_BANDS)
+        params = [value for band_bucket in enumerate(lsh_buckets(signature)) for value in band_bucket]
+        rows = self.connection.execute(
+            "SELECT d.doc_id, d.source, d.pattern, d.report, d.label, d.h1_title, d.signature FROM documents d "
+            f"WHERE d.doc_id IN (SELECT b.doc_id FROM lsh_buckets b WHERE {conditions})",
+            params
+        )
+        
+        matches = []
+        for row in rows:
+            if row['source'] == exclude_source:
+                continue
+            similarity = estimate_similarity(signature, _unpack_signature(row['signature']))
+            if similarity < threshold:
+                continue
+            matches.append({
+                'label': row['label'],
+                'source': row['source'],
+                'report': row['report'],
+                'pattern': row['pattern'],
+                'h1_title': row['h1_title'],
+                'similarity': round(similarity, 4),
+            })
+        matches.sort(key=lambda match: (-match['similarity'], match['label'], match['pattern']))
+        return matches[:top_k]
+    
+    def stats(self) -> Dict[str, int]:
+        """索引の件数（documents: 抽出データ（パターン）の数, reports: レポートの数）"""
+        return {
+            'documents': self.connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0],
+            'reports': self.connection.execute("SELECT COUNT(DISTINCT report) FROM documents").fetchone()[0],
+        }
@@ -0,0 +1,117 @@
+"""
+記事構成の類似度の索引のコマンドラインインターフェース
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .similarity import SimilarityIndex, DEFAULT_SIMILARITY_INDEX, format_similar_articles
+    from .report_data import is_report_data, load_report_data
+except ImportError:
+    from similarity import SimilarityIndex, DEFAULT_SIMILARITY_INDEX, format_similar_articles
+    from report_data import is_report_data, load_report_data
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='記事構成（H2・H3の見出しとアドバイス）が似ている記事をMinHash/LSHの索引で検索します'
+    )
+    parser.add_argument(
+        '--index',
+        type=str,
+        default=DEFAULT_SIMILARITY_INDEX,
+        help=f'索引ファイルのパス（デフォルト: {DEFAULT_SIMILARITY_INDEX}）'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    # add: 抽出データを追加
+    add_parser = subparsers.add_parser('add', help='抽出データのJSONファイル・記事ディレクトリを索引に追加（変わったものだけ更新）')
+    add_parser.add_argument('paths', nargs='+',
+                            help='抽出データのJSONファイル、または記事ディレクトリ（その下の記事をすべて追加）')
+    add_parser.add_argument('--report', type=str, default=None,
+                            help='元のHTMLファイルのパス（JSONファイルを1つ指定した場合のみ）')
+    add_parser.add_argument('--prune', action='store_true',
+                            help='元のファイル・ディレクトリがなくなったデータを索引から削除する')
+    
+    # query: 似ている記事を検索
+    query_parser = subparsers.add_parser('query', help='抽出データのファイル（JSON・バイナリ形式）と記事構成が似ている記事を表示')
+    query_parser.add_argument('json_file', type=str, help='抽出データのJSONファイル（バイナリ形式の .prd も可）')
+    query_parser.add_argument('-k', '--top-k', type=int, default=5, help='パターンごとの最大件数（デフォルト: 5）')
+    query_parser.add_argument('--threshold', type=float, default=0.0,
+                              help='推定類似度（0〜1）の下限（デフォルト: 0）')
+    
+    # stats: 索引の件数
+    subparsers.add_parser('stats', help='索引の件数を表示')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command != 'add' and not Path(args.index).exists():
+        print(f"エラー: 索引ファイルが見つかりません: {args.index}（add で作成できます）")
+        sys.exit(1)
+    
+    json_data = None
+    if args.command == 'add':
+        missing = [path for path in args.paths if not Path(path).exists()]
+        if missing:
+            print(f"エラー: ファイルが見つかりません: {', '.join(missing)}")
+            sys.exit(1)
+        if args.report and (len(args.paths) > 1 or Path(args.paths[0]).is_dir()):
+            print("エラー: --report はJSONファイルを1つ指定した場合のみ使用できます。")
+            sys.exit(1)
+    elif args.command == 'query':
+        json_path = Path(args.json_file)
+        if not json_path.exists():
+            print(f"エラー: JSONファイルが見つかりません: {json_path}")
+            sys.exit(1)
+        try:
+            json_data = load_report_data(json_path)
+        except (OSError, ValueError) as e:
+            print(f"エラー: JSONファイルの読み込みに失敗しました: {e}")
+            sys.exit(1)
+        if not is_report_data(json_data):
+            print(f"エラー: 抽出データのJSONファイルではありません: {json_path}")
+            sys.exit(1)
+    
+    try:
+        index = SimilarityIndex(args.index)
+    except ValueError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+    
+    with index:
+        if args.command == 'add':
+            updated = 0
+            unchanged = 0
+            skipped = 0
+            try:
+                for path in args.paths:
+                    stats = index.add_path(path, report=args.report)
+                    updated += stats['updated']
+                    unchanged += stats['unchanged']
+                    skipped += stats['skipped']
+            except (OSError, ValueError) as e:
+                print(f"エラー: 索引の更新に失敗しました: {e}")
+                sys.exit(1)
+            print(f"更新 {updated}件, 変更なし {unchanged}件, 抽出データ以外 {skipped}件")
+            if args.prune:
+                removed = index.prune()
+                print(f"削除 {len(removed)}件")
+            stats = index.stats()
+            print(f"索引: レポート {stats['reports']}件, 記事（パターン） {stats['documents']}件")
+        
+        elif args.command == 'query':
+            results = index.query(json_data, top_k=args.top_k, threshold=args.threshold,
+                                  exclude_source=str(json_path))
+            print(format_similar_articles(results))
+        
+        elif args.command == 'stats':
+            stats = index.stats()
+            print(f"抽出データ（パターン）: {stats['documents']}件")
+            print(f"レポート: {stats['reports']}件")
+
+
+if __name__ == '__main__':
+    main()
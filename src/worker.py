@@ -0,0 +1,393 @@
+"""
+常駐ワーカーとしてジョブを処理するモジュール
+
+パーサー・解析済みテンプレート・記事構造ジェネレーターを読み込んだままの
+ワーカープロセスを保持し、ジョブ（HTMLのパス、パターン、提案、H1タイトルなど）を
+順次処理する。ジョブごとにインタープリタの起動やbs4/lxmlの読み込みが発生しない。
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .article_catalog import DEFAULT_OUTPUT_ROOT
+    from .extraction_cache import ExtractionCache
+    from .parser_backends import DEFAULT_PARSER_BACKEND, load_parser_class
+    from .pipeline import ArticlePipeline
+except ImportError:
+    from article_catalog import DEFAULT_OUTPUT_ROOT
+    from extraction_cache import ExtractionCache
+    from parser_backends import DEFAULT_PARSER_BACKEND, load_parser_class
+    from pipeline import ArticlePipeline
+
+
+# ワーカープロセスごとに保持するパイプライン
+_pipeline: Optional[ArticlePipeline] = None
+
+
+def init_worker(template_file: str, backend: str = DEFAULT_PARSER_BACKEND,
+                cache_dir: Optional[str] = None, id_root: Optional[str] = None):
+    """ワーカープロセスの初期化（パーサーとテンプレートを事前に読み込む）"""
+    global _pipeline
+    load_parser_class(backend)
+    cache = ExtractionCache(cache_dir) if cache_dir else None
+    _pipeline = ArticlePipeline(template_file, backend=backend, cache=cache, id_root=id_root)
+
+
+def process_job(job: Dict) -> Dict:
+    """
+    1件のジョブを処理して結果を返す（例外は結果のerrorに記録する）
+    
+    ジョブの形式:
+        {"id": "任意", "html": "input/report.html", "pattern": "A", "proposals": [0],
+         "h1_title": null, "output": "output/articles/xxx", "prompts_dir": "output/prompts",
+         "phases": [1, 2, 3], "save_json": null, "incremental": false, "id_root": null}
+    """
+    started = time.perf_counter()
+    result = {'id': job.get('id'), 'status': 'ok', 'error': None}
+    try:
+        if _pipeline is None:
+            raise RuntimeError("ワーカーが初期化されていません。")
+        if not job.get('html'):
+            raise ValueError("ジョブにhtmlが指定されていません。")
+        if not job.get('pattern'):
+            raise ValueError("ジョブにpatternが指定されていません。")
+        
+        phases = job.get('phases')
+        if phases is not None:
+            phases = [phase if str(phase).startswith('phase') else f'phase{phase}' for phase in phases]
+        
+        run_result = _pipeline.run(
+            job['html'],
+            job['pattern'],
+            [int(idx) for idx in job.get('proposals') or []],
+            article_output=job.get('output', DEFAULT_OUTPUT_ROOT),
+            prompts_output=job.get('prompts_dir', 'output/prompts'),
+            h1_title=job.get('h1_title'),
+            phases=phases,
+            json_output=job.get('save_json'),
+            incremental=bool(job.get('incremental', False)),
+            id_root=job.get('id_root')
+        )
+        result.update({
+            'html': job['html'],
+            'pattern': run_result['pattern'],
+            'article_dir': run_result['article_dir'],
+            'prompts_dir': run_result['prompts_dir'],
+            'json_output': run_result['json_output'],
+            'prompt_counts': run_result['prompt_counts'],
+            'timings': run_result['timings'],
+        })
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - started, 4)
+    return result
+
+
+class JobWorker:
+    """ジョブをワーカープロセスのプールで処理するクラス"""
+    
+    def __init__(self, template_file: str = 'templates/prompts.md',
+                 backend: str = DEFAULT_PARSER_BACKEND, cache_dir: Optional[str] = None,
+                 max_workers: Optional[int] = None, id_root: Optional[str] = None):
+        """
+        Args:
+            template_file: プロンプトテンプレートファイルのパス
+            backend: HTMLパーサーのバックエンド
+            cache_dir: 解析結果のキャッシュディレクトリ（Noneの場合は使用しない）
+            max_workers: ワーカープロセス数（Noneの場合はCPUコア数）
+            id_root: 記事IDの連番を割り当てるルートディレクトリ（ジョブのid_rootが優先）
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._initargs = (template_file, backend, cache_dir, id_root)
+        self._executor_lock = threading.Lock()
+        self.executor = self._create_executor()
+        # ワーカープロセスが異常終了したときに実行中だったジョブ（原因の候補）を、
+        # 1件ずつ実行し直すための1プロセスのプール（使うときだけ作成）
+        self._suspects = deque()
+        self._isolation_executor = None
+        self._isolation_busy = False
+    
+    def _create_executor(self, max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """ワーカープロセスのプールを作成"""
+        return ProcessPoolExecutor(
+            max_workers=max_workers or self.max_workers,
+            initializer=init_worker,
+            initargs=self._initargs
+        )
+    
+    def _submit(self, job: Dict):
+        """
+        ジョブをプールに投入
+        
+        ワーカープロセスが異常終了してプールが使えなくなっている場合は、プールを作り直してから投入する
+        （常駐ワーカー自体は終了させない）。
+        """
+        with self._executor_lock:
+            try:
+                return self.executor.submit(process_job, job)
+            except BrokenProcessPool:
+                broken_executor = self.executor
+                self.executor = self._create_executor()
+                # 完了のコールバックから呼ばれることがあるため、終了は待たない
+                broken_executor.shutdown(wait=False)
+                return self.executor.submit(process_job, job)
+    
+    def _submit_isolated(self, job: Dict, callback: Callable):
+        """
+        ジョブを1件ずつ別のプロセスで実行し直す（完了したらcallback(future)を呼ぶ）
+        
+        プールが異常終了すると、原因のジョブと一緒に実行中だったジョブもすべて失敗する。
+        1件ずつ実行すれば、そこで異常終了したジョブが原因だと分かる。
+        """
+        with self._executor_lock:
+            self._suspects.append((job, callback))
+        self._run_next_suspect()
+    
+    def _run_next_suspect(self):
+        """実行し直すジョブが残っていて、実行中のものがなければ次を投入"""
+        with self._executor_lock:
+            if self._isolation_busy or not self._suspects:
+                return
+            job, callback = self._suspects.popleft()
+            self._isolation_busy = True
+            if self._isolation_executor is None:
+                self._isolation_executor = self._create_executor(max_workers=1)
+            future = self._isolation_executor.submit(process_job, job)
+        future.add_done_callback(functools.partial(self._on_suspect_done, callback))
+    
+    def _on_suspect_done(self, callback: Callable, future):
+        """1件ずつ実行し直したジョブの完了（異常終了した場合はプールを作り直す）"""
+        with self._executor_lock:
+            self._isolation_busy = False
+            if isinstance(future.exception(), BrokenProcessPool) or not self._suspects:
+                self._isolation_executor.shutdown(wait=False)
+                self._isolation_executor = None
+        try:
+            callback(future)
+        finally:
+            self._run_next_suspect()
+    
+    def __enter__(self) -> 'JobWorker':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """ワーカープロセスを終了"""
+        self.executor.shutdown(wait=True)
+        if self._isolation_executor is not None:
+            self._isolation_executor.shutdown(wait=True)
+    
+    def run(self, jobs: Iterable[Dict], emit: Callable[[Dict, Dict], None]) -> Dict[str, int]:
+        """
+        ジョブを順次投入し、完了したものから順にemit(ジョブ, 結果)を呼び出す
+        
+        emitは完了したジョブごとにすぐ呼ばれる（次のジョブの入力を待たない）。
+        未完了のジョブ数はワーカー数の2倍までに抑え、標準入力などから無制限に読み込まないようにする。
+        ワーカープロセスが異常終了した場合は、そのとき実行中だったジョブを1件ずつ実行し直し、
+        異常終了の原因のジョブだけを失敗として記録する。
+        
+        Returns:
+            処理件数（total, succeeded, failed）
+        """
+        slots = threading.BoundedSemaphore(self.max_workers * 2)
+        lock = threading.Condition()
+        counts = {'total': 0, 'succeeded': 0, 'failed': 0}
+        unfinished = [0]
+        
+        def on_done(job: Dict, isolated: bool, future):
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                if not isolated:
+                    self._submit_isolated(job, functools.partial(on_done, job, True))
+                    return
+                result = {'id': job.get('id'), 'status': 'error',
+                          'error': f"{type(e).__name__}: ワーカープロセスが異常終了しました", 'seconds': None}
+            except Exception as e:
+                result = {'id': job.get('id'), 'status': 'error',
+                          'error': f"{type(e).__name__}: {e}", 'seconds': None}
+            with lock:
+                counts['total'] += 1
+                counts['succeeded' if result['status'] == 'ok' else 'failed'] += 1
+                emit(job, result)
+                unfinished[0] -= 1
+                lock.notify_all()
+            slots.release()
+        
+        for job in jobs:
+            slots.acquire()
+            with lock:
+                unfinished[0] += 1
+            future = self._submit(job)
+            future.add_done_callback(functools.partial(on_done, job, False))
+        
+        # 残りのジョブの完了（コールバックの実行まで）を待つ
+        with lock:
+            lock.wait_for(lambda: unfinished[0] == 0)
+        return counts
+
+
+def read_jsonl_jobs(stream, on_invalid: Callable[[Dict], None]) -> Iterable[Dict]:
+    """JSON Lines形式のジョブを1行ずつ読み込む（不正な行はon_invalidに結果として渡す）"""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError("ジョブはJSONオブジェクトで指定してください。")
+        except ValueError as e:
+            on_invalid({'id': f"line-{line_number}", 'status': 'error',
+                        'error': f"不正なジョブ: {e}", 'seconds': None})
+            continue
+        job.setdefault('id', f"line-{line_number}")
+        yield job
+
+
+def _try_lock(lock_file: Path):
+    """
+    ファイルロックを待たずに取得（取得できた場合は開いたファイル、他のプロセスが保持している場合はNone）
+    
+    ロックはプロセスが異常終了してもOSが解放するため、保持しているプロセスが生きているかの判定に使う。
+    """
+    handle = open(lock_file, 'a+b')
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def _unlock(handle):
+    """_try_lockで取得したロックを解放"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        handle.close()
+
+
+class SpoolDirectory:
+    """
+    スプールディレクトリのジョブファイル（*.json）を扱うクラス
+    
+    ジョブファイルは処理開始時にprocessing/へ移動して他のワーカーと重複しないようにし、
+    完了後はdone/またはfailed/へ移動する（結果は<ジョブ名>.result.jsonとして隣に保存）。
+    処理中はprocessing/<ジョブ名>.lockのファイルロックを保持するため、ワーカーが異常終了して
+    processing/に残ったジョブは、recover_abandonedで未処理に戻せる。
+    """
+    
+    def __init__(self, spool_dir: str):
+        self.spool_path = Path(spool_dir)
+        self.processing_path = self.spool_path / 'processing'
+        self.done_path = self.spool_path / 'done'
+        self.failed_path = self.spool_path / 'failed'
+        for path in [self.spool_path, self.processing_path, self.done_path, self.failed_path]:
+            path.mkdir(parents=True, exist_ok=True)
+        # 処理中のジョブのロック（ジョブ名 → 開いたロックファイル）
+        self._leases = {}
+    
+    def recover_abandoned(self) -> int:
+        """
+        異常終了したワーカーがprocessing/に残したジョブを未処理に戻す（起動時に呼ぶ）
+        
+        ロックを取得できたジョブは処理しているワーカーがいないため、スプールディレクトリに戻す。
+        他のワーカーが処理中のジョブ（ロックを取得できない）はそのまま残す。
+        
+        Returns:
+            未処理に戻したジョブの数
+        """
+        recovered = 0
+        for claimed_file in sorted(self.processing_path.glob('*.json')):
+            handle = _try_lock(self.processing_path / f"{claimed_file.stem}.lock")
+            if handle is None:
+                continue
+            try:
+                os.rename(claimed_file, self.spool_path / claimed_file.name)
+                recovered += 1
+            except OSError:
+                # 直前に完了した、またはスプールディレクトリに同じ名前のジョブがある
+                pass
+            finally:
+                _unlock(handle)
+        return recovered
+    
+    def claim_jobs(self, on_invalid: Callable[[Dict], None]) -> Iterable[Dict]:
+        """未処理のジョブファイルを取得（processing/へ移動できたものだけを返す）"""
+        for job_file in sorted(self.spool_path.glob('*.json')):
+            claimed_file = self.processing_path / job_file.name
+            try:
+                os.rename(job_file, claimed_file)
+            except OSError:
+                # 他のワーカーが先に取得した
+                continue
+            
+            # 移動してからロックを取得するまでの間に、起動した別のワーカーのrecover_abandonedが
+            # 未処理に戻した場合は、そのワーカーに任せる
+            lease = _try_lock(self.processing_path / f"{job_file.stem}.lock")
+            if lease is None:
+                continue
+            if not claimed_file.exists():
+                _unlock(lease)
+                continue
+            self._leases[job_file.stem] = lease
+            
+            try:
+                with open(claimed_file, 'r', encoding='utf-8') as f:
+                    job = json.load(f)
+                if not isinstance(job, dict):
+                    raise ValueError("ジョブはJSONオブジェクトで指定してください。")
+            except (OSError, ValueError) as e:
+                result = {'id': job_file.stem, 'status': 'error',
+                          'error': f"不正なジョブ: {e}", 'seconds': None}
+                self.finish(job_file.stem, result)
+                on_invalid(result)
+                continue
+            job.setdefault('id', job_file.stem)
+            job['_spool_name'] = job_file.stem
+            yield job
+    
+    def finish(self, spool_name: str, result: Dict):
+        """処理済みのジョブファイルをdone/またはfailed/へ移動し、結果を保存"""
+        destination = self.done_path if result['status'] == 'ok' else self.failed_path
+        claimed_file = self.processing_path / f"{spool_name}.json"
+        if claimed_file.exists():
+            os.replace(claimed_file, destination / claimed_file.name)
+        with open(destination / f"{spool_name}.result.json", 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        
+        lease = self._leases.pop(spool_name, None)
+        if lease is not None:
+            _unlock(lease)
+            try:
+                (self.processing_path / f"{spool_name}.lock").unlink()
+            except OSError:
+                pass
@@ -0,0 +1,150 @@
+"""
+常駐ワーカーモードのコマンドラインインターフェース
+
+標準入力（JSON Lines）またはスプールディレクトリからジョブを読み込み、
+1ジョブにつき1行の結果（JSON）を標準出力に書き出す。
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# 相対インポートと絶対インポートの両方に対応
+try:
+    from .worker import JobWorker, SpoolDirectory, read_jsonl_jobs
+    from .parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND
+    from .extraction_cache import DEFAULT_CACHE_DIR
+except ImportError:
+    from worker import JobWorker, SpoolDirectory, read_jsonl_jobs
+    from parser_backends import PARSER_BACKENDS, DEFAULT_PARSER_BACKEND
+    from extraction_cache import DEFAULT_CACHE_DIR
+
+
+def _print_result(result: dict):
+    """結果を1行のJSONとして出力"""
+    sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='パーサーとテンプレートを読み込んだままのワーカープロセスで、ジョブを連続して処理します'
+    )
+    parser.add_argument(
+        '--spool',
+        type=str,
+        default=None,
+        help='ジョブファイル（*.json）を置くスプールディレクトリ。指定しない場合は標準入力からJSON Linesで読み込む'
+    )
+    parser.add_argument(
+        '--once',
+        action='store_true',
+        help='スプールディレクトリのジョブがなくなったら終了する（指定しない場合は新しいジョブを待ち続ける）'
+    )
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=1.0,
+        help='スプールディレクトリを確認する間隔（秒、デフォルト: 1.0）'
+    )
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=None,
+        help='ワーカープロセス数（デフォルト: CPUコア数）'
+    )
+    parser.add_argument(
+        '-t', '--template',
+        type=str,
+        default='templates/prompts.md',
+        help='プロンプトテンプレートファイルのパス（デフォルト: templates/prompts.md）'
+    )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER_BACKEND,
+        help=f'HTMLパーサーのバックエンド（デフォルト: {DEFAULT_PARSER_BACKEND}）'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='解析結果のキャッシュを使用しない'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f'解析結果のキャッシュディレクトリ（デフォルト: {DEFAULT_CACHE_DIR}）'
+    )
+    parser.add_argument(
+        '--id-root',
+        type=str,
+        default=None,
+        help='記事IDの連番とカタログのルートディレクトリ（デフォルト: 各ジョブのoutputの出力ディレクトリ、ジョブのid_rootが優先）'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    if args.workers is not None and args.workers < 1:
+        print("エラー: ワーカー数は1以上を指定してください。", file=sys.stderr)
+        sys.exit(1)
+    
+    template_path = Path(args.template)
+    if not template_path.exists():
+        print(f"エラー: テンプレートファイルが見つかりません: {template_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    worker = JobWorker(
+        str(template_path),
+        backend=args.backend,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        max_workers=args.workers,
+        id_root=args.id_root
+    )
+    print(f"ワーカーを起動しました（{worker.max_workers}プロセス）", file=sys.stderr)
+    
+    failed = 0
+    
+    def report_invalid(result: dict):
+        nonlocal failed
+        failed += 1
+        _print_result(result)
+    
+    try:
+        with worker:
+            if args.spool:
+                spool = SpoolDirectory(args.spool)
+                recovered = spool.recover_abandoned()
+                if recovered:
+                    print(f"前回異常終了したワーカーの処理中のジョブを{recovered}件、未処理に戻しました", file=sys.stderr)
+                
+                def emit(job: dict, result: dict):
+                    spool.finish(job['_spool_name'], result)
+                    _print_result(result)
+                
+                while True:
+                    counts = worker.run(spool.claim_jobs(report_invalid), emit)
+                    failed += counts['failed']
+                    if counts['total'] == 0:
+                        if args.once:
+                            break
+                        time.sleep(args.poll_interval)
+            else:
+                counts = worker.run(
+                    read_jsonl_jobs(sys.stdin, report_invalid),
+                    lambda job, result: _print_result(result)
+                )
+                failed += counts['failed']
+    except KeyboardInterrupt:
+        print("\n中断しました。", file=sys.stderr)
+        sys.exit(130)
+    
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+パーサーのバックエンド（soup / stream / lxml）の抽出結果が同一であることのテスト
+
+input/*.html（置いてある場合）と、benchmarks/compare_backends.py と同じ合成レポートのコーパスを
+各バックエンドで解析し、全パターン・全H1候補・全提案（ParsedReport.to_dict()）と
+パターンごとの抽出結果（extract_all）が基準の soup と一致することを確認する。
+
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.compare_backends import SYNTHETIC_CORPUS, first_difference, synthetic_html  # noqa: E402
+from src.parser_backends import PARSER_BACKENDS, create_parser  # noqa: E402
+
+
+REFERENCE_BACKEND = 'soup'
+INPUT_DIR = REPO_ROOT / 'input'
+
+
+def _sample_reports():
+    """input/ に置いてあるHTMLレポート（ない場合は空）"""
+    if not INPUT_DIR.is_dir():
+        return []
+    return sorted(INPUT_DIR.glob('*.html'))
+
+
+def _assert_same_as_reference(html_file: Path):
+    """各バックエンドの抽出結果を基準のバックエンドと比較"""
+    reports = {backend: create_parser(str(html_file), backend).extract_report() for backend in PARSER_BACKENDS}
+    reference = reports[REFERENCE_BACKEND]
+    expected = reference.to_dict()
+    
+    for backend, report in reports.items():
+        difference = first_difference(expected, report.to_dict())
+        assert difference is None, f"{backend} と {REFERENCE_BACKEND} が異なります: {difference}"
+        
+        for pattern in reference.patterns:
+            difference = first_difference(reference.extract_all(pattern), report.extract_all(pattern))
+            assert difference is None, f"{backend} と {REFERENCE_BACKEND} のパターン{pattern}が異なります: {difference}"
+
+
+def test_backends_are_registered():
+    assert REFERENCE_BACKEND in PARSER_BACKENDS
+    assert {'soup', 'stream', 'lxml'} <= set(PARSER_BACKENDS)
+
+
+@pytest.mark.parametrize('name', list(SYNTHETIC_CORPUS))
+def test_backends_match_on_synthetic_report(name, tmp_path):
+    html_file = tmp_path / f"{name}.html"
+    html_file.write_text(synthetic_html(name), encoding='utf-8')
+    _assert_same_as_reference(html_file)
+
+
+@pytest.mark.parametrize('html_file', _sample_reports(), ids=lambda path: path.name)
+def test_backends_match_on_sample_report(html_file):
+    _assert_same_as_reference(html_file)
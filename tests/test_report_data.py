@@ -0,0 +1,97 @@
+"""
+抽出データのバイナリ形式（.prd）の変換のテスト
+
+合成レポートのコーパス（benchmarks/compare_backends.py と同じ）の抽出結果と、境界になる値
+（空のリスト・dict、Unicode、大きな整数・負の整数、浮動小数点数）が、
+decode_report_data(encode_report_data(x)) で元のデータ（型・キーの順序を含む）に戻ることを確認する。
+
+    python -m pytest tests
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.compare_backends import SYNTHETIC_CORPUS, synthetic_html  # noqa: E402
+from src.parser_backends import create_parser  # noqa: E402
+from src.report_data import (  # noqa: E402
+    FORMAT_BINARY, FORMAT_JSON, decode_report_data, dumps_report_data, encode_report_data,
+    load_report_data, loads_report_data, save_report_data
+)
+
+
+EDGE_VALUES = {
+    'empty_dict': {},
+    'empty_lists': {'article_structure': [], 'h1_title_candidates': [], 'nested': [[], [[]], {}]},
+    'empty_strings': {'h1_title_candidates': [''], 'advice': '', '': 'empty key'},
+    'unicode': {
+        'h1_title_candidates': ['副業で月5万円を稼ぐ方法', 'ｶﾀｶﾅ・全角ＡＢＣ', 'emoji 🚀✨', 'e\u0301 (combining)'],
+        'キー': '改行\nタブ\t引用"\\',
+        'zero_width': '\u200b\ufeff',
+    },
+    'ints': {'values': [0, 1, -1, 2 ** 27 - 1, 2 ** 27, 2 ** 31, 2 ** 32, 2 ** 63, -2 ** 63, 10 ** 30, -10 ** 30]},
+    'floats': {'values': [0.0, -0.0, 1.5, -2.25, 0.1, 1e-300, 1e300, 123456789.123456789, float(2 ** 53)]},
+    'literals': {'values': [None, True, False, [None], [True, False]]},
+    'mixed_lists': {'values': ['a', 1, 'b'], 'strings': ['a', 'a', 'b'], 'single': ['only']},
+    'same_shape': {'items': [{'h3': 'x', 'keywords': ['k']}, {'h3': 'y', 'keywords': []}, {'keywords': [], 'h3': 'z'}]},
+    'top_level_list': [1, 'two', {'three': 3}],
+}
+
+
+def _assert_round_trip(data):
+    decoded = decode_report_data(encode_report_data(data))
+    assert decoded == data
+    # == では 1 と True、1 と 1.0 を区別しないため、型とキーの順序はJSONの文字列で比較する
+    assert json.dumps(decoded, ensure_ascii=False) == json.dumps(data, ensure_ascii=False)
+
+
+def _synthetic_reports(name, tmp_path):
+    """合成レポートの抽出結果（全パターン、パターンごと）"""
+    html_file = tmp_path / f"{name}.html"
+    html_file.write_text(synthetic_html(name), encoding='utf-8')
+    report = create_parser(str(html_file), 'soup').extract_report()
+    reports = [report.to_dict(), report.extract_all_patterns()]
+    reports.extend(report.extract_all(pattern) for pattern in report.patterns)
+    return reports
+
+
+@pytest.mark.parametrize('name', list(EDGE_VALUES))
+def test_round_trip_edge_values(name):
+    _assert_round_trip(EDGE_VALUES[name])
+
+
+@pytest.mark.parametrize('name', list(SYNTHETIC_CORPUS))
+def test_round_trip_synthetic_report(name, tmp_path):
+    for data in _synthetic_reports(name, tmp_path):
+        _assert_round_trip(data)
+
+
+@pytest.mark.parametrize('report_format', [FORMAT_JSON, FORMAT_BINARY])
+def test_dumps_and_save_round_trip(report_format, tmp_path):
+    data = _synthetic_reports('quirks', tmp_path)[1]
+    assert loads_report_data(dumps_report_data(data, report_format)) == data
+    
+    path = tmp_path / ('data.prd' if report_format == FORMAT_BINARY else 'data.json')
+    assert save_report_data(data, path) == report_format
+    assert load_report_data(path) == data
+
+
+def test_binary_is_smaller_than_json(tmp_path):
+    data = _synthetic_reports('default', tmp_path)[1]
+    assert len(encode_report_data(data)) < len(dumps_report_data(data, FORMAT_JSON))
+
+
+def test_corrupted_payload_raises_value_error():
+    payload = encode_report_data(EDGE_VALUES['unicode'])
+    for broken in (payload[:3], payload[:-1], b'\x00PRX' + payload[4:]):
+        with pytest.raises(ValueError):
+            decode_report_data(broken)
+
+
+def test_unsupported_value_raises_type_error():
+    with pytest.raises(TypeError):
+        encode_report_data({'value': object()})